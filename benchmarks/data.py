@@ -0,0 +1,247 @@
+import datetime
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+PROVINCES = [
+    "Groningen",
+    "Friesland",
+    "Drenthe",
+    "Overijssel",
+    "Flevoland",
+    "Gelderland",
+    "Utrecht",
+    "Noord-Holland",
+    "Zuid-Holland",
+    "Zeeland",
+    "Noord-Brabant",
+    "Limburg",
+]
+
+INTENSIVE_CARE_SERIES = [
+    "ic-count",
+    "intake-count",
+    "intake-cumulative",
+    "died-cumulative",
+    "survived-cumulative",
+]
+
+
+class Generator:
+    def __init__(self, days, municipalities=350, history=120, seed=0):
+        self._days = days
+        self._municipalities = municipalities
+        self._history = history
+        self._random = np.random.default_rng(seed)
+
+        start = datetime.date(2020, 2, 27)
+        self.dates = [
+            (start + datetime.timedelta(days=day)).isoformat() for day in range(days)
+        ]
+        self.codes = np.arange(1, municipalities + 1)
+        self.provinces = self.codes % len(PROVINCES)
+        self._municipality_codes = np.array([f"GM{code:04d}" for code in self.codes])
+        self._municipality_names = np.array([f"Gemeente {code}" for code in self.codes])
+        self._province_names = np.array([PROVINCES[idx] for idx in self.provinces])
+
+        # Cumulative counts per day and municipality
+        self.cases = self._cumulative((days, municipalities), 20)
+        self.hospitalized = self._cumulative((days, municipalities), 1)
+        self.deceased = self._cumulative((days, municipalities), 0.5)
+        self.intensive_care = {
+            name: self._cumulative(days, 10) for name in INTENSIVE_CARE_SERIES
+        }
+        self.new_intake = [self._random.poisson(10, days) for _ in range(2)]
+
+    def write(self, path):
+        self.write_municipalities(f"{path}/external/gemeenten.csv")
+        self.write_sources(f"{path}/sources")
+        self.write_national(f"{path}/raw/national")
+        self.write_municipality(f"{path}/raw/municipality")
+        self.write_intensive_care(f"{path}/raw/intensive-care")
+
+    def write_municipalities(self, path):
+        _write_csv(
+            pd.DataFrame(
+                {
+                    "Gemeentecode": self.codes,
+                    "Gemeente": self._municipality_names,
+                    "Provinciecode": self.provinces + 20,
+                    "Provincie": self._province_names,
+                }
+            ),
+            path,
+        )
+
+    def write_sources(self, path):
+        dates = np.repeat(self.dates, self._municipalities)
+        codes = np.tile(self._municipality_codes, self._days)
+        names = np.tile(self._municipality_names, self._days)
+        provinces = np.tile(self._province_names, self._days)
+
+        # RIVM cumulative cases and hospital admissions per municipality
+        _write_csv(
+            pd.DataFrame(
+                {
+                    "Date_of_report": [f"{date} 10:00:00" for date in dates],
+                    "Date_of_publication": dates,
+                    "Municipality_code": codes,
+                    "Municipality_name": names,
+                    "Province": provinces,
+                    "Total_reported": self.cases.ravel(),
+                    "Deceased": self.deceased.ravel(),
+                }
+            ),
+            f"{path}/municipality-cases",
+            sep=";",
+        )
+        _write_csv(
+            pd.DataFrame(
+                {
+                    "Date_of_report": [f"{date} 10:00:00" for date in dates],
+                    "Date_of_statistics": dates,
+                    "Municipality_code": codes,
+                    "Municipality_name": names,
+                    "Province": provinces,
+                    "Hospital_admission": self.hospitalized.ravel(),
+                }
+            ),
+            f"{path}/municipality-hospitalized",
+            sep=";",
+        )
+
+        # NICE documents, new intake and died/survived come as two element arrays
+        days = range(max(0, self._days - self._history), self._days)
+        for name in ["ic-count", "intake-count", "intake-cumulative"]:
+            _write_json(self._series(days, self.intensive_care[name]), f"{path}/{name}")
+        _write_json(
+            [self._series(days, values) for values in self.new_intake],
+            f"{path}/new-intake",
+        )
+        _write_json(
+            [
+                self._series(days, self.intensive_care["died-cumulative"]),
+                self._series(days, self.intensive_care["survived-cumulative"]),
+            ],
+            f"{path}/died-and-survivors-cumulative",
+        )
+
+    def write_national(self, path):
+        data = pd.DataFrame(
+            {
+                "PositiefGetest": self.cases.sum(axis=1),
+                "Opgenomen": self.hospitalized.sum(axis=1),
+                "Overleden": self.deceased.sum(axis=1),
+            }
+        )
+        for (day, date) in enumerate(self.dates):
+            _write_csv(data.iloc[[day]], f"{path}/{date}.csv")
+
+    def write_municipality(self, path):
+        # The oldest files use the original RIVM layout, the newest have a version
+        legacy = max(1, self._days // 20)
+        versioned = self._days - max(1, self._days // 20)
+
+        for (day, date) in enumerate(self.dates):
+            if day < legacy:
+                data = self._legacy_municipality(day)
+            else:
+                data = self._municipality(day, date)
+                if day >= versioned:
+                    data.insert(0, "Version", 4)
+
+            _write_csv(data, f"{path}/{date}.csv")
+
+    def write_intensive_care(self, path):
+        # The oldest files combine all series, the newest split new intake
+        legacy = max(1, self._days // 20)
+
+        for (day, date) in enumerate(self.dates):
+            days = range(max(0, day + 1 - self._history), day + 1)
+            if day < legacy:
+                _write_json(
+                    self._legacy_intensive_care(days), f"{path}/{date}-new-intake.json"
+                )
+                continue
+
+            for name in INTENSIVE_CARE_SERIES:
+                _write_json(
+                    self._series(days, self.intensive_care[name]),
+                    f"{path}/{date}-{name}.json",
+                )
+            _write_json(
+                self._series(days, self.new_intake[0]),
+                f"{path}/{date}-new-intake-confirmed.json",
+            )
+            _write_json(
+                self._series(days, self.new_intake[1]),
+                f"{path}/{date}-new-intake-suspicious.json",
+            )
+
+    def _municipality(self, day, date):
+        # Drop a few municipalities to leave gaps for the merge to interpolate
+        rows = self._random.random(self._municipalities) > 0.01
+
+        return pd.DataFrame(
+            {
+                "Date_of_report": f"{date} 10:00:00",
+                "Date_of_publication": date,
+                "Municipality_code": self._municipality_codes[rows],
+                "Municipality_name": self._municipality_names[rows],
+                "Province": self._province_names[rows],
+                "Security_region_code": "VR01",
+                "Security_region_name": "Veiligheidsregio",
+                "Municipal_health_service": "GGD",
+                "ROAZ_region": "ROAZ",
+                "Total_reported": self.cases[day][rows],
+                "Hospital_admission": self.hospitalized[day][rows],
+                "Deceased": self.deceased[day][rows],
+            }
+        )
+
+    def _legacy_municipality(self, day):
+        unknown = int(self._random.poisson(5))
+
+        return pd.DataFrame(
+            {
+                "Gemnr": [*self.codes, -1],
+                "Gemeente": [*self._municipality_names, f"Niet vermeld {unknown}"],
+                "Aantal": [*self.cases[day], unknown],
+            }
+        )
+
+    def _legacy_intensive_care(self, days):
+        return [
+            {
+                "date": self.dates[day],
+                "newIntake": int(self.new_intake[0][day]),
+                "diedCumulative": int(self.intensive_care["died-cumulative"][day]),
+                "intakeCount": int(self.intensive_care["intake-count"][day]),
+                "intakeCumulative": int(self.intensive_care["intake-cumulative"][day]),
+                "icCount": int(self.intensive_care["ic-count"][day]),
+                "icCumulative": int(self.intensive_care["intake-cumulative"][day]),
+            }
+            for day in days
+        ]
+
+    def _series(self, days, values):
+        return [{"date": self.dates[day], "value": int(values[day])} for day in days]
+
+    def _cumulative(self, shape, rate):
+        return self._random.poisson(rate, shape).cumsum(axis=0)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}(days={self._days})>"
+
+
+def _write_csv(data, path, **kwargs):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    data.to_csv(path, index=False, **kwargs)
+
+
+def _write_json(data, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf8") as handle:
+        json.dump(data, handle)
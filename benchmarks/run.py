@@ -0,0 +1,275 @@
+import datetime
+from functools import partial
+import json
+import logging
+import os
+import platform
+import subprocess
+import tempfile
+import time
+
+import click
+import pandas as pd
+
+from collector.memo import Memo
+from collector.store import InMemoryStore, LocalStore, migrate
+from collector.tasks.get_national_dataset.task import GetNationalDataset
+from collector.tasks.get_municipality_dataset.task import GetMunicipalityDataset
+from collector.tasks.get_intensive_care_dataset.task import GetIntensiveCareDataset
+from collector.tasks.clean_national_dataset.task import CleanNationalDataset
+from collector.tasks.clean_municipality_dataset.task import CleanMunicipalityDataset
+from collector.tasks.clean_intensive_care_dataset.task import (
+    CleanIntensiveCareDataset,
+)
+from collector.tasks.merge_national_dataset.task import MergeNationalDataset
+from collector.tasks.merge_municipality_dataset.task import MergeMunicipalityDataset
+from collector.tasks.merge_intensive_care_dataset.task import (
+    MergeIntensiveCareDataset,
+)
+
+from data import Generator
+
+log = logging.getLogger(__name__)
+
+CONFIG = {
+    "urls": {
+        "national": {
+            "cases": "bench://municipality-cases",
+            "hospitalized": "bench://municipality-hospitalized",
+        },
+        "municipality": {
+            "cases": "bench://municipality-cases",
+            "hospitalized": "bench://municipality-hospitalized",
+        },
+        "intensive_care": [
+            "bench://ic-count",
+            "bench://intake-count",
+            "bench://intake-cumulative",
+            "bench://new-intake",
+            "bench://died-and-survivors-cumulative",
+        ],
+    },
+    "municipalities": "external/gemeenten.csv",
+}
+
+BENCHMARKS = {
+    "get_national_dataset": (
+        GetNationalDataset,
+        {"output_folder": "bench/national"},
+    ),
+    "get_national_dataset_backfill": (
+        GetNationalDataset,
+        {"output_folder": "bench/national-backfill", "backfill": True},
+    ),
+    "get_municipality_dataset": (
+        GetMunicipalityDataset,
+        {"output_folder": "bench/municipality"},
+    ),
+    "get_municipality_dataset_backfill": (
+        GetMunicipalityDataset,
+        {"output_folder": "bench/municipality-backfill", "backfill": True},
+    ),
+    "get_intensive_care_dataset": (
+        GetIntensiveCareDataset,
+        {"output_folder": "bench/intensive-care"},
+    ),
+    "clean_national_dataset": (
+        CleanNationalDataset,
+        {"input_folder": "raw/national", "output_folder": "interim/national"},
+    ),
+    "clean_municipality_dataset": (
+        CleanMunicipalityDataset,
+        {"input_folder": "raw/municipality", "output_folder": "interim/municipality"},
+    ),
+    "clean_intensive_care_dataset": (
+        CleanIntensiveCareDataset,
+        {
+            "input_folder": "raw/intensive-care",
+            "output_folder": "interim/intensive-care",
+        },
+    ),
+    "merge_national_dataset": (
+        MergeNationalDataset,
+        {
+            "name": "rivm-covid-19-national",
+            "input_folder": "interim/national",
+            "output_folder": "processed",
+        },
+    ),
+    "merge_municipality_dataset": (
+        MergeMunicipalityDataset,
+        {
+            "name": "rivm-covid-19-municipality",
+            "input_folder": "interim/municipality",
+            "output_folder": "processed",
+        },
+    ),
+    "merge_intensive_care_dataset": (
+        MergeIntensiveCareDataset,
+        {
+            "name": "nice-covid-19-intensive-care",
+            "input_folder": "interim/intensive-care",
+            "output_folder": "processed",
+        },
+    ),
+}
+
+# Merges read the interim files written by the clean tasks
+REQUIRES = {
+    "merge_national_dataset": "clean_national_dataset",
+    "merge_municipality_dataset": "clean_municipality_dataset",
+    "merge_intensive_care_dataset": "clean_intensive_care_dataset",
+}
+
+
+class Client:
+    def __init__(self, path):
+        self._path = path
+
+    def get(self, url, params=None):
+        with open(self.download(url, params), "r", encoding="utf8") as handle:
+            return handle.read()
+
+    def download(self, url, params=None):
+        return os.path.join(self._path, url.split("://")[-1])
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}(path={self._path})>"
+
+
+def create_store(kind, path):
+    if kind == "local":
+        return LocalStore(path)
+
+    # Load the generated files up front so runs measure compute only
+    store = InMemoryStore()
+    migrate(path, store)
+    return store
+
+
+def run_benchmark(name, path, repeat, store):
+    task, inputs = BENCHMARKS[name]
+
+    if task in (GetNationalDataset, GetMunicipalityDataset, GetIntensiveCareDataset):
+        create_task = partial(task, CONFIG, Client(f"{path}/sources"), store)
+    else:
+        create_task = partial(task, CONFIG, store)
+
+    # Rebuild everything on each run, otherwise only the first run does work
+    if "full" in task.inputs_schema["properties"]:
+        inputs = {**inputs, "full": True}
+
+    durations = []
+    for run in range(repeat):
+        # Reset the merge memo, otherwise later runs skip unchanged inputs
+        if "name" in inputs:
+            Memo(store, f"{inputs['output_folder']}/.{inputs['name']}.json").save()
+
+        # Backfill into an empty folder, otherwise later runs skip existing days
+        run_inputs = inputs
+        if inputs.get("backfill", False):
+            run_inputs = {**inputs, "output_folder": f"{inputs['output_folder']}/{run}"}
+
+        start = time.perf_counter()
+        create_task()(**run_inputs)
+        durations.append(time.perf_counter() - start)
+
+    return durations
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@click.command()
+@click.option(
+    "--days",
+    "scales",
+    multiple=True,
+    type=int,
+    default=[100, 1000, 10000],
+    show_default=True,
+    help="The number of days to generate, can be repeated",
+)
+@click.option(
+    "--benchmark",
+    "benchmarks",
+    multiple=True,
+    type=click.Choice(list(BENCHMARKS)),
+    help="The benchmark to run, can be repeated (default: all)",
+)
+@click.option("--repeat", default=3, show_default=True, help="The runs per benchmark")
+@click.option(
+    "--store",
+    "kind",
+    default="local",
+    show_default=True,
+    type=click.Choice(["local", "memory"]),
+    help="Keep files on disk or in memory, memory measures compute only",
+)
+@click.option(
+    "--output",
+    default="benchmarks/results.json",
+    show_default=True,
+    type=click.Path(dir_okay=False),
+    help="The file to write the results to",
+)
+def main(scales, benchmarks, repeat, kind, output):
+    results = []
+    for days in scales:
+        with tempfile.TemporaryDirectory() as path:
+            log.info("Generating %d days of data", days)
+            Generator(days).write(path)
+            store = create_store(kind, path)
+
+            names = benchmarks or list(BENCHMARKS)
+            for name in names:
+                if name in REQUIRES and REQUIRES[name] not in names:
+                    log.info("Preparing %s on %d days", name, days)
+                    run_benchmark(REQUIRES[name], path, 1, store)
+
+                log.info("Running %s on %d days", name, days)
+                durations = run_benchmark(name, path, repeat, store)
+                log.info("%s took %.3fs on %d days", name, min(durations), days)
+
+                results.append(
+                    {
+                        "benchmark": name,
+                        "days": days,
+                        "store": kind,
+                        "durations": durations,
+                        "min": min(durations),
+                        "mean": sum(durations) / len(durations),
+                    }
+                )
+
+    with open(output, "w", encoding="utf8") as handle:
+        json.dump(
+            {
+                "commit": _commit(),
+                "created": datetime.datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "pandas": pd.__version__,
+                "results": results,
+            },
+            handle,
+            indent=2,
+        )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        format="%(asctime)s %(levelname)-8s %(name)-15s %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+        level=logging.INFO,
+    )
+    logging.getLogger("collector").setLevel(logging.WARNING)
+    main()
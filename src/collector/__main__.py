@@ -0,0 +1,114 @@
+from contextlib import nullcontext
+import logging
+import os
+import uuid
+
+import click
+
+from collector.config import read_config, init_logging
+from collector.metrics import record
+from collector.pipeline import DATASETS, Pipeline
+from collector.client import create_client
+from collector.store import (
+    InMemoryStore,
+    SqliteStore,
+    create_store,
+    migrate,
+    relayout,
+)
+
+log = logging.getLogger(__name__)
+
+
+@click.group()
+def main():
+    pass
+
+
+@main.command("run-pipeline")
+@click.option(
+    "--dataset",
+    "datasets",
+    multiple=True,
+    type=click.Choice(list(DATASETS)),
+    help="The dataset to collect, can be repeated (default: all)",
+)
+@click.option("--full", is_flag=True, help="Rebuild all datasets instead of new ones")
+@click.option(
+    "--workers",
+    default=1,
+    type=click.IntRange(min=1),
+    help="The number of worker processes to use",
+)
+@click.option(
+    "--jobs",
+    default=3,
+    type=click.IntRange(min=1),
+    help="The number of tasks to run at the same time",
+)
+@click.option("--metrics-out", help="The file to write stage metrics to as JSON")
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Profile every task, also enabled by COLLECTOR_PROFILE=1",
+)
+@click.option(
+    "--in-memory",
+    is_flag=True,
+    help="Pass files between tasks in memory and write them to the store at the end",
+)
+def run_pipeline(datasets, full, workers, jobs, metrics_out, profile, in_memory):
+    if in_memory and workers > 1:
+        raise click.BadParameter(
+            "can not be combined with --in-memory", param_hint="--workers"
+        )
+
+    # Tasks of one run reuse each other's responses without asking the server
+    run_id = os.environ.get("COLLECTOR_RUN_ID") or uuid.uuid4().hex
+
+    config = read_config()
+    client = create_client(config.get("client"), run_id=run_id)
+    store = create_store(config["store"])
+    if in_memory:
+        store = InMemoryStore(store)
+
+    pipeline = Pipeline(config["collector"], client, store)
+    with record(metrics_out), (store if in_memory else nullcontext()):
+        pipeline.run(
+            datasets or list(DATASETS),
+            full=full,
+            workers=workers,
+            jobs=jobs,
+            profile=profile,
+        )
+
+
+@main.command("migrate-store")
+@click.option("--source", help="The folder to copy files from (default: store path)")
+@click.option("--target", required=True, help="The SQLite file to copy files to")
+def migrate_store(source, target):
+    config = read_config()
+
+    count = migrate(source or config["store"]["path"], SqliteStore(target))
+    log.info("Migrated %d files to %s", count, target)
+
+
+@main.command("relayout-store")
+@click.option(
+    "--folder",
+    "folders",
+    multiple=True,
+    help="The folder to relayout, can be repeated (default: store partition)",
+)
+@click.option("--flatten", is_flag=True, help="Move files back out of the partitions")
+def relayout_store(folders, flatten):
+    config = read_config()
+
+    folders = folders or config["store"].get("partition", [])
+    count = relayout(config["store"]["path"], folders, flatten=flatten)
+    log.info("Moved %d files in %s", count, ", ".join(folders))
+
+
+if __name__ == "__main__":
+    init_logging()
+    main()
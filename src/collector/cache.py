@@ -0,0 +1,232 @@
+from contextlib import contextmanager
+from urllib.parse import urlencode
+import hashlib
+import fcntl
+import json
+import os
+import threading
+import time
+
+
+class ResponseCache:
+    def __init__(self, path, max_size=None, max_age=None, run_id=None):
+        self._path = path
+        self._max_size = max_size
+        self._max_age = max_age
+        self._run_id = run_id or os.environ.get("COLLECTOR_RUN_ID")
+
+    def headers(self, url, params=None):
+        entry = self._load_entry(self._key(url, params))
+        if entry is None:
+            return {}
+
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def fresh(self, url, params=None):
+        entry = self._load_entry(self._key(url, params))
+        if entry is None or self._run_id is None:
+            return False
+        return entry.get("run_id") == self._run_id
+
+    def load(self, url, params=None):
+        key = self._key(url, params)
+        entry = self._load_entry(key)
+        if entry is None:
+            return None
+
+        encoding = entry.get("encoding") or "utf8"
+        with open(self._blob_path(entry["digest"]), "r", encoding=encoding) as handle:
+            text = handle.read()
+
+        os.utime(self._entry_path(key))
+        return text
+
+    def path(self, url, params=None):
+        key = self._key(url, params)
+        entry = self._load_entry(key)
+        if entry is None:
+            return None
+
+        os.utime(self._entry_path(key))
+        return self._blob_path(entry["digest"])
+
+    def save(self, url, params, chunks, headers, encoding=None):
+        os.makedirs(os.path.join(self._path, "blobs"), exist_ok=True)
+
+        digest = hashlib.sha256()
+        temp_path = self._blob_path(f"{self._temp_id()}.tmp")
+        with open(temp_path, "wb") as handle:
+            for chunk in chunks:
+                digest.update(chunk)
+                handle.write(chunk)
+
+        entry = {
+            "url": url,
+            "params": params,
+            "digest": digest.hexdigest(),
+            "encoding": encoding,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "run_id": self._run_id,
+            "stored_at": time.time(),
+        }
+
+        # Add the blob and its entry together, evict removes unreferenced blobs
+        with self._flock(self._lock_path("")):
+            os.replace(temp_path, self._blob_path(digest.hexdigest()))
+            self._write(self._entry_path(self._key(url, params)), json.dumps(entry))
+
+        self.evict(keep=self._key(url, params))
+
+    def refresh(self, url, params=None):
+        key = self._key(url, params)
+        entry = self._load_entry(key)
+        if entry is None:
+            return
+
+        entry["run_id"] = self._run_id
+        self._write(self._entry_path(key), json.dumps(entry))
+
+    @contextmanager
+    def lock(self, url, params=None):
+        os.makedirs(self._path, exist_ok=True)
+        with self._flock(self._lock_path(self._key(url, params))):
+            yield
+
+    def evict(self, keep=None):
+        if not os.path.isdir(self._path):
+            return
+
+        with self._flock(self._lock_path("")):
+            now = time.time()
+            entries = []
+            for name in os.listdir(self._path):
+                if not name.endswith(".json"):
+                    continue
+
+                key = name[:-5]
+                entry = self._load_entry(key)
+                if entry is None:
+                    self._remove(key)
+                    continue
+
+                accessed = os.path.getmtime(self._entry_path(key))
+                if self._max_age is not None and now - accessed > self._max_age:
+                    self._remove(key)
+                else:
+                    entries.append((accessed, key, entry["digest"]))
+
+            # The kept entry goes last, it stays even when it exceeds the size
+            if self._max_size is not None:
+                entries.sort(key=lambda entry: (entry[1] == keep, entry[0]))
+                while (
+                    entries
+                    and entries[0][1] != keep
+                    and self._size(entries) > self._max_size
+                ):
+                    (_, key, _) = entries.pop(0)
+                    self._remove(key)
+
+            self._remove_locks({key for (_, key, _) in entries})
+            self._remove_blobs({digest for (_, _, digest) in entries})
+
+    def _load_entry(self, key):
+        try:
+            with open(self._entry_path(key), "r", encoding="utf8") as handle:
+                entry = json.load(handle)
+        except (OSError, ValueError):
+            return None
+
+        if not os.path.exists(self._blob_path(entry.get("digest", ""))):
+            return None
+        return entry
+
+    def _size(self, entries):
+        digests = {digest for (_, _, digest) in entries}
+        return sum(os.path.getsize(self._blob_path(digest)) for digest in digests)
+
+    def _remove(self, key):
+        try:
+            os.remove(self._entry_path(key))
+        except OSError:
+            pass
+
+    def _remove_locks(self, keys):
+        for name in os.listdir(self._path):
+            if not name.endswith(".lock") or name[:-5] in keys or name == ".lock":
+                continue
+
+            # Leave the lock of a download that is still running
+            with self._flock(os.path.join(self._path, name), False) as locked:
+                if locked:
+                    os.remove(os.path.join(self._path, name))
+
+    def _remove_blobs(self, digests):
+        path = os.path.join(self._path, "blobs")
+        if not os.path.isdir(path):
+            return
+
+        # Blobs being downloaded are temporary files until they are stored
+        for name in os.listdir(path):
+            if name not in digests and not name.endswith(".tmp"):
+                os.remove(os.path.join(path, name))
+
+    @contextmanager
+    def _flock(self, path, blocking=True):
+        handle = self._acquire(path, blocking)
+        try:
+            yield handle is not None
+        finally:
+            if handle is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+                handle.close()
+
+    def _acquire(self, path, blocking):
+        flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+        while True:
+            # pylint: disable=consider-using-with
+            handle = open(path, "a", encoding="utf8")
+            try:
+                fcntl.flock(handle, flags)
+            except BlockingIOError:
+                handle.close()
+                return None
+
+            # Evict removes lock files, keep the lock only if it is on the file
+            # that is still at the path
+            try:
+                if os.path.samestat(os.fstat(handle.fileno()), os.stat(path)):
+                    return handle
+            except FileNotFoundError:
+                pass
+            handle.close()
+
+    def _write(self, path, text):
+        temp_path = f"{path}.{self._temp_id()}.tmp"
+        with open(temp_path, "w", encoding="utf8") as handle:
+            handle.write(text)
+        os.replace(temp_path, path)
+
+    def _temp_id(self):
+        return f"{os.getpid()}-{threading.get_ident()}"
+
+    def _key(self, url, params):
+        query = urlencode(sorted((params or {}).items()))
+        return hashlib.sha256(f"{url}?{query}".encode("utf8")).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self._path, f"{key}.json")
+
+    def _lock_path(self, key):
+        return os.path.join(self._path, f"{key}.lock")
+
+    def _blob_path(self, digest):
+        return os.path.join(self._path, "blobs", digest)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}(path={self._path})>"
@@ -1,4 +1,12 @@
+import functools
+import shutil
+import tempfile
+import weakref
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from collector.cache import ResponseCache
 
 
 class WebClientError(Exception):
@@ -10,13 +18,97 @@ class WebClientError(Exception):
 
 
 class WebClient:
+    chunk_size = 1024 * 1024
+
+    def __init__(self, cache=None, session=None, timeout=None):
+        self._cache = cache
+        self._session = session or create_session()
+        self._timeout = timeout
+        self._downloads = None
+
     def get(self, url, params=None):
-        res = requests.get(url, params=params)
+        if self._cache is not None:
+            with self._cache.lock(url, params):
+                self._fetch(self._cache, url, params)
+                return self._cache.load(url, params)
+
+        res = self._session.get(url, params=params, timeout=self._timeout)
 
         if res.status_code != 200:
             raise WebClientError(f"Request to {url} failed", res.status_code, res.text)
 
         return res.text
 
+    def download(self, url, params=None):
+        cache = self._cache or self._download_cache()
+
+        with cache.lock(url, params):
+            self._fetch(cache, url, params)
+            return cache.path(url, params)
+
+    def _fetch(self, cache, url, params):
+        if cache.fresh(url, params):
+            return
+
+        headers = cache.headers(url, params)
+        res = self._request(url, params, headers)
+
+        if res.status_code == 304 and headers:
+            cache.refresh(url, params)
+            if cache.path(url, params) is not None:
+                return
+            res = self._request(url, params)
+
+        if res.status_code != 200:
+            raise WebClientError(f"Request to {url} failed", res.status_code, res.text)
+
+        cache.save(
+            url, params, res.iter_content(self.chunk_size), res.headers, res.encoding
+        )
+
+    def _request(self, url, params, headers=None):
+        return self._session.get(
+            url, params=params, headers=headers, stream=True, timeout=self._timeout
+        )
+
+    def _download_cache(self):
+        if self._downloads is None:
+            path = tempfile.mkdtemp(prefix="collector-")
+            weakref.finalize(self, shutil.rmtree, path, ignore_errors=True)
+            self._downloads = ResponseCache(path)
+        return self._downloads
+
     def __repr__(self):
         return f"<{self.__class__.__name__}()>"
+
+
+def create_session(pool_size=10, keep_alive=True):
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+
+    return session
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_session(pool_size=10, keep_alive=True):
+    return create_session(pool_size, keep_alive)
+
+
+def create_client(config=None, run_id=None):
+    config = config or {}
+
+    session = _shared_session(**config.get("session", {}))
+    timeout = config.get("timeout")
+    if timeout is not None:
+        timeout = (timeout["connect"], timeout["read"])
+
+    cache = config.get("cache")
+    if cache is not None:
+        cache = ResponseCache(**{"run_id": run_id, **cache})
+
+    return WebClient(cache, session, timeout)
@@ -0,0 +1,155 @@
+import threading
+
+import pandas as pd
+
+
+class CsvCodec:
+    extension = ".csv"
+
+    def read(self, store, path, **kwargs):
+        with store.open(path, "r") as handle:
+            return pd.read_csv(handle, **kwargs)
+
+    def write(self, store, data, path, **kwargs):
+        with store.open(path, "w") as handle:
+            data.to_csv(handle, **kwargs)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}()>"
+
+
+class JsonCodec:
+    extension = ".json"
+
+    def read(self, store, path, **kwargs):
+        with store.open(path, "r") as handle:
+            return pd.read_json(handle, **kwargs)
+
+    def write(self, store, data, path, **kwargs):
+        kwargs.pop("index", None)
+        with store.open(path, "w") as handle:
+            data.to_json(handle, orient="records", **kwargs)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}()>"
+
+
+class ParquetCodec:
+    extension = ".parquet"
+
+    def read(self, store, path, **kwargs):
+        with store.open(path, "rb") as handle:
+            return pd.read_parquet(handle, **kwargs)
+
+    def write(self, store, data, path, **kwargs):
+        with store.open(path, "wb") as handle:
+            data.to_parquet(handle, **kwargs)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}()>"
+
+
+class FeatherCodec:
+    extension = ".feather"
+
+    def read(self, store, path, **kwargs):
+        with store.open(path, "rb") as handle:
+            return pd.read_feather(handle, **kwargs)
+
+    def write(self, store, data, path, **kwargs):
+        kwargs.pop("index", None)
+        with store.open(path, "wb") as handle:
+            data.reset_index(drop=True).to_feather(handle, **kwargs)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}()>"
+
+
+class Frames:
+    # Frames are shared by the tasks of a pipeline, which run on several threads.
+    # Frames that are never read are dropped oldest first above the limit.
+
+    def __init__(self, limit=512):
+        self._frames = {}
+        self._limit = limit
+        self._lock = threading.Lock()
+
+    def put(self, path, data):
+        with self._lock:
+            self._frames.pop(path, None)
+            self._frames[path] = data
+            while len(self._frames) > self._limit:
+                self._frames.pop(next(iter(self._frames)))
+
+    def pop(self, path):
+        with self._lock:
+            return self._frames.pop(path, None)
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._frames))
+
+    def __len__(self):
+        with self._lock:
+            return len(self._frames)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}(limit={self._limit})>"
+
+
+class HandoffCodec:
+    # Frames are handed to the first reader only, later reads use the store
+
+    def __init__(self, codec, frames):
+        self._codec = codec
+        self._frames = frames
+        self.extension = codec.extension
+
+    def read(self, store, path, **kwargs):
+        if self._frames is not None and not kwargs:
+            data = self._frames.pop(path)
+            if data is not None:
+                return data
+        return self._codec.read(store, path, **kwargs)
+
+    def write(self, store, data, path, **kwargs):
+        self._codec.write(store, data, path, **kwargs)
+        if self._frames is None:
+            return
+
+        if kwargs.get("index", True) is False:
+            self._frames.put(path, data.reset_index(drop=True))
+        else:
+            self._frames.pop(path)
+
+    def __getstate__(self):
+        # Frames stay in the pipeline process, workers only use the store
+        return {**self.__dict__, "_frames": None}
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}(codec={self._codec})>"
+
+
+CODECS = {
+    "csv": CsvCodec,
+    "json": JsonCodec,
+    "parquet": ParquetCodec,
+    "feather": FeatherCodec,
+}
+
+
+def get_codec(name):
+    if name not in CODECS:
+        raise ValueError(f"Unknown format {name}")
+    return CODECS[name]()
+
+
+def get_dataset_codec(config, dataset, stage):
+    formats = (config or {}).get("formats", {})
+    return get_codec(formats.get(dataset, {}).get(stage, "csv"))
+
+
+def handoff(codec, frames=None):
+    if frames is None:
+        return codec
+    return HandoffCodec(codec, frames)
@@ -0,0 +1,54 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import logging
+import multiprocessing
+
+log = logging.getLogger(__name__)
+
+_func = None
+
+
+class ExecutionError(Exception):
+    def __init__(self, errors):
+        super().__init__(f"Execution failed for {len(errors)} item(s)")
+        self.errors = errors
+
+
+def execute(func, items, workers=1):
+    results = {}
+    errors = {}
+
+    if workers > 1:
+        # Ship the function once per worker instead of with every item, and
+        # spawn the workers since tasks can run in threads of the pipeline
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_initialize,
+            initargs=(func,),
+        ) as executor:
+            futures = {executor.submit(_call, item): item for item in items}
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as error:  # pylint: disable=broad-except
+                    errors[futures[future]] = error
+    else:
+        for item in items:
+            try:
+                results[item] = func(item)
+            except Exception as error:  # pylint: disable=broad-except
+                errors[item] = error
+
+    for (item, error) in errors.items():
+        log.error("Execution failed for %s: %r", item, error)
+
+    return [(item, results[item]) for item in items if item in results], errors
+
+
+def _initialize(func):
+    global _func  # pylint: disable=global-statement
+    _func = func
+
+
+def _call(item):
+    return _func(item)
@@ -0,0 +1,126 @@
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import logging
+import time
+
+log = logging.getLogger(__name__)
+
+Node = namedtuple("Node", ["name", "func", "reads", "writes"])
+Timing = namedtuple("Timing", ["start", "end"])
+
+
+class GraphError(Exception):
+    def __init__(self, errors, skipped):
+        super().__init__(
+            f"Execution failed for {len(errors)} task(s), "
+            f"skipped {len(skipped)} dependent task(s)"
+        )
+        self.errors = errors
+        self.skipped = skipped
+
+
+def dependencies(nodes):
+    return {
+        node.name: {
+            other.name
+            for other in nodes
+            if other.name != node.name and set(node.reads) & set(other.writes)
+        }
+        for node in nodes
+    }
+
+
+def run_graph(nodes, workers=1):
+    requires = dependencies(nodes)
+
+    timings = {}
+    errors = {}
+    skipped = set()
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            _submit(executor, nodes, requires, timings, errors, skipped, running)
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                timings[name], error = future.result()
+                if error is not None:
+                    log.error("Execution failed for %s: %r", name, error)
+                    errors[name] = error
+
+    remaining = {node.name for node in nodes} - set(timings) - skipped
+    if remaining:
+        raise ValueError(f"Dependency cycle between {', '.join(sorted(remaining))}")
+
+    _log_summary(timings, critical_path(requires, timings))
+
+    if errors:
+        raise GraphError(errors, skipped)
+
+    return timings
+
+
+def critical_path(requires, timings):
+    if not timings:
+        return []
+
+    path = [max(timings, key=lambda name: timings[name].end)]
+    while True:
+        previous = [name for name in requires[path[0]] if name in timings]
+        if not previous:
+            return path
+        path.insert(0, max(previous, key=lambda name: timings[name].end))
+
+
+def _submit(executor, nodes, requires, timings, errors, skipped, running):
+    changed = True
+    while changed:
+        changed = False
+        for node in nodes:
+            name = node.name
+            if name in timings or name in skipped or name in running.values():
+                continue
+
+            if requires[name] & (set(errors) | skipped):
+                log.warning("Skipping %s", name)
+                skipped.add(name)
+                changed = True
+            elif requires[name] <= set(timings) - set(errors):
+                log.info("Starting %s", name)
+                running[executor.submit(_timed, node.func)] = name
+
+
+def _timed(func):
+    start = time.monotonic()
+    try:
+        func()
+        error = None
+    except Exception as exception:  # pylint: disable=broad-except
+        error = exception
+    return Timing(start, time.monotonic()), error
+
+
+def _log_summary(timings, path):
+    if not timings:
+        return
+
+    start = min(timing.start for timing in timings.values())
+    end = max(timing.end for timing in timings.values())
+
+    for (name, timing) in sorted(timings.items(), key=lambda item: item[1].start):
+        log.info(
+            "%s took %.2fs (started at %.2fs)",
+            name,
+            timing.end - timing.start,
+            timing.start - start,
+        )
+    log.info(
+        "Critical path %s took %.2fs of %.2fs",
+        " -> ".join(path),
+        sum(timings[name].end - timings[name].start for name in path),
+        end - start,
+    )
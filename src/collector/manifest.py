@@ -0,0 +1,72 @@
+import hashlib
+import json
+
+
+class Manifest:
+    def __init__(self, store, path):
+        self._store = store
+        self._path = path
+        self._entries = {}
+        self._hashes = {}
+
+    def load(self):
+        try:
+            with self._store.open(self._path, "r") as handle:
+                self._entries = json.load(handle)
+        except FileNotFoundError:
+            self._entries = {}
+
+    def save(self):
+        with self._store.open(self._path, "w") as handle:
+            json.dump(self._entries, handle, indent=2, sort_keys=True)
+
+    def changed(self, path, output=None):
+        entry = self._entries.get(path)
+        if entry is None:
+            return True
+
+        # Regenerate outputs that are now written elsewhere, like another format
+        if output is not None and entry.get("output") != output:
+            return True
+
+        # Regenerate outputs that were removed or truncated since the last run
+        if entry.get("output") is not None:
+            try:
+                output = self._store.stat(entry["output"])
+            except FileNotFoundError:
+                return True
+            if output.size != entry.get("output_size", output.size):
+                return True
+
+        stat = self._store.stat(path)
+        if stat.size == entry["size"] and stat.mtime == entry["mtime"]:
+            return False
+
+        return self._hash(path) != entry["hash"]
+
+    def update(self, path, output):
+        stat = self._store.stat(path)
+        self._entries[path] = {
+            "size": stat.size,
+            "mtime": stat.mtime,
+            "hash": self._hash(path),
+            "output": output,
+            "output_size": self._store.stat(output).size,
+        }
+
+    def prune(self, paths):
+        # Forget raw files that are no longer listed
+        paths = set(paths)
+        self._entries = {
+            path: entry for (path, entry) in self._entries.items() if path in paths
+        }
+
+    def _hash(self, path):
+        if path not in self._hashes:
+            with self._store.open(path, "r") as handle:
+                digest = hashlib.sha256(handle.read().encode("utf8"))
+            self._hashes[path] = digest.hexdigest()
+        return self._hashes[path]
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}(path={self._path})>"
@@ -0,0 +1,90 @@
+import hashlib
+import importlib
+import inspect
+import json
+
+# Modules whose code changes the output of every task
+HELPERS = ["collector.codec", "collector.utils"]
+
+
+class Memo:
+    def __init__(self, store, path):
+        self._store = store
+        self._path = path
+        self._entries = {"files": {}, "fingerprint": None}
+        self._previous = None
+
+    def load(self):
+        try:
+            with self._store.open(self._path, "r") as handle:
+                self._entries = json.load(handle)
+        except FileNotFoundError:
+            self._entries = {"files": {}, "fingerprint": None}
+
+        self._previous = None
+        if self._entries.get("fingerprint") is not None:
+            self._previous = {
+                "base": self._entries.get("base"),
+                "files": dict(self._entries.get("files", {})),
+            }
+
+    def save(self):
+        with self._store.open(self._path, "w") as handle:
+            json.dump(self._entries, handle, indent=2, sort_keys=True)
+
+    def fingerprint(self, paths, config, code):
+        base = hashlib.sha256()
+        base.update(json.dumps(config, sort_keys=True, default=str).encode("utf8"))
+        base.update(self._code_hash(code).encode("utf8"))
+
+        self._entries["base"] = base.hexdigest()
+        digest = hashlib.sha256(self._entries["base"].encode("utf8"))
+
+        files = {}
+        for path in sorted(paths):
+            files[path] = self._file_entry(path)
+            digest.update(f"{path}:{files[path]['hash']}".encode("utf8"))
+
+        self._entries["files"] = files
+        return digest.hexdigest()
+
+    def matches(self, fingerprint):
+        return self._entries.get("fingerprint") == fingerprint
+
+    def added(self):
+        # Paths added since the last update, or None when anything else changed
+        if self._previous is None or self._previous["base"] != self._entries["base"]:
+            return None
+
+        files = self._entries["files"]
+        for (path, entry) in self._previous["files"].items():
+            if files.get(path, {}).get("hash") != entry["hash"]:
+                return None
+
+        return sorted(set(files) - set(self._previous["files"]))
+
+    def update(self, fingerprint):
+        self._entries["fingerprint"] = fingerprint
+
+    def _file_entry(self, path):
+        stat = self._store.stat(path)
+        entry = self._entries.get("files", {}).get(path)
+        if entry and entry["size"] == stat.size and entry["mtime"] == stat.mtime:
+            return entry
+
+        digest = hashlib.sha256()
+        with self._store.open(path, "rb") as handle:
+            for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+                digest.update(chunk)
+
+        return {"size": stat.size, "mtime": stat.mtime, "hash": digest.hexdigest()}
+
+    def _code_hash(self, code):
+        digest = hashlib.sha256()
+        for module in [inspect.getmodule(code), *map(importlib.import_module, HELPERS)]:
+            digest.update(inspect.getsource(module).encode("utf8"))
+
+        return digest.hexdigest()
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}(path={self._path})>"
@@ -0,0 +1,153 @@
+from collections import defaultdict
+from contextlib import contextmanager
+import json
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+
+_active = None
+
+
+def count(logger, name, value=1):
+    if _active is not None:
+        _active.count(logger, name, value)
+
+
+@contextmanager
+def record(path, trace_memory=None):
+    if path is None:
+        yield None
+        return
+
+    # Tracing memory slows down allocations, so it is only enabled on request
+    if trace_memory is None:
+        value = os.environ.get("COLLECTOR_TRACE_MEMORY", "")
+        trace_memory = value.lower() not in ("", "0", "false", "no")
+
+    metrics = Metrics(trace_memory=trace_memory)
+    metrics.start()
+    try:
+        yield metrics
+    finally:
+        metrics.stop()
+        metrics.save(path)
+
+
+class Metrics(logging.Handler):
+    # Every log message of a task starts a new stage, which lasts until the next
+    # message on the same thread. Stages are grouped by their unformatted message.
+
+    def __init__(self, logger="collector", trace_memory=False):
+        super().__init__(logging.DEBUG)
+        self._logger = logging.getLogger(logger)
+        self._level = None
+        self._trace_memory = trace_memory
+        self._lock = threading.Lock()
+        self._start = None
+        self._end = None
+        self._open = {}
+        self._stages = {}
+        self._counters = defaultdict(lambda: defaultdict(int))
+
+    def start(self):
+        global _active  # pylint: disable=global-statement
+
+        if self._trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+        self._level = self._logger.level
+        if not self._logger.isEnabledFor(logging.INFO):
+            self._logger.setLevel(logging.INFO)
+        self._logger.addHandler(self)
+
+        self._start = time.perf_counter()
+        _active = self
+
+    def stop(self):
+        global _active  # pylint: disable=global-statement
+
+        _active = None
+        self._logger.removeHandler(self)
+        self._logger.setLevel(self._level)
+
+        with self._lock:
+            for thread in list(self._open):
+                self._close(thread)
+        self._end = time.perf_counter()
+
+        if self._trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def emit(self, log_record):  # pylint: disable=arguments-renamed
+        if log_record.levelno < logging.INFO:
+            return
+
+        with self._lock:
+            self._close(log_record.thread)
+            # Python 3.8 has no reset_peak, stages then report the overall peak
+            if self._trace_memory and hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+            self._open[log_record.thread] = (
+                log_record.name,
+                log_record.msg,
+                time.perf_counter(),
+            )
+
+    def count(self, logger, name, value=1):
+        with self._lock:
+            self._counters[logger][name] += value
+
+    def report(self):
+        end = self._end if self._end is not None else time.perf_counter()
+
+        return {
+            "duration": end - self._start,
+            "peak_rss": _peak_rss(),
+            "stages": [
+                {"logger": logger, "stage": stage, **values}
+                for ((logger, stage), values) in self._stages.items()
+            ],
+            "counters": {
+                logger: dict(counters) for (logger, counters) in self._counters.items()
+            },
+        }
+
+    def save(self, path):
+        with open(path, "w", encoding="utf8") as handle:
+            json.dump(self.report(), handle, indent=2)
+
+    def _close(self, thread):
+        if thread not in self._open:
+            return
+
+        logger, stage, start = self._open.pop(thread)
+        values = self._stages.setdefault(
+            (logger, stage),
+            {"calls": 0, "duration": 0.0, "peak_traced": None, "peak_rss": None},
+        )
+        values["calls"] += 1
+        values["duration"] += time.perf_counter() - start
+        values["peak_rss"] = _peak_rss()
+        if self._trace_memory and tracemalloc.is_tracing():
+            peak = tracemalloc.get_traced_memory()[1]
+            values["peak_traced"] = max(values["peak_traced"] or 0, peak)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}()>"
+
+
+def _peak_rss():
+    # Linux reports kilobytes, macOS reports bytes
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
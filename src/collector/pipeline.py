@@ -0,0 +1,133 @@
+from functools import partial
+import logging
+
+from collector.codec import Frames
+from collector.graph import Node, run_graph
+from collector import profiler
+
+from collector.tasks.get_national_dataset.task import GetNationalDataset
+from collector.tasks.get_municipality_dataset.task import GetMunicipalityDataset
+from collector.tasks.get_intensive_care_dataset.task import GetIntensiveCareDataset
+from collector.tasks.clean_national_dataset.task import CleanNationalDataset
+from collector.tasks.clean_municipality_dataset.task import CleanMunicipalityDataset
+from collector.tasks.clean_intensive_care_dataset.task import (
+    CleanIntensiveCareDataset,
+)
+from collector.tasks.merge_national_dataset.task import MergeNationalDataset
+from collector.tasks.merge_municipality_dataset.task import MergeMunicipalityDataset
+from collector.tasks.merge_intensive_care_dataset.task import (
+    MergeIntensiveCareDataset,
+)
+
+log = logging.getLogger(__name__)
+
+DATASETS = {
+    "national": [
+        (GetNationalDataset, {"output_folder": "raw/national"}),
+        (
+            CleanNationalDataset,
+            {"input_folder": "raw/national", "output_folder": "interim/national"},
+        ),
+        (
+            MergeNationalDataset,
+            {
+                "name": "rivm-covid-19-national",
+                "input_folder": "interim/national",
+                "output_folder": "processed",
+            },
+        ),
+    ],
+    "municipality": [
+        (GetMunicipalityDataset, {"output_folder": "raw/municipality"}),
+        (
+            CleanMunicipalityDataset,
+            {
+                "input_folder": "raw/municipality",
+                "output_folder": "interim/municipality",
+            },
+        ),
+        (
+            MergeMunicipalityDataset,
+            {
+                "name": "rivm-covid-19-municipality",
+                "input_folder": "interim/municipality",
+                "output_folder": "processed",
+            },
+        ),
+    ],
+    "intensive_care": [
+        (GetIntensiveCareDataset, {"output_folder": "raw/intensive-care"}),
+        (
+            CleanIntensiveCareDataset,
+            {
+                "input_folder": "raw/intensive-care",
+                "output_folder": "interim/intensive-care",
+            },
+        ),
+        (
+            MergeIntensiveCareDataset,
+            {
+                "name": "nice-covid-19-intensive-care",
+                "input_folder": "interim/intensive-care",
+                "output_folder": "processed",
+            },
+        ),
+    ],
+}
+
+
+class Pipeline:
+    def __init__(self, config, client, store):
+        self._config = config
+        self._client = client
+        self._store = store
+        self._frames = Frames()
+
+    def run(self, datasets, full=False, workers=1, jobs=1, profile=False):
+        log.info("Running %s pipelines", ", ".join(datasets))
+        return run_graph(self.create_nodes(datasets, full, workers, profile), jobs)
+
+    def create_nodes(self, datasets, full=False, workers=1, profile=False):
+        return [
+            Node(
+                task.__name__,
+                partial(self.run_task, task, inputs, full, workers, profile),
+                _reads(inputs),
+                _writes(inputs),
+            )
+            for dataset in datasets
+            for (task, inputs) in DATASETS[dataset]
+        ]
+
+    def run_task(self, task, inputs, full=False, workers=1, profile=False):
+        log.info("Running %s", task.__name__)
+        if "full" in task.inputs_schema["properties"]:
+            inputs = {**inputs, "full": full}
+        if "workers" in task.inputs_schema["properties"]:
+            inputs = {**inputs, "workers": workers}
+
+        # Profile inside the task thread, profilers only follow their own thread
+        with profiler.profile(task.__name__, profile):
+            return self.create_task(task)(**inputs)
+
+    def create_task(self, task):
+        if task in (GetNationalDataset, GetMunicipalityDataset):
+            return task(self._config, self._client, self._store, self._frames)
+        if task is GetIntensiveCareDataset:
+            return task(self._config, self._client, self._store)
+        return task(self._config, self._store, self._frames)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}()>"
+
+
+def _reads(inputs):
+    if "input_folder" in inputs:
+        return [inputs["input_folder"]]
+    return []
+
+
+def _writes(inputs):
+    if "name" in inputs:
+        return [f"{inputs['output_folder']}/{inputs['name']}"]
+    return [inputs["output_folder"]]
@@ -0,0 +1,94 @@
+from collections import defaultdict
+from contextlib import contextmanager
+import cProfile
+import datetime
+import io
+import logging
+import os
+import pstats
+import sys
+
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+log = logging.getLogger(__name__)
+
+
+def enabled(flag=False):
+    value = os.environ.get("COLLECTOR_PROFILE", "")
+    return flag or value.lower() not in ("", "0", "false", "no")
+
+
+@contextmanager
+def profile(name, flag=False, folder=None, top=20, sampling=None):
+    if not enabled(flag):
+        yield None
+        return
+
+    folder = folder or os.environ.get("COLLECTOR_PROFILE_DIR", "profiles")
+    os.makedirs(folder, exist_ok=True)
+
+    timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(folder, f"{name}-{timestamp}")
+
+    # Prefer the sampling profiler, its overhead does not grow with call counts
+    sampling = pyinstrument is not None if sampling is None else sampling
+    if sampling:
+        profiler = pyinstrument.Profiler()
+        profiler.start()
+        try:
+            yield profiler
+        finally:
+            profiler.stop()
+            _save_sampling(profiler.last_session.root_frame(), path, top)
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield profiler
+        finally:
+            profiler.disable()
+            _save_deterministic(profiler, path, top)
+
+
+def _save_deterministic(profiler, path, top):
+    profiler.dump_stats(f"{path}.prof")
+    log.info("Stored profile in %s.prof", path)
+
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats("cumulative").print_stats(top)
+    print(stream.getvalue(), file=sys.stderr)
+
+
+def _save_sampling(root, path, top):
+    lines = []
+    totals = defaultdict(float)
+    if root is not None:
+        _collapse(root, [], lines, totals)
+
+    # Collapsed stacks, one "frame;frame;frame microseconds" line per stack
+    with open(f"{path}.collapsed", "w", encoding="utf8") as handle:
+        handle.writelines(f"{line}\n" for line in lines)
+    log.info("Stored profile in %s.collapsed", path)
+
+    print(f"{'cumtime':>10}  function", file=sys.stderr)
+    for (function, total) in sorted(totals.items(), key=lambda item: -item[1])[:top]:
+        print(f"{total:10.3f}  {function}", file=sys.stderr)
+
+
+def _collapse(frame, stack, lines, totals):
+    function = f"{frame.function} ({frame.file_path_short}:{frame.line_no})"
+
+    # Count recursive calls once in the cumulative time
+    if function not in stack:
+        totals[function] += frame.time
+
+    stack = [*stack, function]
+    if frame.total_self_time > 0:
+        lines.append(f"{';'.join(stack)} {round(frame.total_self_time * 1e6)}")
+
+    for child in frame.children:
+        _collapse(child, stack, lines, totals)
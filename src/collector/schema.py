@@ -18,5 +18,27 @@ def string():
     return {"type": "string"}
 
 
+def iso_date():
+    return {"type": "string", "pattern": r"^\d{4}-\d{2}-\d{2}$", "format": "date"}
+
+
+def integer(default=None, minimum=None):
+    schema = {"type": "integer"}
+    if default is not None:
+        schema["default"] = default
+    if minimum is not None:
+        schema["minimum"] = minimum
+    return schema
+
+
+def boolean(default=False):
+    return {"type": "boolean", "default": default}
+
+
+def optional(schema):
+    return {**schema, "type": [schema["type"], "null"], "default": None}
+
+
 def obj(**properties):
-    return {"type": "object", "properties": properties, "required": properties.keys()}
+    required = [name for (name, value) in properties.items() if "default" not in value]
+    return {"type": "object", "properties": properties, "required": required}
@@ -1,24 +1,292 @@
-from contextlib import contextmanager
+from collections import defaultdict, namedtuple
+from contextlib import ExitStack, contextmanager
+import bisect
+import bz2
+import filecmp
+import fnmatch
 import glob
+import gzip
+import io
 import os
 import re
+import sqlite3
+import threading
+import time
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+FileStat = namedtuple("FileStat", ["size", "mtime"])
+
+_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_PARTITIONED = re.compile(r"(.*/)?(\d{4})/(\d{2})/(\2-\3-\d{2}[^/]*)")
+
+
+def _open_gzip(handle, mode):
+    # Leave the name and time out of the header so equal data gives equal files
+    return gzip.GzipFile(filename="", mode=mode, fileobj=handle, mtime=0)
+
+
+def _open_bz2(handle, mode):
+    return bz2.BZ2File(handle, mode)
+
+
+def _open_zstd(handle, mode):
+    if zstandard is None:
+        raise ValueError("Compression zst requires the zstandard package")
+    if "w" in mode:
+        return zstandard.ZstdCompressor().stream_writer(handle)
+    return zstandard.ZstdDecompressor().stream_reader(handle)
+
+
+COMPRESSIONS = {
+    "gz": _open_gzip,
+    "bz2": _open_bz2,
+    "zst": _open_zstd,
+}
 
 
 class LocalStore:
-    def __init__(self, base_path):
+    def __init__(self, base_path, compression=None, partition=None):
+        # Compression applies to the whole store or per top level folder
+        if not isinstance(compression, dict):
+            compression = {"": compression}
+        for value in compression.values():
+            if value is not None and value not in COMPRESSIONS:
+                raise ValueError(f"Unknown compression {value}")
+
         self._base_path = base_path
+        self._compression = compression
+        self._partition = {_normalize(folder) for folder in partition or []}
+        self._index = {}
+        self._index_lock = threading.Lock()
 
     @contextmanager
     def open(self, path, mode, *args, **kwargs):
-        expanded_path = os.path.join(self._base_path, path)
-        if self._is_write_mode(mode):
-            self._ensure_dir_exists(expanded_path)
-        with open(expanded_path, mode, encoding="utf8", *args, **kwargs) as handle:
-            yield handle
+        partitioned_path = _partitioned(path, self._partition)
+        flat_path = os.path.join(self._base_path, path)
+        expanded_path = os.path.join(self._base_path, partitioned_path)
+        if "b" not in mode:
+            kwargs["encoding"] = "utf8"
+
+        if not self._is_write_mode(mode):
+            expanded_path = self._resolve(expanded_path, flat_path)
+            with self._open(
+                expanded_path, expanded_path, mode, *args, **kwargs
+            ) as handle:
+                yield handle
+            return
+
+        compression = self._compression.get(
+            path.split("/")[0], self._compression.get("")
+        )
+        if compression is not None and not _compression(expanded_path):
+            expanded_path = f"{expanded_path}.{compression}"
+
+        self._ensure_dir_exists(expanded_path)
+        temp_path = f"{expanded_path}.{os.getpid()}-{threading.get_ident()}.tmp"
+        try:
+            with self._open(temp_path, expanded_path, mode, *args, **kwargs) as handle:
+                yield handle
+            self._commit(temp_path, expanded_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        # Remove other copies of the file, otherwise reads could pick a stale one
+        others = [*self._variants(expanded_path), *self._variants(flat_path)]
+        for other in dict.fromkeys(others):
+            if other != expanded_path and os.path.exists(other):
+                os.remove(other)
+
+        with self._index_lock:
+            for folder in (os.path.dirname(path), os.path.dirname(partitioned_path)):
+                self._index.pop(_normalize(folder), None)
 
     def list(self, path):
         expanded_path = os.path.join(self._base_path, path)
-        return glob.glob(expanded_path)
+        patterns = [expanded_path]
+
+        # Partitioned folders are also searched in the month folders that can
+        # hold the name, the files are listed under their flat path
+        folder, name = os.path.split(_normalize(path))
+        if folder in self._partition:
+            month = "[0-9][0-9][0-9][0-9]/[0-9][0-9]"
+            if _DATE.match(name):
+                month = f"{name[0:4]}/{name[5:7]}"
+            patterns.append(os.path.join(self._base_path, folder, month, name))
+
+        # Compressed files are listed under their uncompressed name
+        files = []
+        for pattern in patterns:
+            for file in glob.glob(f"{pattern}*"):
+                compression = _compression(file)
+                if compression:
+                    file = file[: -len(compression) - 1]
+                if pattern != expanded_path:
+                    file = os.path.join(
+                        os.path.dirname(expanded_path), os.path.basename(file)
+                    )
+                if fnmatch.fnmatchcase(file, expanded_path):
+                    files.append(file)
+
+        return list(dict.fromkeys(files))
+
+    def stat(self, path):
+        expanded_path = self._resolve(
+            os.path.join(self._base_path, _partitioned(path, self._partition)),
+            os.path.join(self._base_path, path),
+        )
+        result = os.stat(expanded_path)
+        return FileStat(result.st_size, result.st_mtime)
+
+    def latest(self, folder, pattern="*"):
+        folder = _normalize(folder)
+
+        # Flat files are checked as well, they remain until a relayout moves them
+        (latest, files) = (None, [])
+        for directory in [folder, *reversed(self._partitions(folder))]:
+            (dates, dated) = self._dated(directory)
+            for date in reversed(dates):
+                if latest is not None and date < latest:
+                    break
+
+                matches = [file for file in dated[date] if _match_name(file, pattern)]
+                if matches:
+                    files = files + matches if date == latest else matches
+                    latest = date
+                    break
+
+            # Older month folders only hold older dates
+            month = directory[-7:].replace("/", "-")
+            if directory != folder and latest is not None and latest[0:7] >= month:
+                break
+
+        return self._flat(folder, files)
+
+    def range(self, folder, since=None, until=None, pattern="*"):
+        folder = _normalize(folder)
+
+        files = []
+        for directory in [folder, *self._partitions(folder, since, until)]:
+            (dates, dated) = self._dated(directory)
+            start = bisect.bisect_left(dates, since) if since else 0
+            end = bisect.bisect_right(dates, until) if until else len(dates)
+            files += [
+                file
+                for date in dates[start:end]
+                for file in dated[date]
+                if _match_name(file, pattern)
+            ]
+
+        return self._flat(folder, files)
+
+    def _partitions(self, folder, since=None, until=None):
+        # Month folders of a partitioned folder, only those in range are listed
+        if folder not in self._partition:
+            return []
+
+        partitions = []
+        for year in self._subfolders(folder, r"\d{4}"):
+            for month in self._subfolders(f"{folder}/{year}", r"\d{2}"):
+                if since and f"{year}-{month}" < since[0:7]:
+                    continue
+                if until and f"{year}-{month}" > until[0:7]:
+                    continue
+                partitions.append(f"{folder}/{year}/{month}")
+
+        return partitions
+
+    def _subfolders(self, folder, pattern):
+        try:
+            entries = list(os.scandir(os.path.join(self._base_path, folder)))
+        except FileNotFoundError:
+            return []
+
+        return sorted(
+            entry.name
+            for entry in entries
+            if entry.is_dir() and re.fullmatch(pattern, entry.name)
+        )
+
+    def _flat(self, folder, files):
+        # List files under their flat path, sorted by date and name
+        expanded_path = os.path.join(self._base_path, folder)
+        names = sorted({os.path.basename(file) for file in files})
+        return [os.path.join(expanded_path, name) for name in names]
+
+    def _dated(self, folder):
+        # Dated files per folder, rebuilt when the folder changes on disk
+        folder = _normalize(folder)
+        expanded_path = os.path.join(self._base_path, folder)
+        try:
+            mtime = os.stat(expanded_path).st_mtime_ns
+        except FileNotFoundError:
+            return ([], {})
+
+        with self._index_lock:
+            entry = self._index.get(folder)
+        if entry is not None and entry[0] == mtime:
+            return entry[1]
+
+        files = []
+        for name in os.listdir(expanded_path):
+            compression = _compression(name)
+            if compression:
+                name = name[: -len(compression) - 1]
+            if not name.endswith(".tmp"):
+                files.append(os.path.join(expanded_path, name))
+
+        files = _group_dates(files)
+        index = (sorted(files), files)
+        with self._index_lock:
+            self._index[folder] = (mtime, index)
+        return index
+
+    def _resolve(self, *paths):
+        for path in paths:
+            for variant in self._variants(path):
+                if os.path.exists(variant):
+                    return variant
+        return paths[0]
+
+    def _variants(self, path):
+        compression = _compression(path)
+        if compression:
+            path = path[: -len(compression) - 1]
+
+        return [path, *(f"{path}.{compression}" for compression in COMPRESSIONS)]
+
+    @contextmanager
+    def _open(self, path, name, mode, *args, **kwargs):
+        compression = _compression(name)
+        if not compression:
+            with open(path, mode, *args, **kwargs) as handle:
+                yield handle
+            return
+
+        # Stream through the (de)compressor, wrapped in a text layer if needed
+        binary_mode = mode.replace("t", "").replace("b", "") + "b"
+        with ExitStack() as stack:
+            handle = stack.enter_context(open(path, binary_mode))
+            handle = stack.enter_context(COMPRESSIONS[compression](handle, binary_mode))
+            if "b" not in mode:
+                handle = stack.enter_context(
+                    io.TextIOWrapper(
+                        handle,
+                        encoding=kwargs.get("encoding"),
+                        newline=kwargs.get("newline"),
+                    )
+                )
+            yield handle
+
+    def _commit(self, temp_path, path):
+        # Leave identical files untouched so their mtime stays the same
+        if os.path.exists(path) and filecmp.cmp(temp_path, path, shallow=False):
+            return
+        os.replace(temp_path, path)
 
     def _is_write_mode(self, mode):
         return bool(re.match(r"w[+a-z]*", mode))
@@ -29,5 +297,429 @@ class LocalStore:
         except OSError:
             pass
 
+    def __getstate__(self):
+        # Worker processes build their own index
+        return {
+            "_base_path": self._base_path,
+            "_compression": self._compression,
+            "_partition": self._partition,
+        }
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._index = {}
+        self._index_lock = threading.Lock()
+
     def __repr__(self):
         return f"<{self.__class__.__name__}()>"
+
+
+class SqliteStore:
+    # Files are rows indexed by folder, date and name so listing a folder or
+    # looking up the latest day is an index seek instead of a directory scan
+
+    def __init__(self, path):
+        self._path = path
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                "path TEXT PRIMARY KEY, folder TEXT NOT NULL, date TEXT, "
+                "name TEXT NOT NULL, content BLOB NOT NULL, "
+                "size INTEGER NOT NULL, mtime REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS files_folder_date_name "
+                "ON files (folder, date, name)"
+            )
+
+    @contextmanager
+    def open(self, path, mode, *_args, **_kwargs):
+        path = _normalize(path)
+
+        if not self._is_write_mode(mode):
+            row = (
+                self._connection()
+                .execute("SELECT content FROM files WHERE path = ?", (path,))
+                .fetchone()
+            )
+            if row is None:
+                raise FileNotFoundError(f"No such file in store: '{path}'")
+
+            if "b" in mode:
+                yield io.BytesIO(row[0])
+            else:
+                yield io.StringIO(row[0].decode("utf8"), newline=None)
+            return
+
+        handle = io.BytesIO() if "b" in mode else io.StringIO(newline="")
+        yield handle
+
+        content = handle.getvalue()
+        if "b" not in mode:
+            content = content.encode("utf8")
+        self._write(path, content)
+
+    def list(self, path):
+        path = _normalize(path)
+        folder, name = os.path.split(path)
+
+        if any(char in folder for char in "*?["):
+            rows = self._connection().execute(
+                "SELECT path FROM files WHERE path GLOB ? ORDER BY path", (path,)
+            )
+            return [row[0] for row in rows if _match(row[0], path)]
+
+        rows = self._connection().execute(
+            "SELECT path, name FROM files WHERE folder = ? ORDER BY date, name",
+            (folder,),
+        )
+        return [row[0] for row in rows if _match(row[1], name)]
+
+    def stat(self, path):
+        row = (
+            self._connection()
+            .execute(
+                "SELECT size, mtime FROM files WHERE path = ?", (_normalize(path),)
+            )
+            .fetchone()
+        )
+        if row is None:
+            raise FileNotFoundError(f"No such file in store: '{path}'")
+        return FileStat(row[0], row[1])
+
+    def latest(self, folder, pattern="*"):
+        folder = _normalize(folder)
+        rows = self._connection().execute(
+            "SELECT path FROM files WHERE folder = ? AND name GLOB ? AND date = "
+            "(SELECT MAX(date) FROM files WHERE folder = ? AND name GLOB ?) "
+            "ORDER BY name",
+            (folder, pattern, folder, pattern),
+        )
+        return [row[0] for row in rows]
+
+    def range(self, folder, since=None, until=None, pattern="*"):
+        rows = self._connection().execute(
+            "SELECT path FROM files WHERE folder = ? AND name GLOB ? "
+            "AND date >= ? AND date <= ? ORDER BY date, name",
+            (
+                _normalize(folder),
+                pattern,
+                since or "0000-00-00",
+                until or "9999-99-99",
+            ),
+        )
+        return [row[0] for row in rows]
+
+    def _write(self, path, content):
+        folder, name = os.path.split(path)
+        match = _DATE.match(name)
+
+        with self._connection() as connection:
+            # Leave identical files untouched so their mtime stays the same
+            row = connection.execute(
+                "SELECT content FROM files WHERE path = ?", (path,)
+            ).fetchone()
+            if row is not None and row[0] == content:
+                return
+
+            connection.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    path,
+                    folder,
+                    match.group(0) if match else None,
+                    name,
+                    content,
+                    len(content),
+                    time.time(),
+                ),
+            )
+
+    def _connection(self):
+        # Connections can not be shared between threads
+        if getattr(self._local, "connection", None) is None:
+            self._local.connection = sqlite3.connect(self._path, timeout=60)
+            self._local.connection.execute("PRAGMA journal_mode=WAL")
+        return self._local.connection
+
+    def _is_write_mode(self, mode):
+        return bool(re.match(r"w[+a-z]*", mode))
+
+    def __getstate__(self):
+        # Worker processes open their own connections
+        return {"_path": self._path}
+
+    def __setstate__(self, state):
+        self._path = state["_path"]
+        self._local = threading.local()
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}(path={self._path})>"
+
+
+class InMemoryStore:
+    # Files are buffers in a dict so chained tasks never touch the disk. With a
+    # backing store, missing files are read from it and spill copies the
+    # written files to it.
+
+    def __init__(self, backing=None):
+        self._backing = backing
+        self._files = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def open(self, path, mode, *_args, **_kwargs):
+        path = _normalize(path)
+
+        if not self._is_write_mode(mode):
+            content = self._read(path)
+            if "b" in mode:
+                yield io.BytesIO(content)
+            else:
+                yield io.StringIO(content.decode("utf8"), newline=None)
+            return
+
+        handle = io.BytesIO() if "b" in mode else io.StringIO(newline="")
+        yield handle
+
+        content = handle.getvalue()
+        if "b" not in mode:
+            content = content.encode("utf8")
+
+        with self._lock:
+            # Leave identical files untouched so their mtime stays the same
+            if path in self._files and self._files[path][0] == content:
+                return
+            self._files[path] = (content, time.time())
+            self._dirty.add(path)
+
+    def list(self, path):
+        path = _normalize(path)
+        with self._lock:
+            files = {file for file in self._files if _match(file, path)}
+
+        # Backing stores may prefix their own base path, keep the part that
+        # matched the pattern so files held in both places are listed once
+        if self._backing is not None:
+            depth = path.count("/") + 1
+            for file in self._backing.list(path):
+                files.add("/".join(_normalize(file).split("/")[-depth:]))
+
+        return sorted(files)
+
+    def stat(self, path):
+        path = _normalize(path)
+        with self._lock:
+            entry = self._files.get(path)
+
+        if entry is not None:
+            return FileStat(len(entry[0]), entry[1])
+        if self._backing is not None:
+            return self._backing.stat(path)
+        raise FileNotFoundError(f"No such file in store: '{path}'")
+
+    def latest(self, folder, pattern="*"):
+        files = _group_dates(self.list(f"{folder}/{pattern}"))
+        return files[max(files)] if files else []
+
+    def range(self, folder, since=None, until=None, pattern="*"):
+        files = _group_dates(self.list(f"{folder}/{pattern}"))
+        return [
+            file
+            for date in sorted(files)
+            if (not since or date >= since) and (not until or date <= until)
+            for file in files[date]
+        ]
+
+    def spill(self, target=None):
+        target = target or self._backing
+        if target is None:
+            raise ValueError("No store to spill to")
+
+        with self._lock:
+            files = [(path, self._files[path][0]) for path in sorted(self._dirty)]
+            self._dirty.clear()
+
+        for (path, content) in files:
+            with target.open(path, "wb") as handle:
+                handle.write(content)
+
+        return len(files)
+
+    def _read(self, path):
+        with self._lock:
+            entry = self._files.get(path)
+
+        if entry is not None:
+            return entry[0]
+        if self._backing is None:
+            raise FileNotFoundError(f"No such file in store: '{path}'")
+
+        # Keep files read from the backing store, later tasks read them again
+        with self._backing.open(path, "rb") as handle:
+            content = handle.read()
+        mtime = self._backing.stat(path).mtime
+        with self._lock:
+            self._files.setdefault(path, (content, mtime))
+
+        return content
+
+    def _is_write_mode(self, mode):
+        return bool(re.match(r"w[+a-z]*", mode))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        if self._backing is not None:
+            self.spill()
+
+    def __getstate__(self):
+        # Worker processes would write to a copy that is never seen again
+        raise TypeError(f"{self.__class__.__name__} can not be sent to processes")
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}(backing={self._backing!r})>"
+
+
+def create_store(config):
+    kind = config.get("type", "local")
+    if kind == "local":
+        return LocalStore(
+            config["path"],
+            compression=config.get("compression"),
+            partition=config.get("partition"),
+        )
+    if kind == "sqlite":
+        # Files are stored as rows, so there are no files to compress or move
+        for option in ("compression", "partition"):
+            if config.get(option):
+                raise ValueError(f"Option {option} is not supported by sqlite stores")
+        return SqliteStore(config["path"])
+    raise ValueError(f"Unknown store {kind}")
+
+
+def migrate(base_path, target):
+    # Copy every file under its uncompressed name, compressed files are
+    # decompressed on the way through the source store
+    source = LocalStore(base_path)
+
+    count = 0
+    for (directory, _, files) in os.walk(base_path):
+        for file in sorted(files):
+            if file.endswith(".tmp"):
+                continue
+
+            path = os.path.relpath(os.path.join(directory, file), base_path)
+            compression = _compression(path)
+            if compression:
+                path = path[: -len(compression) - 1]
+            path = path.replace(os.sep, "/")
+
+            # Partitioned files are stored under their flat path
+            with source.open(path, "rb") as handle:
+                content = handle.read()
+            with target.open(_flattened(path), "wb") as handle:
+                handle.write(content)
+            count += 1
+
+    return count
+
+
+def relayout(base_path, folders, flatten=False):
+    # Move the dated files of the folders into year and month subfolders, or
+    # back into the folders themselves
+    partition = set() if flatten else {_normalize(folder) for folder in folders}
+
+    moves = []
+    for folder in folders:
+        for (directory, _, files) in os.walk(os.path.join(base_path, folder)):
+            for file in sorted(files):
+                if file.endswith(".tmp"):
+                    continue
+
+                source = os.path.join(directory, file)
+                path = os.path.relpath(source, base_path).replace(os.sep, "/")
+                target = os.path.join(
+                    base_path, _partitioned(_flattened(path), partition)
+                )
+                if os.path.normpath(target) != os.path.normpath(source):
+                    moves.append((source, target))
+
+    for (source, target) in moves:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(source, target)
+
+    # Drop the month and year folders emptied by flattening
+    for folder in folders:
+        root = os.path.join(base_path, folder)
+        for (directory, _, _) in os.walk(root, topdown=False):
+            name = os.path.basename(directory)
+            if (
+                directory != root
+                and re.fullmatch(r"\d{2}|\d{4}", name)
+                and not os.listdir(directory)
+            ):
+                os.rmdir(directory)
+
+    return len(moves)
+
+
+def _match(path, pattern):
+    # Glob semantics, wildcards stay within a folder and skip hidden files
+    parts = path.split("/")
+    patterns = pattern.split("/")
+    if len(parts) != len(patterns):
+        return False
+
+    return all(
+        fnmatch.fnmatchcase(part, pattern)
+        and (not part.startswith(".") or pattern.startswith("."))
+        for (part, pattern) in zip(parts, patterns)
+    )
+
+
+def _partitioned(path, partition):
+    # Dated files of partitioned folders live in year and month subfolders
+    folder, name = os.path.split(_normalize(path))
+    if folder not in partition or not _DATE.match(name):
+        return path
+    return f"{folder}/{name[0:4]}/{name[5:7]}/{name}"
+
+
+def _flattened(path):
+    match = _PARTITIONED.fullmatch(path)
+    if match is None:
+        return path
+    return f"{match.group(1) or ''}{match.group(4)}"
+
+
+def _match_name(path, pattern):
+    return fnmatch.fnmatchcase(os.path.basename(path), pattern)
+
+
+def _group_dates(files):
+    # Files by the date their name starts with, undated files are left out
+    dates = defaultdict(list)
+    for file in files:
+        name = os.path.basename(file)
+        if _DATE.match(name):
+            dates[name[0:10]].append(file)
+
+    return {date: sorted(set(files)) for (date, files) in dates.items()}
+
+
+def _normalize(path):
+    return os.path.normpath(path).replace(os.sep, "/")
+
+
+def _compression(path):
+    extension = os.path.splitext(path)[1][1:]
+    return extension if extension in COMPRESSIONS else None
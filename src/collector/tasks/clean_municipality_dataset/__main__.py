@@ -1,19 +1,40 @@
 import click
 
 from collector.config import read_config, init_logging
+from collector.metrics import record
+from collector import profiler
 from collector.tasks.clean_municipality_dataset.task import CleanMunicipalityDataset
-from collector.store import LocalStore
+from collector.store import create_store
 
 
 @click.command()
 @click.option("--input_folder", help="The folder containing the dataset files")
 @click.option("--output_folder", help="The folder where the dataset should be stored")
-def main(input_folder, output_folder):
+@click.option("--full", is_flag=True, help="Clean all datasets instead of new ones")
+@click.option(
+    "--workers",
+    default=1,
+    type=click.IntRange(min=1),
+    help="The number of worker processes to use",
+)
+@click.option("--metrics-out", help="The file to write stage metrics to as JSON")
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Profile the task, also enabled by COLLECTOR_PROFILE=1",
+)
+def main(input_folder, output_folder, full, workers, metrics_out, profile):
     config = read_config()
-    store = LocalStore(config["store"]["path"])
+    store = create_store(config["store"])
 
     task = CleanMunicipalityDataset(config["collector"], store)
-    task(input_folder=input_folder, output_folder=output_folder)
+    with record(metrics_out), profiler.profile("clean_municipality_dataset", profile):
+        task(
+            input_folder=input_folder,
+            output_folder=output_folder,
+            full=full,
+            workers=workers,
+        )
 
 
 if __name__ == "__main__":
@@ -1,47 +1,95 @@
+from functools import partial
 import logging
 import os
 
-import pandas as pd
-
-from collector.schema import obj, string, validate
+from collector.codec import get_codec, get_dataset_codec, handoff
+from collector.executor import ExecutionError, execute
+from collector.manifest import Manifest
+from collector.metrics import count
+from collector.schema import obj, boolean, integer, string, validate
 
 log = logging.getLogger(__name__)
 
 
 class CleanNationalDataset:
-    inputs_schema = obj(input_folder=string(), output_folder=string())
+    inputs_schema = obj(
+        input_folder=string(),
+        output_folder=string(),
+        full=boolean(default=False),
+        workers=integer(default=1, minimum=1),
+    )
 
-    def __init__(self, config, store):
+    def __init__(self, config, store, frames=None):
         self._config = config
         self._store = store
+        self._input_codec = handoff(get_codec("csv"), frames)
+        self._output_codec = handoff(
+            get_dataset_codec(config, "national", "interim"), frames
+        )
 
     def __call__(self, **kwargs):
         validate(self.inputs_schema, kwargs)
         return self.run(kwargs)
 
     def run(self, inputs):
+        manifest = Manifest(self._store, f"{inputs['output_folder']}/.manifest.json")
+        if not inputs.get("full", False):
+            manifest.load()
+
         log.info("Loading datasets")
-        for file in self._store.list(f"{inputs['input_folder']}/*.csv"):
+        files = []
+        listed = []
+        extension = self._input_codec.extension
+        for file in self._store.list(f"{inputs['input_folder']}/*{extension}"):
             file = os.path.basename(file)
+            listed.append(f"{inputs['input_folder']}/{file}")
+
+            # Skip unchanged dataset
+            if manifest.changed(
+                f"{inputs['input_folder']}/{file}", self._output_path(inputs, file)
+            ):
+                files.append(file)
+
+        log.info("Cleaning %d datasets", len(files))
+        results, errors = execute(
+            partial(self._clean, inputs), files, inputs.get("workers", 1)
+        )
+
+        count(__name__, "files_cleaned", len(results))
+        count(__name__, "files_failed", len(errors))
+
+        log.info("Storing manifest")
+        for (file, path) in results:
+            manifest.update(f"{inputs['input_folder']}/{file}", path)
+        manifest.prune(listed)
+        manifest.save()
+
+        if errors:
+            raise ExecutionError(errors)
+
+    def _clean(self, inputs, file):
+        # Load dataset
+        data = self._read(f"{inputs['input_folder']}/{file}")
+
+        # Add datum column
+        data["Datum"] = os.path.splitext(file)[0]
 
-            # Load dataset
-            data = self._read(f"{inputs['input_folder']}/{file}")
+        # Store dataset
+        path = self._output_path(inputs, file)
 
-            # Add datum column
-            data["Datum"] = os.path.splitext(file)[0]
+        self._write(data, path, index=False)
 
-            # Store dataset
-            path = f"{inputs['output_folder']}/{file}"
+        return path
 
-            self._write(data, path, index=False)
+    def _output_path(self, inputs, file):
+        extension = self._output_codec.extension
+        return f"{inputs['output_folder']}/{os.path.splitext(file)[0]}{extension}"
 
     def _read(self, path, **kwargs):
-        with self._store.open(path, "r") as handle:
-            return pd.read_csv(handle, **kwargs)
+        return self._input_codec.read(self._store, path, **kwargs)
 
     def _write(self, data, path, **kwargs):
-        with self._store.open(path, "w") as handle:
-            data.to_csv(handle, **kwargs)
+        self._output_codec.write(self._store, data, path, **kwargs)
 
     def __repr__(self):
         return f"<{self.__class__.__name__}()>"
@@ -1,13 +1,17 @@
+from concurrent.futures import ThreadPoolExecutor
 import logging
 import json
 
-from collector.schema import obj, string, validate
+from collector.metrics import count
+from collector.schema import integer, obj, string, validate
 
 log = logging.getLogger(__name__)
 
 
 class GetIntensiveCareDataset:
-    inputs_schema = obj(output_folder=string())
+    inputs_schema = obj(
+        output_folder=string(), concurrency=integer(default=5, minimum=1)
+    )
 
     def __init__(self, config, client, store):
         self._config = config
@@ -19,13 +23,14 @@ class GetIntensiveCareDataset:
         return self.run(kwargs)
 
     def run(self, inputs):
-        for url in self._config["urls"]["intensive_care"]:
-            name = url.split("/")[-1]
+        urls = self._config["urls"]["intensive_care"]
+        with ThreadPoolExecutor(inputs.get("concurrency", 5)) as pool:
+            documents = list(pool.map(self._get, urls))
 
-            log.info("Downloading %s document", name)
-            document = self._client.get(url)
+        for (url, document) in zip(urls, documents):
+            name = url.split("/")[-1]
 
-            log.info("Parsing document")
+            log.info("Parsing %s document", name)
             data = json.loads(document)
 
             if name == "new-intake":
@@ -59,7 +64,13 @@ class GetIntensiveCareDataset:
 
                 self._write(data, path)
 
+    def _get(self, url):
+        log.info("Downloading %s document", url.split("/")[-1])
+        count(__name__, "documents")
+        return self._client.get(url)
+
     def _write(self, data, path, **kwargs):
+        count(__name__, "datasets_written")
         with self._store.open(path, "w") as handle:
             json.dump(data, handle, **kwargs)
 
@@ -1,20 +1,36 @@
 import click
 
 from collector.config import read_config, init_logging
+from collector.metrics import record
+from collector import profiler
 from collector.tasks.get_national_dataset.task import GetNationalDataset
-from collector.client import WebClient
-from collector.store import LocalStore
+from collector.client import create_client
+from collector.store import create_store
 
 
 @click.command()
 @click.option("--output_folder", help="The folder where the dataset should be stored")
-def main(output_folder):
+@click.option(
+    "--backfill",
+    is_flag=True,
+    help="Write every missing day in the downloaded documents",
+)
+@click.option("--since", help="The first day to backfill (YYYY-MM-DD)")
+@click.option("--until", help="The last day to backfill (YYYY-MM-DD)")
+@click.option("--metrics-out", help="The file to write stage metrics to as JSON")
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Profile the task, also enabled by COLLECTOR_PROFILE=1",
+)
+def main(output_folder, backfill, since, until, metrics_out, profile):
     config = read_config()
-    client = WebClient()
-    store = LocalStore(config["store"]["path"])
+    client = create_client(config.get("client"))
+    store = create_store(config["store"])
 
     task = GetNationalDataset(config["collector"], client, store)
-    task(output_folder=output_folder)
+    with record(metrics_out), profiler.profile("get_national_dataset", profile):
+        task(output_folder=output_folder, backfill=backfill, since=since, until=until)
 
 
 if __name__ == "__main__":
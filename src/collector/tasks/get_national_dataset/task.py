@@ -1,52 +1,111 @@
 import logging
-import io
+import os
 
 import pandas as pd
 
-from collector.schema import obj, string, validate
+from collector.codec import get_codec, handoff
+from collector.metrics import count
+from collector.schema import boolean, iso_date, obj, optional, string, validate
+from collector.utils import read_grouped_csv_file, read_latest_csv_file
 
 log = logging.getLogger(__name__)
 
 
 class GetNationalDataset:
-    inputs_schema = obj(output_folder=string())
-
-    def __init__(self, config, client, store):
+    inputs_schema = obj(
+        output_folder=string(),
+        backfill=boolean(default=False),
+        since=optional(iso_date()),
+        until=optional(iso_date()),
+    )
+
+    def __init__(self, config, client, store, frames=None):
         self._config = config
         self._client = client
         self._store = store
+        self._output_codec = handoff(get_codec("csv"), frames)
 
     def __call__(self, **kwargs):
         validate(self.inputs_schema, kwargs)
         return self.run(kwargs)
 
     def run(self, inputs):
+        if inputs.get("backfill", False):
+            self._backfill(inputs)
+            return
+
         log.info("Requesting cases document")
-        cases_document = self._client.get(self._config["urls"]["national"]["cases"])
-        cases_buffer = io.StringIO(cases_document)
+        cases_path = self._client.download(self._config["urls"]["national"]["cases"])
+
+        log.info("Parsing cases document")
+        cases_date, cases_data = read_latest_csv_file(
+            cases_path, "Date_of_publication", delimiter=";"
+        )
 
         log.info("Requesting hospitalized document")
-        hospitalized_document = self._client.get(
+        hospitalized_path = self._client.download(
             self._config["urls"]["national"]["hospitalized"],
         )
-        hospitalized_buffer = io.StringIO(hospitalized_document)
+
+        log.info("Parsing hospitalized document")
+        _, hospitalized_data = read_latest_csv_file(
+            hospitalized_path, "Date_of_statistics", delimiter=";"
+        )
+
+        data = self._merge(cases_data, hospitalized_data)
+
+        log.info("Storing dataset")
+        path = f"{inputs['output_folder']}/{cases_date}.csv"
+
+        self._write(data, path, index=False)
+
+    def _backfill(self, inputs):
+        existing = [
+            os.path.splitext(os.path.basename(file))[0]
+            for file in self._store.list(f"{inputs['output_folder']}/*.csv")
+        ]
+
+        log.info("Requesting cases document")
+        cases_path = self._client.download(self._config["urls"]["national"]["cases"])
 
         log.info("Parsing cases document")
-        cases_data = pd.read_csv(cases_buffer, delimiter=";")
-        cases_date = cases_data["Date_of_publication"].iat[-1]
+        cases_data = read_grouped_csv_file(
+            cases_path,
+            "Date_of_publication",
+            delimiter=";",
+            since=inputs.get("since"),
+            until=inputs.get("until"),
+            exclude=existing,
+        )
+
+        log.info("Requesting hospitalized document")
+        hospitalized_path = self._client.download(
+            self._config["urls"]["national"]["hospitalized"],
+        )
 
         log.info("Parsing hospitalized document")
-        hospitalized_data = pd.read_csv(hospitalized_buffer, delimiter=";")
-        hospitalized_date = hospitalized_data["Date_of_statistics"].iat[-1]
+        hospitalized_data = read_grouped_csv_file(
+            hospitalized_path,
+            "Date_of_statistics",
+            delimiter=";",
+            since=inputs.get("since"),
+            until=inputs.get("until"),
+            exclude=existing,
+        )
 
+        empty = pd.DataFrame(columns=["Municipality_code", "Hospital_admission"])
+        for date, data in cases_data.items():
+            log.info("Storing dataset for %s", date)
+            data = self._merge(data, hospitalized_data.get(date, empty))
+            path = f"{inputs['output_folder']}/{date}.csv"
+
+            self._write(data, path, index=False)
+
+    def _merge(self, cases_data, hospitalized_data):
         log.info("Parsing cases data")
-        cases_data = cases_data[cases_data["Date_of_publication"] == cases_date]
         cases_data = cases_data.dropna(subset=["Municipality_code"])
 
         log.info("Parsing hospitalized data")
-        hospitalized_data = hospitalized_data[
-            hospitalized_data["Date_of_statistics"] == hospitalized_date
-        ]
         hospitalized_data = hospitalized_data.dropna(subset=["Municipality_code"])
 
         log.info("Merging data")
@@ -58,14 +117,11 @@ class GetNationalDataset:
             }
         )
 
-        log.info("Storing dataset")
-        path = f"{inputs['output_folder']}/{cases_date}.csv"
-
-        self._write(data, path, index=False)
+        return data
 
     def _write(self, data, path, **kwargs):
-        with self._store.open(path, "w") as handle:
-            data.to_csv(handle, **kwargs)
+        count(__name__, "datasets_written")
+        self._output_codec.write(self._store, data, path, **kwargs)
 
     def __repr__(self):
         return f"<{self.__class__.__name__}()>"
@@ -2,10 +2,11 @@ import logging
 import os
 
 import pandas as pd
-import numpy as np
 
+from collector.codec import get_dataset_codec, handoff
+from collector.memo import Memo
+from collector.metrics import count
 from collector.schema import obj, string, validate
-from collector.utils import filter_files
 
 log = logging.getLogger(__name__)
 
@@ -13,60 +14,95 @@ log = logging.getLogger(__name__)
 class MergeIntensiveCareDataset:
     inputs_schema = obj(name=string(), input_folder=string(), output_folder=string())
 
-    def __init__(self, config, store):
+    def __init__(self, config, store, frames=None):
         self._config = config
         self._store = store
+        self._input_codec = handoff(
+            get_dataset_codec(config, "intensive_care", "interim"), frames
+        )
+        self._output_codec = handoff(
+            get_dataset_codec(config, "intensive_care", "processed"), frames
+        )
 
     def __call__(self, **kwargs):
         validate(self.inputs_schema, kwargs)
         return self.run(kwargs)
 
     def run(self, inputs):
-        log.info("Retrieving datasets")
-        files = filter_files(self._store.list(f"{inputs['input_folder']}/*.csv"))
+        extension = self._output_codec.extension
+        path = f"{inputs['output_folder']}/{inputs['name']}{extension}"
 
-        log.info("Loading dataset")
-        data = self._read(f"{inputs['input_folder']}/{os.path.basename(files[0])}")
+        log.info("Retrieving datasets")
+        extension = self._input_codec.extension
+        files = self._store.latest(inputs["input_folder"], f"*{extension}")
+
+        memo = Memo(self._store, f"{inputs['output_folder']}/.{inputs['name']}.json")
+        memo.load()
+
+        fingerprint = memo.fingerprint(
+            [f"{inputs['input_folder']}/{os.path.basename(file)}" for file in files],
+            {
+                "inputs": inputs,
+                "formats": (self._config or {})
+                .get("formats", {})
+                .get("intensive_care"),
+            },
+            type(self),
+        )
+        if memo.matches(fingerprint) and self._store.list(path):
+            log.info("Datasets are unchanged")
+            return
+
+        self._update(inputs, files, path)
+
+        memo.update(fingerprint)
+        memo.save()
+
+    def _update(self, inputs, files, path):
+        log.info("Loading datasets")
+        datasets = [
+            self._read(f"{inputs['input_folder']}/{os.path.basename(file)}")
+            for file in files
+        ]
 
         log.info("Merging datasets")
-        for file in files[1:]:
-            file = os.path.basename(file)
-
-            # Load dataset
-            data = data.merge(
-                self._read(f"{inputs['input_folder']}/{file}"), how="outer", on="Datum"
-            )
-
-            # Clean columns
-            columns = list(filter(lambda c: "_" in c in c, data.columns.to_list()))
-            for column in columns:
-                column = column[:-2]
-
-                data[column] = np.max(data[[column + "_x", column + "_y"]], axis=1)
-
-            # Drop columns
-            data = data.drop(columns, axis=1)
-
-            # Fix values
-            data[data.columns.difference(["Datum"])] = (
-                data[data.columns.difference(["Datum"])].fillna(0).astype(int)
+        if len(datasets) == 1:
+            # A single dataset is stored as is, missing values included
+            data = datasets[0].sort_values(["Datum"])
+        else:
+            data = (
+                pd.concat([dataset.melt(id_vars="Datum") for dataset in datasets])
+                .groupby(["Datum", "variable"])["value"]
+                .max()
+                .unstack()
+                .fillna(0)
+                .astype(int)
+                .reset_index()
+                .rename_axis(columns=None)
             )
-
-        log.info("Sorting dataset")
-        data = data.sort_values(["Datum"])
+            data = data[self._columns(datasets)]
 
         log.info("Storing dataset")
-        path = f"{inputs['output_folder']}/{inputs['name']}.csv"
-
         self._write(data, path, index=False)
 
+    def _columns(self, datasets):
+        # Overlapping columns move to the end, like after an outer merge
+        columns = list(datasets[0].columns)
+        for dataset in datasets[1:]:
+            overlap = [c for c in columns if c != "Datum" and c in dataset.columns]
+            columns = [c for c in columns if c not in overlap]
+            columns += [c for c in dataset.columns if c not in columns + overlap]
+            columns += overlap
+
+        return columns
+
     def _read(self, path, **kwargs):
-        with self._store.open(path, "r") as handle:
-            return pd.read_csv(handle, **kwargs)
+        count(__name__, "files_read")
+        return self._input_codec.read(self._store, path, **kwargs)
 
     def _write(self, data, path, **kwargs):
-        with self._store.open(path, "w") as handle:
-            data.to_csv(handle, **kwargs)
+        count(__name__, "rows_written", len(data))
+        self._output_codec.write(self._store, data, path, **kwargs)
 
     def __repr__(self):
         return f"<{self.__class__.__name__}()>"
@@ -1,20 +1,32 @@
 import click
 
 from collector.config import read_config, init_logging
+from collector.metrics import record
+from collector import profiler
 from collector.tasks.merge_municipality_dataset.task import MergeMunicipalityDataset
-from collector.store import LocalStore
+from collector.store import create_store
 
 
 @click.command()
 @click.option("--name", help="The name of the dataset")
 @click.option("--input_folder", help="The folder containing the dataset files")
 @click.option("--output_folder", help="The folder where the dataset should be stored")
-def main(name, input_folder, output_folder):
+@click.option("--full", is_flag=True, help="Rebuild the dataset from all files")
+@click.option("--metrics-out", help="The file to write stage metrics to as JSON")
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Profile the task, also enabled by COLLECTOR_PROFILE=1",
+)
+def main(name, input_folder, output_folder, full, metrics_out, profile):
     config = read_config()
-    store = LocalStore(config["store"]["path"])
+    store = create_store(config["store"])
 
     task = MergeMunicipalityDataset(config["collector"], store)
-    task(name=name, input_folder=input_folder, output_folder=output_folder)
+    with record(metrics_out), profiler.profile("merge_municipality_dataset", profile):
+        task(
+            name=name, input_folder=input_folder, output_folder=output_folder, full=full
+        )
 
 
 if __name__ == "__main__":
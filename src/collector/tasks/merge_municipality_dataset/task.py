@@ -2,27 +2,118 @@ import logging
 import os
 
 import pandas as pd
-import numpy as np
 
-from collector.schema import obj, string, validate
+from collector.codec import get_dataset_codec, handoff
+from collector.memo import Memo
+from collector.metrics import count
+from collector.schema import boolean, obj, string, validate
+from collector.utils import concat_sorted, interpolate_groups
 
 log = logging.getLogger(__name__)
 
 
 class MergeMunicipalityDataset:
-    inputs_schema = obj(name=string(), input_folder=string(), output_folder=string())
-
-    def __init__(self, config, store):
+    inputs_schema = obj(
+        name=string(),
+        input_folder=string(),
+        output_folder=string(),
+        full=boolean(default=False),
+    )
+
+    def __init__(self, config, store, frames=None):
         self._config = config
         self._store = store
+        self._input_codec = handoff(
+            get_dataset_codec(config, "municipality", "interim"), frames
+        )
+        self._output_codec = handoff(
+            get_dataset_codec(config, "municipality", "processed"), frames
+        )
 
     def __call__(self, **kwargs):
         validate(self.inputs_schema, kwargs)
         return self.run(kwargs)
 
     def run(self, inputs):
-        # pylint: disable=no-member,unsubscriptable-object
-        data = pd.DataFrame(
+        extension = self._output_codec.extension
+        path = f"{inputs['output_folder']}/{inputs['name']}{extension}"
+
+        extension = self._input_codec.extension
+        files = sorted(
+            os.path.basename(file)
+            for file in self._store.list(f"{inputs['input_folder']}/*{extension}")
+        )
+
+        memo = Memo(self._store, f"{inputs['output_folder']}/.{inputs['name']}.json")
+        memo.load()
+
+        fingerprint = memo.fingerprint(
+            [f"{inputs['input_folder']}/{file}" for file in files],
+            {
+                "inputs": {k: v for (k, v) in inputs.items() if k != "full"},
+                "formats": (self._config or {}).get("formats", {}).get("municipality"),
+            },
+            type(self),
+        )
+        if (
+            not inputs.get("full", False)
+            and memo.matches(fingerprint)
+            and self._store.list(path)
+        ):
+            log.info("Datasets are unchanged")
+            return
+
+        self._update(inputs, files, path, memo.added())
+
+        memo.update(fingerprint)
+        memo.save()
+
+    def _update(self, inputs, files, path, added):
+        existing = None
+        if not inputs.get("full", False):
+            existing = self._read_output(path)
+            if existing is not None and existing.empty:
+                existing = None
+
+        # Older datasets that changed are only picked up by a full rebuild
+        if existing is not None and not self._appended(existing, added):
+            log.info("Datasets changed before the latest date")
+            existing = None
+
+        if existing is None:
+            log.info("Merging datasets")
+            data = self._merge(inputs, files)
+
+            log.info("Fixing dataset")
+            data["PositiefGetest"] = interpolate_groups(
+                data["PositiefGetest"], data["Gemeentecode"]
+            )
+        else:
+            latest = existing["Datum"].max()
+            merged = [file for file in files if file[0:10] <= latest]
+            files = [file for file in files if file[0:10] > latest]
+            if not files:
+                log.info("Dataset is up to date")
+                return
+
+            log.info("Merging datasets")
+            data = self._merge(inputs, files)
+
+            log.info("Fixing dataset")
+            data = self._patch(inputs, existing, data, merged)
+
+        data["PositiefGetest"] = data["PositiefGetest"].astype(int)
+
+        log.info("Storing dataset")
+        self._write(data, path, index=False)
+
+    def _merge(self, inputs, files):
+        return concat_sorted(
+            [
+                self._filter(self._read(f"{inputs['input_folder']}/{file}"))
+                for file in files
+            ],
+            ["Datum", "Gemeentecode"],
             columns=[
                 "Gemeentecode",
                 "PositiefGetest",
@@ -30,48 +121,78 @@ class MergeMunicipalityDataset:
                 "Provinciecode",
                 "Provincie",
                 "Datum",
-            ]
+            ],
         )
 
-        log.info("Merging datasets")
-        for file in self._store.list(f"{inputs['input_folder']}/*.csv"):
-            file = os.path.basename(file)
+    def _patch(self, inputs, existing, data, files):
+        # Walk back to the last known value of every updated municipality
+        pending = set(data["Gemeentecode"])
+        cutoff = existing["Datum"].max() + "~"
+        gaps = []
+        for file in reversed(files):
+            if not pending:
+                break
 
-            # Load dataset
-            dataset = self._read(f"{inputs['input_folder']}/{file}")
+            dataset = self._filter(self._read(f"{inputs['input_folder']}/{file}"))
+            dataset = dataset.loc[dataset["Gemeentecode"].isin(pending)]
 
-            # Filter rows
+            known = set()
             if "PositiefGetest" in dataset.columns:
-                dataset = dataset.loc[dataset["PositiefGetest"] != 0]
-            if "Opgenomen" in dataset.columns:
-                dataset = dataset.loc[dataset["Opgenomen"] != 0]
-
-            # Drop columns
-            dataset = dataset.drop(columns=["Opgenomen"], errors="ignore")
-
-            # Append dataset
-            data = data.append(dataset, ignore_index=True)
+                known = set(
+                    dataset.loc[dataset["PositiefGetest"].notna(), "Gemeentecode"]
+                )
+
+            gaps.append(dataset.loc[~dataset["Gemeentecode"].isin(known)])
+            pending -= known
+            cutoff = file[0:10]
+
+        # Clear values that were forward filled after the last known value
+        region = existing.loc[existing["Datum"] >= cutoff].copy()
+        if gaps:
+            keys = pd.concat(gaps).set_index(["Datum", "Gemeentecode"]).index
+            region["PositiefGetest"] = region["PositiefGetest"].mask(
+                region.set_index(["Datum", "Gemeentecode"]).index.isin(keys)
+            )
+
+        region = concat_sorted([region, data], ["Datum", "Gemeentecode"])
+        region["PositiefGetest"] = interpolate_groups(
+            region["PositiefGetest"], region["Gemeentecode"]
+        )
 
-        log.info("Sorting dataset")
-        data = data.sort_values(["Datum", "Gemeentecode"])
+        return concat_sorted(
+            [existing.loc[existing["Datum"] < cutoff], region],
+            ["Datum", "Gemeentecode"],
+        )
 
-        log.info("Fixing dataset")
-        data["PositiefGetest"] = data["PositiefGetest"].fillna(np.NaN)
-        data = data.groupby("Gemeentecode").apply(lambda group: group.interpolate())
-        data["PositiefGetest"] = data["PositiefGetest"].astype(int)
+    def _appended(self, existing, added):
+        latest = existing["Datum"].max()
+        return added is not None and all(
+            os.path.basename(file)[0:10] > latest for file in added
+        )
 
-        log.info("Storing dataset")
-        path = f"{inputs['output_folder']}/{inputs['name']}.csv"
+    def _filter(self, dataset):
+        # Filter rows
+        if "PositiefGetest" in dataset.columns:
+            dataset = dataset.loc[dataset["PositiefGetest"] != 0]
+        if "Opgenomen" in dataset.columns:
+            dataset = dataset.loc[dataset["Opgenomen"] != 0]
 
-        self._write(data, path, index=False)
+        # Drop columns
+        return dataset.drop(columns=["Opgenomen"], errors="ignore")
 
     def _read(self, path, **kwargs):
-        with self._store.open(path, "r") as handle:
-            return pd.read_csv(handle, **kwargs)
+        count(__name__, "files_read")
+        return self._input_codec.read(self._store, path, **kwargs)
+
+    def _read_output(self, path, **kwargs):
+        try:
+            return self._output_codec.read(self._store, path, **kwargs)
+        except FileNotFoundError:
+            return None
 
     def _write(self, data, path, **kwargs):
-        with self._store.open(path, "w") as handle:
-            data.to_csv(handle, **kwargs)
+        count(__name__, "rows_written", len(data))
+        self._output_codec.write(self._store, data, path, **kwargs)
 
     def __repr__(self):
         return f"<{self.__class__.__name__}()>"
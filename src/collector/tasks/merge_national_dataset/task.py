@@ -1,52 +1,120 @@
 import logging
 import os
 
-import pandas as pd
-
-from collector.schema import obj, string, validate
+from collector.codec import get_dataset_codec, handoff
+from collector.memo import Memo
+from collector.metrics import count
+from collector.schema import boolean, obj, string, validate
+from collector.utils import concat_sorted
 
 log = logging.getLogger(__name__)
 
 
 class MergeNationalDataset:
-    inputs_schema = obj(name=string(), input_folder=string(), output_folder=string())
-
-    def __init__(self, config, store):
+    inputs_schema = obj(
+        name=string(),
+        input_folder=string(),
+        output_folder=string(),
+        full=boolean(default=False),
+    )
+
+    def __init__(self, config, store, frames=None):
         self._config = config
         self._store = store
+        self._input_codec = handoff(
+            get_dataset_codec(config, "national", "interim"), frames
+        )
+        self._output_codec = handoff(
+            get_dataset_codec(config, "national", "processed"), frames
+        )
 
     def __call__(self, **kwargs):
         validate(self.inputs_schema, kwargs)
         return self.run(kwargs)
 
     def run(self, inputs):
-        data = pd.DataFrame(
-            columns=["PositiefGetest", "Opgenomen", "Overleden", "Datum"]
+        extension = self._output_codec.extension
+        path = f"{inputs['output_folder']}/{inputs['name']}{extension}"
+
+        extension = self._input_codec.extension
+        files = sorted(
+            os.path.basename(file)
+            for file in self._store.list(f"{inputs['input_folder']}/*{extension}")
         )
 
-        log.info("Merging datasets")
-        for file in self._store.list(f"{inputs['input_folder']}/*.csv"):
-            file = os.path.basename(file)
+        memo = Memo(self._store, f"{inputs['output_folder']}/.{inputs['name']}.json")
+        memo.load()
 
-            data = data.append(
-                self._read(f"{inputs['input_folder']}/{file}"), ignore_index=True
-            )
+        fingerprint = memo.fingerprint(
+            [f"{inputs['input_folder']}/{file}" for file in files],
+            {
+                "inputs": {k: v for (k, v) in inputs.items() if k != "full"},
+                "formats": (self._config or {}).get("formats", {}).get("national"),
+            },
+            type(self),
+        )
+        if (
+            not inputs.get("full", False)
+            and memo.matches(fingerprint)
+            and self._store.list(path)
+        ):
+            log.info("Datasets are unchanged")
+            return
+
+        self._update(inputs, files, path, memo.added())
+
+        memo.update(fingerprint)
+        memo.save()
+
+    def _update(self, inputs, files, path, added):
+        data = None
+        if not inputs.get("full", False):
+            data = self._read_output(path)
+            if data is not None and data.empty:
+                data = None
+
+        # Older datasets that changed are only picked up by a full rebuild
+        if data is not None and not self._appended(data, added):
+            log.info("Datasets changed before the latest date")
+            data = None
 
-        log.info("Sorting dataset")
-        data = data.sort_values(["Datum"])
+        log.info("Merging datasets")
+        if data is not None:
+            latest = data["Datum"].max()
+            files = [file for file in files if file[0:10] > latest]
+            if not files:
+                log.info("Dataset is up to date")
+                return
+
+        datasets = [self._read(f"{inputs['input_folder']}/{file}") for file in files]
+        data = concat_sorted(
+            datasets if data is None else [data, *datasets],
+            ["Datum"],
+            columns=["PositiefGetest", "Opgenomen", "Overleden", "Datum"],
+        )
 
         log.info("Storing dataset")
-        path = f"{inputs['output_folder']}/{inputs['name']}.csv"
-
         self._write(data, path, index=False)
 
+    def _appended(self, data, added):
+        latest = data["Datum"].max()
+        return added is not None and all(
+            os.path.basename(file)[0:10] > latest for file in added
+        )
+
     def _read(self, path, **kwargs):
-        with self._store.open(path, "r") as handle:
-            return pd.read_csv(handle, **kwargs)
+        count(__name__, "files_read")
+        return self._input_codec.read(self._store, path, **kwargs)
+
+    def _read_output(self, path, **kwargs):
+        try:
+            return self._output_codec.read(self._store, path, **kwargs)
+        except FileNotFoundError:
+            return None
 
     def _write(self, data, path, **kwargs):
-        with self._store.open(path, "w") as handle:
-            data.to_csv(handle, **kwargs)
+        count(__name__, "rows_written", len(data))
+        self._output_codec.write(self._store, data, path, **kwargs)
 
     def __repr__(self):
         return f"<{self.__class__.__name__}()>"
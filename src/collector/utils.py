@@ -1,15 +1,136 @@
-from datetime import datetime
-import os
+import csv
+import io
 
+import numpy as np
+import pandas as pd
 
-def filter_files(files):
-    max_date = datetime(1970, 1, 1)
 
-    for file in files:
-        file = os.path.basename(file)
-        date = datetime.strptime(file[0:10], "%Y-%m-%d")
+def concat_sorted(datasets, by, columns=None):
+    data = pd.concat([pd.DataFrame(columns=columns), *datasets], ignore_index=True)
+    if data.set_index(by).index.is_monotonic_increasing:
+        return data
 
-        if date >= max_date:
-            max_date = date
+    return data.sort_values(by)
 
-    return list(filter(lambda f: max_date.strftime("%Y-%m-%d") in f, files))
+
+def interpolate_groups(values, groups):
+    order = np.argsort(
+        pd.factorize(pd.Series(groups).infer_objects())[0], kind="stable"
+    )
+    values = np.asarray(values, dtype=float)[order]
+    groups = np.asarray(groups)[order]
+
+    positions = np.arange(len(values))
+    valid = ~np.isnan(values)
+
+    previous = np.maximum.accumulate(np.where(valid, positions, 0))
+    following = np.minimum.accumulate(
+        np.where(valid, positions, len(values) - 1)[::-1]
+    )[::-1]
+
+    missing = ~valid & valid[previous] & (groups[previous] == groups)
+    inside = missing & valid[following] & (groups[following] == groups)
+
+    # Mirror np.interp so results match pandas' linear interpolation exactly
+    result = values.copy()
+    result[missing] = values[previous[missing]]
+    slope = (values[following[inside]] - values[previous[inside]]) / (
+        following[inside] - previous[inside]
+    )
+    result[inside] = (
+        slope * (positions[inside] - previous[inside]) + values[previous[inside]]
+    )
+
+    output = np.empty_like(result)
+    output[order] = result
+    return output
+
+
+def read_latest_csv_file(path, column, delimiter=",", block_size=65536):
+    # Expects rows sorted by the column, files that are detected as unsorted
+    # are read in full instead
+    with open(path, "rb") as handle:
+        header = handle.readline()
+        names = _split_line(header, delimiter)
+        index = names.index(column)
+
+        start = handle.tell()
+        first = handle.readline()
+
+        date = None
+        lines = []
+        for line in _reverse_lines(handle, start, block_size):
+            if not line.strip():
+                continue
+
+            value = _split_line(line, delimiter)[index]
+            if date is None:
+                date = value
+            elif value > date:
+                return _read_latest_csv_file_full(path, column, delimiter)
+            elif value != date:
+                # In sorted rows the first row is not newer than this one
+                if _split_line(first, delimiter)[index] > value:
+                    return _read_latest_csv_file_full(path, column, delimiter)
+                break
+
+            lines.append(line)
+
+    if date is None:
+        return (None, pd.DataFrame(columns=names))
+
+    buffer = io.BytesIO(header + b"\n".join(reversed(lines)))
+    return (date, pd.read_csv(buffer, delimiter=delimiter))
+
+
+def read_grouped_csv_file(
+    path, column, delimiter=",", since=None, until=None, exclude=(), chunksize=100000
+):
+    groups = {}
+    for chunk in pd.read_csv(path, delimiter=delimiter, chunksize=chunksize):
+        mask = ~chunk[column].isin(exclude)
+        if since is not None:
+            mask &= chunk[column] >= since
+        if until is not None:
+            mask &= chunk[column] <= until
+
+        for date, rows in chunk[mask].groupby(column, sort=False):
+            groups.setdefault(date, []).append(rows)
+
+    return {date: pd.concat(rows) for (date, rows) in sorted(groups.items())}
+
+
+def _read_latest_csv_file_full(path, column, delimiter, chunksize=100000):
+    date = None
+    for chunk in pd.read_csv(
+        path, delimiter=delimiter, usecols=[column], chunksize=chunksize
+    ):
+        if len(chunk) > 0:
+            date = chunk[column].iat[-1]
+
+    data = [
+        chunk[chunk[column] == date]
+        for chunk in pd.read_csv(path, delimiter=delimiter, chunksize=chunksize)
+    ]
+    return (date, pd.concat(data))
+
+
+def _reverse_lines(handle, start, block_size):
+    position = handle.seek(0, io.SEEK_END)
+    remainder = b""
+
+    while position > start:
+        size = min(block_size, position - start)
+        position -= size
+
+        handle.seek(position)
+        lines = (handle.read(size) + remainder).split(b"\n")
+        remainder = lines.pop(0)
+
+        yield from reversed(lines)
+
+    yield remainder
+
+
+def _split_line(line, delimiter):
+    return next(csv.reader([line.decode("utf-8-sig").strip()], delimiter=delimiter))
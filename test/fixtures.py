@@ -2,11 +2,21 @@ class Client:
     def get(self, url, params=None):
         pass
 
+    def download(self, url, params=None):
+        pass
+
 
 class Response:
-    def __init__(self, text, status_code):
+    def __init__(self, text, status_code, headers=None):
         self.text = text
         self.status_code = status_code
+        self.headers = headers or {}
+        self.encoding = "utf8"
+
+    def iter_content(self, chunk_size=1):
+        content = self.text.encode(self.encoding)
+        for idx in range(0, len(content), chunk_size):
+            yield content[idx : idx + chunk_size]
 
 
 class Store:
@@ -15,3 +25,12 @@ class Store:
 
     def list(self, path):
         pass
+
+    def stat(self, path):
+        pass
+
+    def latest(self, folder, pattern="*"):
+        pass
+
+    def range(self, folder, since=None, until=None, pattern="*"):
+        pass
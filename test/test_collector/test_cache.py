@@ -0,0 +1,168 @@
+import os
+import threading
+import time
+
+from collector.cache import ResponseCache
+
+
+class TestResponseCacheHeaders:
+    def test_headers_empty(self, tmp_path):
+        cache = ResponseCache(str(tmp_path))
+
+        assert not cache.headers("https://example.com")
+
+    def test_headers(self, tmp_path):
+        cache = ResponseCache(str(tmp_path))
+        cache.save(
+            "https://example.com",
+            None,
+            [b"content"],
+            {"ETag": '"v1"', "Last-Modified": "Thu, 01 Jan 1970 00:00:00 GMT"},
+        )
+
+        assert cache.headers("https://example.com") == {
+            "If-None-Match": '"v1"',
+            "If-Modified-Since": "Thu, 01 Jan 1970 00:00:00 GMT",
+        }
+        assert not cache.headers("https://example.com", {"param": "value"})
+
+
+class TestResponseCacheLoad:
+    def test_load(self, tmp_path):
+        cache = ResponseCache(str(tmp_path))
+        cache.save("https://example.com", {"param": "value"}, [b"content"], {})
+
+        assert cache.load("https://example.com", {"param": "value"}) == "content"
+        assert cache.load("https://example.com") is None
+
+
+class TestResponseCacheEvict:
+    def test_evict_max_age(self, tmp_path):
+        cache = ResponseCache(str(tmp_path), max_age=60)
+        cache.save("https://example.com/1", None, [b"content"], {})
+        cache.save("https://example.com/2", None, [b"content"], {})
+
+        # pylint: disable=protected-access
+        key = cache._key("https://example.com/1", None)
+        os.utime(tmp_path / f"{key}.json", (time.time() - 120, time.time() - 120))
+
+        cache.evict()
+
+        assert cache.load("https://example.com/1") is None
+        assert cache.load("https://example.com/2") == "content"
+
+    def test_evict_max_size(self, tmp_path):
+        cache = ResponseCache(str(tmp_path), max_size=10)
+        cache.save("https://example.com/1", None, [b"content 1"], {})
+        # pylint: disable=protected-access
+        key = cache._key("https://example.com/1", None)
+        os.utime(tmp_path / f"{key}.json", (time.time() - 10, time.time() - 10))
+
+        cache.save("https://example.com/2", None, [b"content 2"], {})
+
+        assert cache.load("https://example.com/1") is None
+        assert cache.load("https://example.com/2") == "content 2"
+
+    def test_evict_max_size_saved(self, tmp_path):
+        cache = ResponseCache(str(tmp_path), max_size=10)
+        cache.save("https://example.com/1", None, [b"content 1"], {})
+        cache.save("https://example.com/2", None, [b"larger content 2"], {})
+
+        assert cache.load("https://example.com/1") is None
+        assert cache.load("https://example.com/2") == "larger content 2"
+
+    def test_evict_removes_orphans(self, tmp_path):
+        cache = ResponseCache(str(tmp_path), max_age=60)
+        with cache.lock("https://example.com/1"):
+            cache.save("https://example.com/1", None, [b"content 1"], {})
+        with cache.lock("https://example.com/2"):
+            cache.save("https://example.com/2", None, [b"content 2"], {})
+
+        # pylint: disable=protected-access
+        key = cache._key("https://example.com/1", None)
+        os.utime(tmp_path / f"{key}.json", (time.time() - 120, time.time() - 120))
+        (tmp_path / "blobs" / "orphan").write_bytes(b"orphan")
+
+        cache.evict()
+
+        key = cache._key("https://example.com/2", None)
+        assert set(os.listdir(tmp_path)) == {
+            ".lock",
+            "blobs",
+            f"{key}.json",
+            f"{key}.lock",
+        }
+        assert len(os.listdir(tmp_path / "blobs")) == 1
+
+    def test_evict_keeps_held_lock(self, tmp_path):
+        cache = ResponseCache(str(tmp_path))
+        with cache.lock("https://example.com"):
+            cache.evict()
+
+            # pylint: disable=protected-access
+            key = cache._key("https://example.com", None)
+            assert (tmp_path / f"{key}.lock").exists()
+
+        cache.evict()
+
+        assert not (tmp_path / f"{key}.lock").exists()
+
+
+class TestResponseCacheSave:
+    def test_save_shared_content(self, tmp_path):
+        cache = ResponseCache(str(tmp_path))
+        cache.save("https://example.com/national", None, [b"content"], {})
+        cache.save("https://example.com/municipality", None, [b"content"], {})
+
+        assert len(os.listdir(tmp_path / "blobs")) == 1
+        assert cache.load("https://example.com/national") == "content"
+        assert cache.load("https://example.com/municipality") == "content"
+
+    def test_save_threads(self, tmp_path):
+        cache = ResponseCache(str(tmp_path))
+        barrier = threading.Barrier(2, timeout=5)
+
+        def chunks(content):
+            yield content[:3]
+            barrier.wait()
+            yield content[3:]
+
+        threads = [
+            threading.Thread(
+                target=cache.save,
+                args=(f"https://example.com/{idx}", None, chunks(content), {}),
+            )
+            for (idx, content) in enumerate([b"first", b"second"])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert cache.load("https://example.com/0") == "first"
+        assert cache.load("https://example.com/1") == "second"
+
+
+class TestResponseCacheFresh:
+    def test_fresh(self, tmp_path):
+        cache = ResponseCache(str(tmp_path), run_id="1")
+        cache.save("https://example.com", None, [b"content"], {})
+
+        assert cache.fresh("https://example.com")
+        assert not ResponseCache(str(tmp_path), run_id="2").fresh("https://example.com")
+
+    def test_fresh_without_run_id(self, tmp_path):
+        cache = ResponseCache(str(tmp_path))
+        cache.save("https://example.com", None, [b"content"], {})
+
+        assert not cache.fresh("https://example.com")
+
+    def test_refresh(self, tmp_path):
+        ResponseCache(str(tmp_path), run_id="1").save(
+            "https://example.com", None, [b"content"], {}
+        )
+
+        cache = ResponseCache(str(tmp_path), run_id="2")
+        cache.refresh("https://example.com")
+
+        assert cache.fresh("https://example.com")
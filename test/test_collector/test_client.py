@@ -1,9 +1,13 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+
 import pytest
 import mock
 
 from fixtures import Response
 
-from collector.client import WebClient, WebClientError
+from collector.cache import ResponseCache
+from collector.client import WebClient, WebClientError, create_client, create_session
 
 
 class TestWebClientGet:
@@ -14,14 +18,14 @@ class TestWebClientGet:
             ("https://example.com", {"param": "value"}, "content", 200),
         ],
     )
-    @mock.patch("requests.get")
+    @mock.patch("requests.Session.get")
     def test_get_valid_response(self, mock_get, url, params, text, status):
         mock_get.return_value = Response(text, status)
 
         client = WebClient()
         res = client.get(url, params)
 
-        mock_get.assert_called_once_with(url, params=params)
+        mock_get.assert_called_once_with(url, params=params, timeout=None)
 
         assert res == text
 
@@ -39,7 +43,7 @@ class TestWebClientGet:
             ("https://example.com", None, "Gateway Timeout", 504),
         ],
     )
-    @mock.patch("requests.get")
+    @mock.patch("requests.Session.get")
     def test_get_invalid_response(self, mock_get, url, params, text, status):
         mock_get.return_value = Response(text, status)
 
@@ -47,8 +51,166 @@ class TestWebClientGet:
         with pytest.raises(WebClientError) as error:
             client.get(url, params)
 
-        mock_get.assert_called_once_with(url, params=params)
+        mock_get.assert_called_once_with(url, params=params, timeout=None)
 
         assert error.value.message == f"Request to {url} failed"
         assert error.value.status_code == status
         assert error.value.text == text
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests = []
+    connections = []
+
+    def do_GET(self):
+        _Handler.requests.append(dict(self.headers))
+        _Handler.connections.append(self.client_address)
+
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = b"content"
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+@pytest.fixture(name="server")
+def fixture_server():
+    _Handler.requests = []
+    _Handler.connections = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+
+    server.shutdown()
+    server.server_close()
+
+
+class TestWebClientCache:
+    def test_get_not_modified(self, server, tmp_path):
+        client = WebClient(ResponseCache(str(tmp_path)))
+
+        assert client.get(f"{server}/document") == "content"
+        assert client.get(f"{server}/document") == "content"
+
+        assert "If-None-Match" not in _Handler.requests[0]
+        assert _Handler.requests[1]["If-None-Match"] == '"v1"'
+
+    @mock.patch("requests.Session.get")
+    def test_get_not_modified_evicted(self, mock_get, tmp_path):
+        mock_get.side_effect = [
+            Response("content", 200, {"ETag": '"v1"'}),
+            Response("", 304),
+            Response("content", 200, {"ETag": '"v1"'}),
+        ]
+        cache = ResponseCache(str(tmp_path))
+
+        client = WebClient(cache)
+        client.get("https://example.com")
+
+        with mock.patch.object(cache, "path", return_value=None):
+            assert client.get("https://example.com") == "content"
+
+        assert mock_get.call_count == 3
+
+    def test_get_fresh(self, server, tmp_path):
+        client = WebClient(ResponseCache(str(tmp_path), run_id="1"))
+
+        assert client.get(f"{server}/document") == "content"
+        assert client.get(f"{server}/document") == "content"
+
+        assert len(_Handler.requests) == 1
+
+    def test_get_max_size(self, server, tmp_path):
+        client = WebClient(ResponseCache(str(tmp_path), max_size=1))
+
+        assert client.get(f"{server}/document") == "content"
+
+    def test_download(self, server, tmp_path):
+        client = WebClient(ResponseCache(str(tmp_path)))
+        path = client.download(f"{server}/document")
+
+        with open(path, "rb") as handle:
+            assert handle.read() == b"content"
+
+    def test_download_without_cache(self, server):
+        client = WebClient()
+        path = client.download(f"{server}/document")
+
+        with open(path, "rb") as handle:
+            assert handle.read() == b"content"
+
+
+class TestWebClientSession:
+    def test_get_keep_alive(self, server):
+        client = WebClient()
+
+        assert client.get(f"{server}/first") == "content"
+        assert client.get(f"{server}/second") == "content"
+
+        assert len(set(_Handler.connections)) == 1
+
+    def test_get_close(self, server):
+        client = WebClient(session=create_session(keep_alive=False))
+
+        assert client.get(f"{server}/first") == "content"
+        assert client.get(f"{server}/second") == "content"
+
+        assert len(set(_Handler.connections)) == 2
+
+    @mock.patch("requests.Session.get")
+    def test_get_timeout(self, mock_get):
+        mock_get.return_value = Response("content", 200)
+
+        client = WebClient(timeout=(1, 2))
+        client.get("https://example.com")
+
+        mock_get.assert_called_once_with(
+            "https://example.com", params=None, timeout=(1, 2)
+        )
+
+
+class TestCreateClient:
+    def test_create_client(self):
+        client = create_client(None)
+
+        # pylint: disable=protected-access
+        assert client._cache is None
+
+    def test_create_client_cache(self, tmp_path):
+        client = create_client({"cache": {"path": str(tmp_path), "max_age": 60}})
+
+        # pylint: disable=protected-access
+        assert isinstance(client._cache, ResponseCache)
+
+    def test_create_client_run_id(self, tmp_path):
+        client = create_client({"cache": {"path": str(tmp_path)}}, run_id="1")
+
+        # pylint: disable=protected-access
+        client._cache.save("https://example.com", None, [b"content"], {})
+
+        assert client._cache.fresh("https://example.com")
+
+    def test_create_client_session(self):
+        config = {
+            "session": {"pool_size": 4, "keep_alive": True},
+            "timeout": {"connect": 1, "read": 2},
+        }
+        client = create_client(config)
+
+        # pylint: disable=protected-access
+        assert client._session is create_client(config)._session
+        assert client._session is not create_client(None)._session
+        assert client._session.get_adapter("https://example.com")._pool_maxsize == 4
+        assert client._timeout == (1, 2)
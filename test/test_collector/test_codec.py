@@ -0,0 +1,187 @@
+from concurrent.futures import ThreadPoolExecutor
+import pickle
+
+import pandas as pd
+import pytest
+import mock
+
+from collector.codec import (
+    CsvCodec,
+    JsonCodec,
+    ParquetCodec,
+    FeatherCodec,
+    Frames,
+    HandoffCodec,
+    get_codec,
+    get_dataset_codec,
+    handoff,
+)
+from collector.store import LocalStore
+
+
+class TestCodecs:
+    @property
+    def data(self):
+        return pd.DataFrame(
+            {
+                "Gemeentecode": [1, 2],
+                "PositiefGetest": [100, 200],
+                "Gemeente": ["gemeente 1", None],
+                "Datum": ["1970-01-01", "1970-01-01"],
+            }
+        )
+
+    @pytest.mark.parametrize(
+        "codec", [CsvCodec(), JsonCodec(), ParquetCodec(), FeatherCodec()]
+    )
+    def test_codec(self, tmp_path, codec):
+        store = LocalStore(str(tmp_path))
+        path = f"interim/test{codec.extension}"
+
+        codec.write(store, self.data, path, index=False)
+        data = codec.read(store, path)
+
+        pd.testing.assert_frame_equal(data, self.data, check_dtype=False)
+
+    @pytest.mark.parametrize("codec", [ParquetCodec(), FeatherCodec()])
+    def test_codec_dtypes(self, tmp_path, codec):
+        store = LocalStore(str(tmp_path))
+        path = f"interim/test{codec.extension}"
+
+        codec.write(store, self.data.astype({"Gemeentecode": "int16"}), path)
+        data = codec.read(store, path)
+
+        assert data["Gemeentecode"].dtype == "int16"
+
+
+class TestGetCodec:
+    @pytest.mark.parametrize(
+        "name,codec",
+        [
+            ("csv", CsvCodec),
+            ("json", JsonCodec),
+            ("parquet", ParquetCodec),
+            ("feather", FeatherCodec),
+        ],
+    )
+    def test_get_codec(self, name, codec):
+        assert isinstance(get_codec(name), codec)
+
+    def test_get_codec_unknown(self):
+        with pytest.raises(ValueError):
+            get_codec("xlsx")
+
+
+class TestGetDatasetCodec:
+    @pytest.mark.parametrize(
+        "config,codec",
+        [
+            (None, CsvCodec),
+            ({}, CsvCodec),
+            ({"formats": {"national": {"processed": "csv"}}}, CsvCodec),
+            ({"formats": {"national": {"interim": "parquet"}}}, ParquetCodec),
+            ({"formats": {"municipality": {"interim": "parquet"}}}, CsvCodec),
+        ],
+    )
+    def test_get_dataset_codec(self, config, codec):
+        assert isinstance(get_dataset_codec(config, "national", "interim"), codec)
+
+
+class TestHandoffCodec:
+    @property
+    def data(self):
+        return pd.DataFrame(
+            {"PositiefGetest": [100, 200], "Datum": ["1970-01-01", "1970-01-02"]},
+            index=[3, 5],
+        )
+
+    def test_handoff(self, tmp_path):
+        store = LocalStore(str(tmp_path))
+        codec = HandoffCodec(CsvCodec(), Frames())
+
+        codec.write(store, self.data, "interim/test.csv", index=False)
+        with mock.patch.object(CsvCodec, "read") as mock_read:
+            data = codec.read(store, "interim/test.csv")
+
+        mock_read.assert_not_called()
+
+        pd.testing.assert_frame_equal(data, CsvCodec().read(store, "interim/test.csv"))
+        assert (tmp_path / "interim" / "test.csv").exists()
+
+    def test_handoff_evict(self, tmp_path):
+        store = LocalStore(str(tmp_path))
+        frames = Frames()
+        codec = HandoffCodec(CsvCodec(), frames)
+
+        codec.write(store, self.data, "interim/test.csv", index=False)
+        codec.read(store, "interim/test.csv")["Datum"] = None
+
+        assert not frames
+        assert list(codec.read(store, "interim/test.csv")["Datum"]) == [
+            "1970-01-01",
+            "1970-01-02",
+        ]
+
+    def test_handoff_limit(self, tmp_path):
+        store = LocalStore(str(tmp_path))
+        frames = Frames(limit=2)
+        codec = HandoffCodec(CsvCodec(), frames)
+
+        for name in ["test-1", "test-2", "test-3"]:
+            codec.write(store, self.data, f"interim/{name}.csv", index=False)
+
+        assert list(frames) == ["interim/test-2.csv", "interim/test-3.csv"]
+
+    def test_handoff_threads(self):
+        frames = Frames(limit=8)
+
+        def run(thread):
+            for idx in range(2000):
+                frames.put(f"{thread}/{idx}", idx)
+                frames.pop(f"{thread}/{idx - 1}")
+
+        with ThreadPoolExecutor(8) as executor:
+            for future in [executor.submit(run, thread) for thread in range(8)]:
+                future.result()
+
+        assert len(frames) <= 8
+
+    def test_handoff_pickle(self, tmp_path):
+        store = LocalStore(str(tmp_path))
+        frames = Frames()
+        codec = HandoffCodec(CsvCodec(), frames)
+
+        codec.write(store, self.data, "interim/test.csv", index=False)
+        codec = pickle.loads(pickle.dumps(codec))
+        codec.write(store, self.data, "interim/other.csv", index=False)
+
+        assert list(frames) == ["interim/test.csv"]
+        pd.testing.assert_frame_equal(
+            codec.read(store, "interim/test.csv"),
+            CsvCodec().read(store, "interim/test.csv"),
+        )
+
+    def test_handoff_kwargs(self, tmp_path):
+        store = LocalStore(str(tmp_path))
+        codec = HandoffCodec(CsvCodec(), Frames())
+
+        codec.write(store, self.data, "interim/test.csv")
+        codec.write(store, self.data, "interim/other.csv", index=False)
+
+        with mock.patch.object(CsvCodec, "read") as mock_read:
+            codec.read(store, "interim/test.csv")
+            codec.read(store, "interim/other.csv", delimiter=";")
+
+        mock_read.assert_has_calls(
+            [
+                mock.call(store, "interim/test.csv"),
+                mock.call(store, "interim/other.csv", delimiter=";"),
+            ]
+        )
+
+    def test_handoff_disabled(self):
+        codec = CsvCodec()
+
+        assert handoff(codec) is codec
+        assert isinstance(handoff(codec, Frames()), HandoffCodec)
+        assert handoff(codec, Frames()).extension == ".csv"
@@ -0,0 +1,40 @@
+import mock
+import pytest
+
+from collector.executor import execute
+
+
+def square(value):
+    if value < 0:
+        raise ValueError(value)
+    return value * value
+
+
+class TestExecute:
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_execute(self, workers):
+        results, errors = execute(square, [3, 1, 2], workers)
+
+        assert results == [(3, 9), (1, 1), (2, 4)]
+        assert not errors
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_execute_errors(self, workers):
+        results, errors = execute(square, [1, -1, 2, -2], workers)
+
+        assert results == [(1, 1), (2, 4)]
+        assert set(errors.keys()) == {-1, -2}
+        assert all(isinstance(error, ValueError) for error in errors.values())
+
+    @mock.patch("collector.executor.as_completed", return_value=[])
+    @mock.patch("collector.executor.ProcessPoolExecutor")
+    def test_execute_initializer(self, mock_executor, _):
+        execute(square, [1, 2], 2)
+
+        kwargs = mock_executor.call_args.kwargs
+        submit = mock_executor.return_value.__enter__.return_value.submit
+
+        assert kwargs["initargs"] == (square,)
+        assert kwargs["mp_context"].get_start_method() == "spawn"
+        assert [call.args[1] for call in submit.call_args_list] == [1, 2]
+        assert all(call.args[0] is not square for call in submit.call_args_list)
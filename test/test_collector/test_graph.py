@@ -0,0 +1,95 @@
+import threading
+import time
+
+import pytest
+
+from collector.graph import GraphError, Node, critical_path, dependencies, run_graph
+
+
+class TestDependencies:
+    def test_dependencies(self):
+        nodes = [
+            Node("get", None, [], ["raw"]),
+            Node("clean", None, ["raw"], ["interim"]),
+            Node("merge", None, ["interim"], ["processed/test"]),
+            Node("other", None, ["external"], ["processed/other"]),
+        ]
+
+        assert dependencies(nodes) == {
+            "get": set(),
+            "clean": {"get"},
+            "merge": {"clean"},
+            "other": set(),
+        }
+
+
+class TestRunGraph:
+    def test_run_graph(self):
+        calls = []
+        nodes = [
+            Node("merge", lambda: calls.append("merge"), ["interim"], ["processed"]),
+            Node("clean", lambda: calls.append("clean"), ["raw"], ["interim"]),
+            Node("get", lambda: calls.append("get"), [], ["raw"]),
+        ]
+
+        timings = run_graph(nodes)
+
+        assert calls == ["get", "clean", "merge"]
+        assert set(timings) == {"get", "clean", "merge"}
+
+    def test_run_graph_parallel(self):
+        barrier = threading.Barrier(3, timeout=5)
+        nodes = [
+            Node(f"get-{idx}", barrier.wait, [], [f"raw/{idx}"]) for idx in range(3)
+        ]
+
+        timings = run_graph(nodes, workers=3)
+
+        assert len(timings) == 3
+
+    def test_run_graph_error(self):
+        calls = []
+
+        def fail():
+            raise ValueError("failed")
+
+        nodes = [
+            Node("get-1", fail, [], ["raw/1"]),
+            Node("clean-1", lambda: calls.append("clean-1"), ["raw/1"], ["interim/1"]),
+            Node("merge-1", lambda: calls.append("merge-1"), ["interim/1"], ["out/1"]),
+            Node("get-2", lambda: calls.append("get-2"), [], ["raw/2"]),
+            Node("clean-2", lambda: calls.append("clean-2"), ["raw/2"], ["interim/2"]),
+        ]
+
+        with pytest.raises(GraphError) as error:
+            run_graph(nodes, workers=2)
+
+        assert calls == ["get-2", "clean-2"]
+        assert list(error.value.errors) == ["get-1"]
+        assert error.value.skipped == {"clean-1", "merge-1"}
+
+    def test_run_graph_cycle(self):
+        nodes = [
+            Node("a", lambda: None, ["b"], ["a"]),
+            Node("b", lambda: None, ["a"], ["b"]),
+        ]
+
+        with pytest.raises(ValueError):
+            run_graph(nodes)
+
+
+class TestCriticalPath:
+    def test_critical_path(self):
+        nodes = [
+            Node("get-1", lambda: time.sleep(0.05), [], ["raw/1"]),
+            Node("clean-1", lambda: time.sleep(0.05), ["raw/1"], ["interim/1"]),
+            Node("get-2", lambda: None, [], ["raw/2"]),
+            Node("clean-2", lambda: None, ["raw/2"], ["interim/2"]),
+        ]
+
+        timings = run_graph(nodes, workers=2)
+
+        assert critical_path(dependencies(nodes), timings) == ["get-1", "clean-1"]
+
+    def test_critical_path_empty(self):
+        assert not critical_path({}, {})
@@ -0,0 +1,114 @@
+import os
+
+from collector.manifest import Manifest
+from collector.store import LocalStore
+
+
+class TestManifestChanged:
+    def test_changed_new_file(self, tmp_path):
+        (tmp_path / "raw.csv").write_text("content", encoding="utf8")
+
+        manifest = Manifest(LocalStore(str(tmp_path)), "manifest.json")
+        manifest.load()
+
+        assert manifest.changed("raw.csv")
+
+    def test_changed_unchanged_file(self, tmp_path):
+        (tmp_path / "raw.csv").write_text("content", encoding="utf8")
+
+        manifest = Manifest(LocalStore(str(tmp_path)), "manifest.json")
+        (tmp_path / "interim.csv").write_text("output", encoding="utf8")
+        manifest.update("raw.csv", "interim.csv")
+        manifest.save()
+
+        manifest = Manifest(LocalStore(str(tmp_path)), "manifest.json")
+        manifest.load()
+
+        assert not manifest.changed("raw.csv")
+
+    def test_changed_touched_file(self, tmp_path):
+        (tmp_path / "raw.csv").write_text("content", encoding="utf8")
+
+        manifest = Manifest(LocalStore(str(tmp_path)), "manifest.json")
+        (tmp_path / "interim.csv").write_text("output", encoding="utf8")
+        manifest.update("raw.csv", "interim.csv")
+        manifest.save()
+
+        os.utime(tmp_path / "raw.csv", (0, 0))
+
+        manifest = Manifest(LocalStore(str(tmp_path)), "manifest.json")
+        manifest.load()
+
+        assert not manifest.changed("raw.csv")
+
+    def test_changed_modified_file(self, tmp_path):
+        (tmp_path / "raw.csv").write_text("content", encoding="utf8")
+
+        manifest = Manifest(LocalStore(str(tmp_path)), "manifest.json")
+        (tmp_path / "interim.csv").write_text("output", encoding="utf8")
+        manifest.update("raw.csv", "interim.csv")
+        manifest.save()
+
+        (tmp_path / "raw.csv").write_text("modified", encoding="utf8")
+
+        manifest = Manifest(LocalStore(str(tmp_path)), "manifest.json")
+        manifest.load()
+
+        assert manifest.changed("raw.csv")
+
+    def test_changed_missing_output(self, tmp_path):
+        (tmp_path / "raw.csv").write_text("content", encoding="utf8")
+        (tmp_path / "interim.csv").write_text("output", encoding="utf8")
+
+        manifest = Manifest(LocalStore(str(tmp_path)), "manifest.json")
+        manifest.update("raw.csv", "interim.csv")
+
+        assert not manifest.changed("raw.csv")
+
+        os.remove(tmp_path / "interim.csv")
+
+        assert manifest.changed("raw.csv")
+
+    def test_changed_truncated_output(self, tmp_path):
+        (tmp_path / "raw.csv").write_text("content", encoding="utf8")
+        (tmp_path / "interim.csv").write_text("output", encoding="utf8")
+
+        manifest = Manifest(LocalStore(str(tmp_path)), "manifest.json")
+        manifest.update("raw.csv", "interim.csv")
+
+        (tmp_path / "interim.csv").write_text("", encoding="utf8")
+
+        assert manifest.changed("raw.csv")
+
+    def test_changed_output_path(self, tmp_path):
+        (tmp_path / "raw.csv").write_text("content", encoding="utf8")
+        (tmp_path / "interim.csv").write_text("output", encoding="utf8")
+
+        manifest = Manifest(LocalStore(str(tmp_path)), "manifest.json")
+        manifest.update("raw.csv", "interim.csv")
+
+        assert not manifest.changed("raw.csv", "interim.csv")
+        assert manifest.changed("raw.csv", "interim.parquet")
+
+
+class TestManifestPrune:
+    def test_prune(self, tmp_path):
+        for name in ["a.csv", "b.csv", "interim.csv"]:
+            (tmp_path / name).write_text("content", encoding="utf8")
+
+        manifest = Manifest(LocalStore(str(tmp_path)), "manifest.json")
+        manifest.update("a.csv", "interim.csv")
+        manifest.update("b.csv", "interim.csv")
+        manifest.prune(["b.csv"])
+
+        assert manifest.changed("a.csv")
+        assert not manifest.changed("b.csv")
+
+
+class TestManifestLoad:
+    def test_load_missing_manifest(self, tmp_path):
+        manifest = Manifest(LocalStore(str(tmp_path)), "manifest.json")
+        manifest.load()
+        manifest.save()
+
+        assert (tmp_path / "manifest.json").read_text(encoding="utf8") == "{}"
@@ -0,0 +1,161 @@
+import os
+
+import mock
+
+from collector.manifest import Manifest
+from collector.memo import Memo
+from collector.store import LocalStore
+
+
+class TestMemoMatches:
+    def test_matches_new_memo(self, tmp_path):
+        (tmp_path / "interim.csv").write_text("content", encoding="utf8")
+
+        memo = Memo(LocalStore(str(tmp_path)), "memo.json")
+        memo.load()
+
+        assert not memo.matches(memo.fingerprint(["interim.csv"], {}, Memo))
+
+    def test_matches_unchanged_files(self, tmp_path):
+        (tmp_path / "interim.csv").write_text("content", encoding="utf8")
+
+        memo = Memo(LocalStore(str(tmp_path)), "memo.json")
+        memo.update(memo.fingerprint(["interim.csv"], {}, Memo))
+        memo.save()
+
+        os.utime(tmp_path / "interim.csv", (0, 0))
+
+        memo = Memo(LocalStore(str(tmp_path)), "memo.json")
+        memo.load()
+
+        assert memo.matches(memo.fingerprint(["interim.csv"], {}, Memo))
+
+    def test_matches_modified_file(self, tmp_path):
+        (tmp_path / "interim.csv").write_text("content", encoding="utf8")
+
+        memo = Memo(LocalStore(str(tmp_path)), "memo.json")
+        memo.update(memo.fingerprint(["interim.csv"], {}, Memo))
+        memo.save()
+
+        (tmp_path / "interim.csv").write_text("modified", encoding="utf8")
+
+        memo = Memo(LocalStore(str(tmp_path)), "memo.json")
+        memo.load()
+
+        assert not memo.matches(memo.fingerprint(["interim.csv"], {}, Memo))
+
+    def test_matches_added_file(self, tmp_path):
+        (tmp_path / "interim-1.csv").write_text("content", encoding="utf8")
+        (tmp_path / "interim-2.csv").write_text("content", encoding="utf8")
+
+        memo = Memo(LocalStore(str(tmp_path)), "memo.json")
+        memo.update(memo.fingerprint(["interim-1.csv"], {}, Memo))
+
+        assert not memo.matches(
+            memo.fingerprint(["interim-1.csv", "interim-2.csv"], {}, Memo)
+        )
+
+    def test_matches_changed_config(self, tmp_path):
+        (tmp_path / "interim.csv").write_text("content", encoding="utf8")
+
+        memo = Memo(LocalStore(str(tmp_path)), "memo.json")
+        memo.update(memo.fingerprint(["interim.csv"], {"format": "csv"}, Memo))
+
+        assert not memo.matches(
+            memo.fingerprint(["interim.csv"], {"format": "parquet"}, Memo)
+        )
+
+    def test_matches_changed_code(self, tmp_path):
+        (tmp_path / "interim.csv").write_text("content", encoding="utf8")
+
+        memo = Memo(LocalStore(str(tmp_path)), "memo.json")
+        memo.update(memo.fingerprint(["interim.csv"], {}, Memo))
+
+        assert not memo.matches(memo.fingerprint(["interim.csv"], {}, Manifest))
+
+    def test_matches_changed_helpers(self, tmp_path):
+        (tmp_path / "interim.csv").write_text("content", encoding="utf8")
+
+        memo = Memo(LocalStore(str(tmp_path)), "memo.json")
+        memo.update(memo.fingerprint(["interim.csv"], {}, Memo))
+
+        with mock.patch("collector.memo.HELPERS", ["collector.codec"]):
+            assert not memo.matches(memo.fingerprint(["interim.csv"], {}, Memo))
+
+
+class TestMemoLoad:
+    def test_load_missing_memo(self, tmp_path):
+        memo = Memo(LocalStore(str(tmp_path)), "memo.json")
+        memo.load()
+
+        assert not memo.matches(memo.fingerprint([], {}, Memo))
+        assert memo.matches(None)
+
+
+class TestMemoAdded:
+    def test_added_new_memo(self, tmp_path):
+        (tmp_path / "interim.csv").write_text("content", encoding="utf8")
+
+        memo = Memo(LocalStore(str(tmp_path)), "memo.json")
+        memo.load()
+        memo.fingerprint(["interim.csv"], {}, Memo)
+
+        assert memo.added() is None
+
+    def test_added_new_file(self, tmp_path):
+        (tmp_path / "interim-1.csv").write_text("content", encoding="utf8")
+        (tmp_path / "interim-2.csv").write_text("content", encoding="utf8")
+
+        memo = Memo(LocalStore(str(tmp_path)), "memo.json")
+        memo.update(memo.fingerprint(["interim-1.csv"], {}, Memo))
+        memo.save()
+
+        memo = Memo(LocalStore(str(tmp_path)), "memo.json")
+        memo.load()
+        memo.fingerprint(["interim-1.csv", "interim-2.csv"], {}, Memo)
+
+        assert memo.added() == ["interim-2.csv"]
+
+    def test_added_modified_file(self, tmp_path):
+        (tmp_path / "interim-1.csv").write_text("content", encoding="utf8")
+        (tmp_path / "interim-2.csv").write_text("content", encoding="utf8")
+
+        memo = Memo(LocalStore(str(tmp_path)), "memo.json")
+        memo.update(memo.fingerprint(["interim-1.csv"], {}, Memo))
+        memo.save()
+
+        (tmp_path / "interim-1.csv").write_text("modified", encoding="utf8")
+
+        memo = Memo(LocalStore(str(tmp_path)), "memo.json")
+        memo.load()
+        memo.fingerprint(["interim-1.csv", "interim-2.csv"], {}, Memo)
+
+        assert memo.added() is None
+
+    def test_added_changed_code(self, tmp_path):
+        (tmp_path / "interim-1.csv").write_text("content", encoding="utf8")
+        (tmp_path / "interim-2.csv").write_text("content", encoding="utf8")
+
+        memo = Memo(LocalStore(str(tmp_path)), "memo.json")
+        memo.update(memo.fingerprint(["interim-1.csv"], {}, Memo))
+        memo.save()
+
+        memo = Memo(LocalStore(str(tmp_path)), "memo.json")
+        memo.load()
+        memo.fingerprint(["interim-1.csv", "interim-2.csv"], {}, Manifest)
+
+        assert memo.added() is None
+
+    def test_added_changed_config(self, tmp_path):
+        (tmp_path / "interim-1.csv").write_text("content", encoding="utf8")
+        (tmp_path / "interim-2.csv").write_text("content", encoding="utf8")
+
+        memo = Memo(LocalStore(str(tmp_path)), "memo.json")
+        memo.update(memo.fingerprint(["interim-1.csv"], {"format": "csv"}, Memo))
+        memo.save()
+
+        memo = Memo(LocalStore(str(tmp_path)), "memo.json")
+        memo.load()
+        memo.fingerprint(["interim-1.csv", "interim-2.csv"], {"format": "gz"}, Memo)
+
+        assert memo.added() is None
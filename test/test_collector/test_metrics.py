@@ -0,0 +1,95 @@
+import json
+import logging
+
+import mock
+
+from collector.metrics import Metrics, count, record
+
+log = logging.getLogger("collector.test")
+
+
+class TestMetrics:
+    def test_stages(self):
+        with Metrics(trace_memory=True) as metrics:
+            log.info("Loading datasets")
+            log.info("Storing dataset for %s", "1970-01-01")
+            log.info("Storing dataset for %s", "1970-01-02")
+
+        report = metrics.report()
+        stages = {stage["stage"]: stage for stage in report["stages"]}
+
+        assert list(stages) == ["Loading datasets", "Storing dataset for %s"]
+        assert stages["Loading datasets"]["logger"] == "collector.test"
+        assert stages["Loading datasets"]["calls"] == 1
+        assert stages["Storing dataset for %s"]["calls"] == 2
+        assert stages["Storing dataset for %s"]["peak_traced"] is not None
+        assert stages["Storing dataset for %s"]["peak_rss"] > 0
+        assert report["duration"] >= sum(s["duration"] for s in report["stages"])
+
+    def test_stages_without_memory(self):
+        with Metrics() as metrics:
+            log.info("Loading datasets")
+
+        assert metrics.report()["stages"][0]["peak_traced"] is None
+
+    def test_stages_ignore_debug(self):
+        with Metrics() as metrics:
+            log.debug("Loading datasets")
+
+        assert metrics.report()["stages"] == []
+
+    def test_counters(self):
+        with Metrics() as metrics:
+            count("collector.test", "files_read")
+            count("collector.test", "files_read")
+            count("collector.test", "rows_written", 10)
+
+        count("collector.test", "files_read")
+
+        assert metrics.report()["counters"] == {
+            "collector.test": {"files_read": 2, "rows_written": 10}
+        }
+
+    def test_restore_level(self):
+        logger = logging.getLogger("collector")
+        logger.setLevel(logging.WARNING)
+
+        try:
+            with Metrics() as metrics:
+                assert logger.isEnabledFor(logging.INFO)
+                log.info("Loading datasets")
+        finally:
+            assert logger.level == logging.WARNING
+            logger.setLevel(logging.NOTSET)
+
+        assert len(metrics.report()["stages"]) == 1
+
+
+class TestRecord:
+    def test_record(self, tmp_path):
+        with record(str(tmp_path / "metrics.json")) as metrics:
+            log.info("Loading datasets")
+            count("collector.test", "files_read")
+
+        assert metrics is not None
+
+        report = json.loads((tmp_path / "metrics.json").read_text(encoding="utf8"))
+
+        assert report["stages"][0]["stage"] == "Loading datasets"
+        assert report["stages"][0]["peak_traced"] is None
+        assert report["counters"] == {"collector.test": {"files_read": 1}}
+
+    @mock.patch.dict("os.environ", {"COLLECTOR_TRACE_MEMORY": "1"})
+    def test_record_trace_memory(self, tmp_path):
+        with record(str(tmp_path / "metrics.json")):
+            log.info("Loading datasets")
+
+        report = json.loads((tmp_path / "metrics.json").read_text(encoding="utf8"))
+
+        assert report["stages"][0]["peak_traced"] is not None
+
+    def test_record_disabled(self):
+        with record(None) as metrics:
+            log.info("Loading datasets")
+
+        assert metrics is None
@@ -0,0 +1,123 @@
+import mock
+
+from fixtures import Client
+from data import create_config, create_national_response
+
+from collector.codec import CsvCodec
+from collector.pipeline import DATASETS, Pipeline
+from collector.tasks.get_national_dataset.task import GetNationalDataset
+from collector.tasks.clean_national_dataset.task import CleanNationalDataset
+from collector.tasks.merge_national_dataset.task import MergeNationalDataset
+from collector.store import LocalStore
+
+
+class TestPipeline:
+    @property
+    def config(self):
+        return create_config()
+
+    def download(self, tmp_path):
+        for (idx, response) in enumerate(create_national_response()):
+            (tmp_path / f"response-{idx}").write_text(response, encoding="utf8")
+
+        return [str(tmp_path / "response-0"), str(tmp_path / "response-1")]
+
+    @mock.patch.object(Client, "download")
+    def test_run(self, mock_download, tmp_path):
+        mock_download.side_effect = self.download(tmp_path) * 2
+
+        store = LocalStore(str(tmp_path / "pipeline"))
+        pipeline = Pipeline(self.config["collector"], Client(), store)
+        pipeline.run(["national"])
+
+        store = LocalStore(str(tmp_path / "tasks"))
+        for (task, inputs) in DATASETS["national"]:
+            if task is GetNationalDataset:
+                task(self.config["collector"], Client(), store)(**inputs)
+            else:
+                task(self.config["collector"], store)(**inputs)
+
+        for path in [
+            "raw/national/1970-01-01.csv",
+            "interim/national/1970-01-01.csv",
+            "processed/rivm-covid-19-national.csv",
+        ]:
+            assert (tmp_path / "pipeline" / path).read_bytes() == (
+                tmp_path / "tasks" / path
+            ).read_bytes()
+
+    @mock.patch.object(Client, "download")
+    def test_run_handoff(self, mock_download, tmp_path):
+        mock_download.side_effect = self.download(tmp_path)
+
+        store = LocalStore(str(tmp_path))
+        pipeline = Pipeline(self.config["collector"], Client(), store)
+
+        with mock.patch.object(CsvCodec, "read", autospec=True) as mock_read:
+            mock_read.side_effect = FileNotFoundError
+            pipeline.run(["national"])
+
+        # Only the previous processed output is read from the store
+        mock_read.assert_called_once_with(
+            mock.ANY, store, "processed/rivm-covid-19-national.csv"
+        )
+        assert (tmp_path / "processed" / "rivm-covid-19-national.csv").exists()
+
+    def test_create_nodes(self):
+        pipeline = Pipeline(self.config["collector"], Client(), LocalStore("/tmp"))
+        nodes = pipeline.create_nodes(["national", "municipality"])
+
+        assert [(node.name, node.reads, node.writes) for node in nodes] == [
+            ("GetNationalDataset", [], ["raw/national"]),
+            ("CleanNationalDataset", ["raw/national"], ["interim/national"]),
+            (
+                "MergeNationalDataset",
+                ["interim/national"],
+                ["processed/rivm-covid-19-national"],
+            ),
+            ("GetMunicipalityDataset", [], ["raw/municipality"]),
+            (
+                "CleanMunicipalityDataset",
+                ["raw/municipality"],
+                ["interim/municipality"],
+            ),
+            (
+                "MergeMunicipalityDataset",
+                ["interim/municipality"],
+                ["processed/rivm-covid-19-municipality"],
+            ),
+        ]
+
+    @mock.patch.object(CleanNationalDataset, "run")
+    @mock.patch.object(MergeNationalDataset, "run")
+    def test_run_task(self, mock_merge, mock_clean):
+        pipeline = Pipeline(self.config["collector"], Client(), LocalStore("/tmp"))
+        pipeline.run_task(
+            CleanNationalDataset, {"input_folder": "a", "output_folder": "b"}, True, 2
+        )
+        pipeline.run_task(
+            MergeNationalDataset,
+            {"name": "c", "input_folder": "b", "output_folder": "d"},
+            True,
+            2,
+        )
+
+        mock_clean.assert_called_once_with(
+            {"input_folder": "a", "output_folder": "b", "full": True, "workers": 2}
+        )
+        mock_merge.assert_called_once_with(
+            {"name": "c", "input_folder": "b", "output_folder": "d", "full": True}
+        )
+
+    @mock.patch("collector.pipeline.profiler.profile")
+    @mock.patch.object(CleanNationalDataset, "run")
+    def test_run_task_profile(self, mock_clean, mock_profile):
+        pipeline = Pipeline(self.config["collector"], Client(), LocalStore("/tmp"))
+        pipeline.run_task(
+            CleanNationalDataset,
+            {"input_folder": "a", "output_folder": "b"},
+            profile=True,
+        )
+
+        mock_profile.assert_called_once_with("CleanNationalDataset", True)
+        mock_clean.assert_called_once()
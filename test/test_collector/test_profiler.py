@@ -0,0 +1,69 @@
+import os
+
+import mock
+import pytest
+
+from collector.profiler import enabled, profile
+
+
+def _work():
+    return sum(sorted(range(10000), reverse=True))
+
+
+class TestEnabled:
+    @pytest.mark.parametrize(
+        "flag,value,expected",
+        [
+            (False, None, False),
+            (True, None, True),
+            (False, "1", True),
+            (False, "true", True),
+            (False, "0", False),
+            (False, "false", False),
+            (False, "", False),
+        ],
+    )
+    def test_enabled(self, flag, value, expected):
+        environ = {} if value is None else {"COLLECTOR_PROFILE": value}
+        with mock.patch.dict(os.environ, environ, clear=True):
+            assert enabled(flag) == expected
+
+
+class TestProfile:
+    def test_profile_disabled(self, tmp_path):
+        with mock.patch.dict(os.environ, {}, clear=True):
+            with profile("task", folder=str(tmp_path)) as profiler:
+                _work()
+
+        assert profiler is None
+        assert not os.listdir(tmp_path)
+
+    def test_profile_deterministic(self, tmp_path, capsys):
+        with profile("task", True, folder=str(tmp_path), sampling=False):
+            _work()
+
+        files = os.listdir(tmp_path)
+
+        assert len(files) == 1
+        assert files[0].startswith("task-")
+        assert files[0].endswith(".prof")
+        assert "_work" in capsys.readouterr().err
+
+    def test_profile_sampling(self, tmp_path, capsys):
+        pytest.importorskip("pyinstrument")
+
+        with profile("task", True, folder=str(tmp_path), sampling=True):
+            for _ in range(50):
+                _work()
+
+        files = os.listdir(tmp_path)
+
+        assert len(files) == 1
+        assert files[0].endswith(".collapsed")
+        assert "cumtime" in capsys.readouterr().err
+
+        with open(tmp_path / files[0], "r", encoding="utf8") as handle:
+            for line in handle:
+                stack, weight = line.rsplit(" ", 1)
+                assert stack
+                assert int(weight) > 0
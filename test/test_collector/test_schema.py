@@ -1,6 +1,14 @@
 import pytest
 
-from collector.schema import obj, string, validate, ValidationError
+from collector.schema import (
+    obj,
+    boolean,
+    iso_date,
+    optional,
+    string,
+    validate,
+    ValidationError,
+)
 
 
 class TestValidateSchema:
@@ -10,6 +18,25 @@ class TestValidateSchema:
 
         validate(schema, inputs)
 
+    def test_validate_schema_optional_input(self):
+        schema = obj(key=string(), flag=boolean(default=False))
+
+        validate(schema, {"key": "value"})
+        validate(schema, {"key": "value", "flag": True})
+
+    def test_validate_schema_nullable_input(self):
+        schema = obj(key=optional(string()))
+
+        validate(schema, {})
+        validate(schema, {"key": None})
+        validate(schema, {"key": "value"})
+
+    def test_validate_schema_date_input(self):
+        schema = obj(day=optional(iso_date()))
+
+        validate(schema, {"day": None})
+        validate(schema, {"day": "1970-01-01"})
+
     @pytest.mark.parametrize(
         "schema,inputs,messages",
         [
@@ -17,6 +44,20 @@ class TestValidateSchema:
             (obj(key=string()), None, ["None is not of type 'object'"]),
             (obj(key=string()), {"key": 1}, ["1 is not of type 'string'"]),
             (obj(key=string()), {"key-test": 1}, ["'key' is a required property"]),
+            (obj(flag=boolean()), {"flag": 1}, ["1 is not of type 'boolean'"]),
+            (
+                obj(day=iso_date()),
+                {"day": "1970-1-1"},
+                [
+                    r"'1970-1-1' does not match '^\\d{4}-\\d{2}-\\d{2}$'",
+                    "'1970-1-1' is not a 'date'",
+                ],
+            ),
+            (
+                obj(day=iso_date()),
+                {"day": "1970-02-30"},
+                ["'1970-02-30' is not a 'date'"],
+            ),
         ],
     )
     def test_validate_schema_invalid_input(self, schema, inputs, messages):
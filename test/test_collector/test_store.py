@@ -1,19 +1,41 @@
+from concurrent.futures import ThreadPoolExecutor
+import bz2
+import gzip
+import os
+import pickle
+
+import pandas as pd
 import pytest
 import mock
 
-from collector.store import LocalStore
+from collector.codec import CsvCodec
+from collector.store import (
+    InMemoryStore,
+    LocalStore,
+    SqliteStore,
+    create_store,
+    migrate,
+    relayout,
+)
 
 
 class TestStoreOpen:
     @mock.patch("collector.store.open")
     @mock.patch.object(LocalStore, "_ensure_dir_exists")
-    def test_open_write(self, mock_ensure_dir_exists, mock_open):
+    @mock.patch.object(LocalStore, "_commit")
+    def test_open_write(self, mock_commit, mock_ensure_dir_exists, mock_open):
         store = LocalStore("/tmp/")
         with store.open("test.txt", "w") as handle:
             handle.write("content")
 
+        temp_path = mock_commit.call_args.args[0]
+
         mock_ensure_dir_exists.assert_called_once_with("/tmp/test.txt")
-        mock_open.assert_called_once_with("/tmp/test.txt", "w", encoding="utf8")
+        mock_open.assert_called_once_with(temp_path, "w", encoding="utf8")
+        mock_commit.assert_called_once_with(temp_path, "/tmp/test.txt")
+
+        assert temp_path.startswith("/tmp/test.txt.")
+        assert temp_path.endswith(".tmp")
 
     @mock.patch("collector.store.open")
     @mock.patch.object(LocalStore, "_ensure_dir_exists")
@@ -29,14 +51,664 @@ class TestStoreOpen:
 
         assert content == ["content"]
 
+    @mock.patch("collector.store.open")
+    @mock.patch.object(LocalStore, "_ensure_dir_exists")
+    @mock.patch.object(LocalStore, "_commit")
+    def test_open_binary(self, mock_commit, mock_ensure_dir_exists, mock_open):
+        store = LocalStore("/tmp/")
+        with store.open("test.parquet", "wb") as handle:
+            handle.write(b"content")
+
+        temp_path = mock_commit.call_args.args[0]
+
+        mock_ensure_dir_exists.assert_called_once_with("/tmp/test.parquet")
+        mock_open.assert_called_once_with(temp_path, "wb")
+
+    def test_open_write_unchanged(self, tmp_path):
+        (tmp_path / "test.txt").write_text("content", encoding="utf8")
+        os.utime(tmp_path / "test.txt", (1, 1))
+
+        store = LocalStore(str(tmp_path))
+        with store.open("test.txt", "w") as handle:
+            handle.write("content")
+
+        assert os.stat(tmp_path / "test.txt").st_mtime == 1
+        assert os.listdir(tmp_path) == ["test.txt"]
+
+    def test_open_write_changed(self, tmp_path):
+        (tmp_path / "test.txt").write_text("content", encoding="utf8")
+
+        store = LocalStore(str(tmp_path))
+        with store.open("test.txt", "w") as handle:
+            handle.write("changed")
+
+        assert (tmp_path / "test.txt").read_text(encoding="utf8") == "changed"
+        assert os.listdir(tmp_path) == ["test.txt"]
+
+    def test_open_write_error(self, tmp_path):
+        (tmp_path / "test.txt").write_text("content", encoding="utf8")
+
+        store = LocalStore(str(tmp_path))
+        with pytest.raises(ValueError):
+            with store.open("test.txt", "w") as handle:
+                handle.write("partial")
+                raise ValueError()
+
+        assert (tmp_path / "test.txt").read_text(encoding="utf8") == "content"
+        assert os.listdir(tmp_path) == ["test.txt"]
+
+
+class TestStoreIndex:
+    def test_latest_range(self, tmp_path):
+        store = LocalStore(str(tmp_path), compression={"raw": "gz"})
+        for path in [
+            "raw/1970-01-01-ic-count.json",
+            "raw/1970-01-02-ic-count.json",
+            "raw/1970-01-02-died-cumulative.json",
+            "raw/1970-01-03-ic-count.csv",
+            "raw/.manifest.json",
+        ]:
+            with store.open(path, "w") as handle:
+                handle.write("[]")
+
+        assert store.latest("raw") == [f"{tmp_path}/raw/1970-01-03-ic-count.csv"]
+        assert store.latest("raw", "*.json") == [
+            f"{tmp_path}/raw/1970-01-02-died-cumulative.json",
+            f"{tmp_path}/raw/1970-01-02-ic-count.json",
+        ]
+        assert store.range("raw", "1970-01-01", "1970-01-01") == [
+            f"{tmp_path}/raw/1970-01-01-ic-count.json"
+        ]
+        assert len(store.range("raw", since="1970-01-02")) == 3
+        assert store.latest("missing") == []
+
+    def test_invalidate_write(self, tmp_path):
+        store = LocalStore(str(tmp_path))
+        with store.open("raw/1970-01-01.csv", "w") as handle:
+            handle.write("a")
+
+        assert store.latest("raw") == [f"{tmp_path}/raw/1970-01-01.csv"]
+
+        # Pin the folder mtime so only the write itself can invalidate
+        mtime = os.stat(tmp_path / "raw").st_mtime_ns
+        with store.open("raw/1970-01-02.csv", "w") as handle:
+            handle.write("b")
+        os.utime(tmp_path / "raw", ns=(mtime, mtime))
+
+        assert store.latest("raw") == [f"{tmp_path}/raw/1970-01-02.csv"]
+
+    def test_invalidate_mtime(self, tmp_path):
+        store = LocalStore(str(tmp_path))
+        with store.open("raw/1970-01-01.csv", "w") as handle:
+            handle.write("a")
+
+        assert store.latest("raw") == [f"{tmp_path}/raw/1970-01-01.csv"]
+
+        (tmp_path / "raw" / "1970-01-02.csv").write_text("b", encoding="utf8")
+        os.utime(tmp_path / "raw", ns=(0, 0))
+
+        assert store.latest("raw") == [f"{tmp_path}/raw/1970-01-02.csv"]
+
+    @mock.patch("os.listdir")
+    def test_cached(self, mock_listdir, tmp_path):
+        (tmp_path / "raw").mkdir()
+        mock_listdir.return_value = ["1970-01-01.csv", "1970-01-02.csv.gz", "a.tmp"]
+
+        store = LocalStore(str(tmp_path))
+        store.latest("raw")
+        store.range("raw")
+
+        mock_listdir.assert_called_once_with(f"{tmp_path}/raw")
+        assert store.range("raw") == [
+            f"{tmp_path}/raw/1970-01-01.csv",
+            f"{tmp_path}/raw/1970-01-02.csv",
+        ]
+
+    def test_pickle(self, tmp_path):
+        store = LocalStore(str(tmp_path), compression="gz")
+        store.latest("raw")
+
+        store = pickle.loads(pickle.dumps(store))
+        with store.open("raw/1970-01-01.csv", "w") as handle:
+            handle.write("content")
+
+        assert (tmp_path / "raw" / "1970-01-01.csv.gz").exists()
+        assert store.latest("raw") == [f"{tmp_path}/raw/1970-01-01.csv"]
+
+
+class TestStorePartition:
+    def test_open(self, tmp_path):
+        store = LocalStore(str(tmp_path), partition=["raw/intensive-care"])
+        with store.open("raw/intensive-care/2020-04-06-ic-count.json", "w") as handle:
+            handle.write("[]")
+        with store.open("raw/intensive-care/.manifest.json", "w") as handle:
+            handle.write("{}")
+        with store.open("raw/intensive-care/2020-04-06-ic-count.json", "r") as handle:
+            content = handle.read()
+
+        assert content == "[]"
+        assert (
+            tmp_path / "raw/intensive-care/2020/04/2020-04-06-ic-count.json"
+        ).exists()
+        assert (tmp_path / "raw/intensive-care/.manifest.json").exists()
+        assert store.stat("raw/intensive-care/2020-04-06-ic-count.json").size == 2
+
+    def test_open_flat(self, tmp_path):
+        (tmp_path / "raw").mkdir()
+        (tmp_path / "raw" / "2020-04-06.json").write_text("[]", encoding="utf8")
+
+        store = LocalStore(str(tmp_path), partition=["raw"])
+        with store.open("raw/2020-04-06.json", "r") as handle:
+            assert handle.read() == "[]"
+
+        # Writes move the file into its partition
+        with store.open("raw/2020-04-06.json", "w") as handle:
+            handle.write("[1]")
+
+        assert os.listdir(tmp_path / "raw") == ["2020"]
+
+    def test_list(self, tmp_path):
+        store = LocalStore(str(tmp_path), partition=["raw"])
+        for path in [
+            "raw/2020-04-06.json",
+            "raw/2020-05-01.json",
+            "raw/2020-05-01.csv",
+            "raw/.manifest.json",
+        ]:
+            with store.open(path, "w") as handle:
+                handle.write("[]")
+        (tmp_path / "raw" / "2020-03-01.json").write_text("[]", encoding="utf8")
+
+        assert sorted(store.list("raw/*.json")) == [
+            f"{tmp_path}/raw/2020-03-01.json",
+            f"{tmp_path}/raw/2020-04-06.json",
+            f"{tmp_path}/raw/2020-05-01.json",
+        ]
+        assert store.list("raw/2020-05-01.csv") == [f"{tmp_path}/raw/2020-05-01.csv"]
+        assert store.list("raw/.manifest.json") == [f"{tmp_path}/raw/.manifest.json"]
+
+    @mock.patch("glob.glob", return_value=[])
+    def test_list_month(self, mock_glob):
+        store = LocalStore("/tmp", partition=["raw"])
+        store.list("raw/2020-04-06-*.json")
+
+        mock_glob.assert_has_calls(
+            [
+                mock.call("/tmp/raw/2020-04-06-*.json*"),
+                mock.call("/tmp/raw/2020/04/2020-04-06-*.json*"),
+            ]
+        )
+
+    def test_latest_range(self, tmp_path):
+        store = LocalStore(str(tmp_path), partition=["raw"])
+        for path in [
+            "raw/2020-04-30-ic-count.json",
+            "raw/2020-05-01-ic-count.json",
+            "raw/2020-05-01-ic-count.csv",
+            "raw/2020-05-02-ic-count.csv",
+        ]:
+            with store.open(path, "w") as handle:
+                handle.write("[]")
+        (tmp_path / "raw" / "2020-05-01-died.json").write_text("[]", encoding="utf8")
+
+        assert store.latest("raw") == [f"{tmp_path}/raw/2020-05-02-ic-count.csv"]
+        assert store.latest("raw", "*.json") == [
+            f"{tmp_path}/raw/2020-05-01-died.json",
+            f"{tmp_path}/raw/2020-05-01-ic-count.json",
+        ]
+        assert store.range("raw", "2020-04-01", "2020-04-30") == [
+            f"{tmp_path}/raw/2020-04-30-ic-count.json"
+        ]
+        assert len(store.range("raw", since="2020-05-01")) == 4
+
+    @mock.patch("os.listdir", return_value=[])
+    def test_range_partitions(self, mock_listdir, tmp_path):
+        for month in ["2020/03", "2020/04", "2021/01"]:
+            (tmp_path / "raw" / month).mkdir(parents=True)
+
+        store = LocalStore(str(tmp_path), partition=["raw"])
+        store.range("raw", "2020-04-01", "2020-12-31")
+
+        mock_listdir.assert_has_calls(
+            [mock.call(f"{tmp_path}/raw"), mock.call(f"{tmp_path}/raw/2020/04")]
+        )
+        assert mock_listdir.call_count == 2
+
+
+class TestRelayout:
+    def test_relayout(self, tmp_path):
+        (tmp_path / "raw").mkdir()
+        for name in ["2020-04-06.json", "2020-05-01.json.gz", ".manifest.json"]:
+            (tmp_path / "raw" / name).write_text("[]", encoding="utf8")
+
+        assert relayout(str(tmp_path), ["raw"]) == 2
+        assert relayout(str(tmp_path), ["raw"]) == 0
+        assert sorted(os.listdir(tmp_path / "raw")) == [".manifest.json", "2020"]
+        assert (tmp_path / "raw/2020/05/2020-05-01.json.gz").exists()
+
+        assert relayout(str(tmp_path), ["raw"], flatten=True) == 2
+        assert sorted(os.listdir(tmp_path / "raw")) == [
+            ".manifest.json",
+            "2020-04-06.json",
+            "2020-05-01.json.gz",
+        ]
+
+    def test_migrate(self, tmp_path):
+        (tmp_path / "data/raw/2020/04").mkdir(parents=True)
+        (tmp_path / "data/raw/2020/04/2020-04-06.json").write_text("[]", "utf8")
+
+        store = SqliteStore(str(tmp_path / "store.sqlite"))
+        migrate(str(tmp_path / "data"), store)
+
+        assert store.list("raw/*") == ["raw/2020-04-06.json"]
+
+
+class TestStoreCompression:
+    @pytest.mark.parametrize(
+        "compression,decompress",
+        [("gz", gzip.decompress), ("bz2", bz2.decompress), ("zst", None)],
+    )
+    def test_open_compressed(self, tmp_path, compression, decompress):
+        if compression == "zst":
+            zstandard = pytest.importorskip("zstandard")
+            decompress = zstandard.ZstdDecompressor().decompressobj().decompress
+
+        store = LocalStore(str(tmp_path))
+        with store.open(f"test.csv.{compression}", "w") as handle:
+            handle.write("a,b\n1,2\n")
+        with store.open(f"test.csv.{compression}", "r") as handle:
+            content = handle.read()
+
+        data = (tmp_path / f"test.csv.{compression}").read_bytes()
+
+        assert decompress(data) == b"a,b\n1,2\n"
+        assert content == "a,b\n1,2\n"
+
+    def test_open_compressed_binary(self, tmp_path):
+        store = LocalStore(str(tmp_path))
+        with store.open("test.bin.gz", "wb") as handle:
+            handle.write(b"\x00\x01")
+        with store.open("test.bin.gz", "rb") as handle:
+            content = handle.read()
+
+        assert content == b"\x00\x01"
+
+    def test_open_compressed_unchanged(self, tmp_path):
+        store = LocalStore(str(tmp_path))
+        with store.open("test.csv.gz", "w") as handle:
+            handle.write("content")
+        os.utime(tmp_path / "test.csv.gz", (1, 1))
+
+        with store.open("test.csv.gz", "w") as handle:
+            handle.write("content")
+
+        assert os.stat(tmp_path / "test.csv.gz").st_mtime == 1
+
+    def test_open_default_compression(self, tmp_path):
+        store = LocalStore(str(tmp_path), compression="gz")
+        with store.open("test.csv", "w") as handle:
+            handle.write("content")
+        with store.open("test.csv", "r") as handle:
+            content = handle.read()
+
+        assert content == "content"
+        assert os.listdir(tmp_path) == ["test.csv.gz"]
+        assert store.list("*.csv") == [str(tmp_path / "test.csv")]
+        assert store.stat("test.csv").size == os.stat(tmp_path / "test.csv.gz").st_size
+
+    def test_open_folder_compression(self, tmp_path):
+        store = LocalStore(str(tmp_path), compression={"raw": "gz"})
+        with store.open("raw/test.csv", "w") as handle:
+            handle.write("content")
+        with store.open("processed/test.csv", "w") as handle:
+            handle.write("content")
+
+        assert os.listdir(tmp_path / "raw") == ["test.csv.gz"]
+        assert os.listdir(tmp_path / "processed") == ["test.csv"]
+
+    def test_open_replace_compressed(self, tmp_path):
+        (tmp_path / "test.csv.gz").write_bytes(gzip.compress(b"old"))
+
+        store = LocalStore(str(tmp_path))
+        with store.open("test.csv", "w") as handle:
+            handle.write("new")
+        with store.open("test.csv", "r") as handle:
+            content = handle.read()
+
+        assert content == "new"
+        assert os.listdir(tmp_path) == ["test.csv"]
+
+    def test_codec(self, tmp_path):
+        data = pd.DataFrame({"a": [1, 2], "b": ["c", "d"]})
+
+        store = LocalStore(str(tmp_path), compression="bz2")
+        CsvCodec().write(store, data, "test.csv", index=False)
+
+        pd.testing.assert_frame_equal(CsvCodec().read(store, "test.csv"), data)
+
+    @pytest.mark.parametrize("compression", ["zip", {"raw": "zip"}])
+    def test_unknown_compression(self, compression):
+        with pytest.raises(ValueError):
+            LocalStore("/tmp", compression=compression)
+
+
+class TestCreateStore:
+    def test_create_store(self, tmp_path):
+        store = create_store({"path": str(tmp_path), "compression": "gz"})
+        with store.open("raw/test.csv", "w") as handle:
+            handle.write("content")
+
+        assert isinstance(store, LocalStore)
+        assert (tmp_path / "raw" / "test.csv.gz").exists()
+        assert not (tmp_path / "raw" / "test.csv").exists()
+
+    def test_create_store_sqlite(self, tmp_path):
+        store = create_store({"type": "sqlite", "path": str(tmp_path / "a.sqlite")})
+
+        assert isinstance(store, SqliteStore)
+
+    @pytest.mark.parametrize(
+        "option", [{"compression": "gz"}, {"partition": ["raw/intensive-care"]}]
+    )
+    def test_create_store_sqlite_options(self, tmp_path, option):
+        with pytest.raises(ValueError):
+            create_store(
+                {"type": "sqlite", "path": str(tmp_path / "a.sqlite"), **option}
+            )
+
+    def test_create_store_unknown(self):
+        with pytest.raises(ValueError):
+            create_store({"type": "s3", "path": "/tmp"})
+
+    def test_create_store_defaults(self, tmp_path):
+        store = create_store({"path": str(tmp_path)})
+        with store.open("raw/1970-01-01.csv", "w") as handle:
+            handle.write("content")
+
+        assert (tmp_path / "raw" / "1970-01-01.csv").exists()
+
+    def test_create_store_partition(self, tmp_path):
+        store = create_store(
+            {"path": str(tmp_path), "partition": ["raw/intensive-care/"]}
+        )
+        with store.open("raw/intensive-care/1970-01-01.json", "w") as handle:
+            handle.write("[]")
+
+        assert (tmp_path / "raw/intensive-care/1970/01/1970-01-01.json").exists()
+
+
+class TestSqliteStore:
+    def test_open(self, tmp_path):
+        store = SqliteStore(str(tmp_path / "store.sqlite"))
+        with store.open("raw/test.csv", "w") as handle:
+            handle.write("content")
+        with store.open("raw/test.csv", "r") as handle:
+            content = handle.read()
+
+        assert content == "content"
+
+    def test_open_binary(self, tmp_path):
+        store = SqliteStore(str(tmp_path / "store.sqlite"))
+        with store.open("raw/test.bin", "wb") as handle:
+            handle.write(b"\x00\x01")
+        with store.open("raw/test.bin", "rb") as handle:
+            content = handle.read()
+
+        assert content == b"\x00\x01"
+
+    def test_open_missing(self, tmp_path):
+        store = SqliteStore(str(tmp_path / "store.sqlite"))
+        with pytest.raises(FileNotFoundError):
+            with store.open("raw/test.csv", "r"):
+                pass
+
+    def test_open_write_error(self, tmp_path):
+        store = SqliteStore(str(tmp_path / "store.sqlite"))
+        with pytest.raises(ValueError):
+            with store.open("raw/test.csv", "w") as handle:
+                handle.write("partial")
+                raise ValueError()
+
+        assert store.list("raw/*") == []
+
+    def test_open_write_unchanged(self, tmp_path):
+        store = SqliteStore(str(tmp_path / "store.sqlite"))
+        with store.open("raw/test.csv", "w") as handle:
+            handle.write("content")
+        mtime = store.stat("raw/test.csv").mtime
+
+        with store.open("raw/test.csv", "w") as handle:
+            handle.write("content")
+
+        assert store.stat("raw/test.csv") == (7, mtime)
+
+    def test_list(self, tmp_path):
+        store = SqliteStore(str(tmp_path / "store.sqlite"))
+        for path in [
+            "raw/1970-01-02.csv",
+            "raw/1970-01-01.csv",
+            "raw/.manifest.json",
+            "raw/nested/1970-01-01.csv",
+            "interim/1970-01-01.csv",
+        ]:
+            with store.open(path, "w") as handle:
+                handle.write("content")
+
+        assert store.list("raw/*.csv") == ["raw/1970-01-01.csv", "raw/1970-01-02.csv"]
+        assert store.list("raw/1970-01-01.csv") == ["raw/1970-01-01.csv"]
+        assert store.list("*/1970-01-01.csv") == [
+            "interim/1970-01-01.csv",
+            "raw/1970-01-01.csv",
+        ]
+        assert store.list("raw/missing.csv") == []
+
+    def test_latest_range(self, tmp_path):
+        store = SqliteStore(str(tmp_path / "store.sqlite"))
+        for path in [
+            "raw/1970-01-01-ic-count.json",
+            "raw/1970-01-02-ic-count.json",
+            "raw/1970-01-02-died-cumulative.json",
+            "raw/1970-01-03-ic-count.json",
+        ]:
+            with store.open(path, "w") as handle:
+                handle.write("[]")
+
+        assert store.latest("raw") == ["raw/1970-01-03-ic-count.json"]
+        assert store.range("raw", "1970-01-02", "1970-01-02") == [
+            "raw/1970-01-02-died-cumulative.json",
+            "raw/1970-01-02-ic-count.json",
+        ]
+        assert len(store.range("raw", since="1970-01-02")) == 3
+        assert store.latest("raw", "*-died-*") == [
+            "raw/1970-01-02-died-cumulative.json"
+        ]
+        assert store.latest("missing") == []
+
+    def test_threads(self, tmp_path):
+        store = SqliteStore(str(tmp_path / "store.sqlite"))
+
+        def write(idx):
+            with store.open(f"raw/{idx}.csv", "w") as handle:
+                handle.write(str(idx))
+
+        with ThreadPoolExecutor(4) as executor:
+            list(executor.map(write, range(20)))
+
+        assert len(store.list("raw/*.csv")) == 20
+
+    def test_pickle(self, tmp_path):
+        store = SqliteStore(str(tmp_path / "store.sqlite"))
+        with store.open("raw/test.csv", "w") as handle:
+            handle.write("content")
+
+        store = pickle.loads(pickle.dumps(store))
+        with store.open("raw/test.csv", "r") as handle:
+            assert handle.read() == "content"
+
+    def test_codec(self, tmp_path):
+        data = pd.DataFrame({"a": [1, 2], "b": ["c", "d"]})
+
+        store = SqliteStore(str(tmp_path / "store.sqlite"))
+        CsvCodec().write(store, data, "processed/test.csv", index=False)
+
+        pd.testing.assert_frame_equal(
+            CsvCodec().read(store, "processed/test.csv"), data
+        )
+
+
+class TestInMemoryStore:
+    def test_open(self):
+        store = InMemoryStore()
+        with store.open("raw/test.csv", "w") as handle:
+            handle.write("content")
+        with store.open("raw/test.csv", "r") as handle:
+            content = handle.read()
+
+        assert content == "content"
+        assert store.stat("raw/test.csv").size == 7
+
+    def test_open_missing(self):
+        store = InMemoryStore()
+        with pytest.raises(FileNotFoundError):
+            with store.open("raw/test.csv", "r"):
+                pass
+        with pytest.raises(FileNotFoundError):
+            store.stat("raw/test.csv")
+
+    def test_open_write_error(self):
+        store = InMemoryStore()
+        with pytest.raises(ValueError):
+            with store.open("raw/test.csv", "w") as handle:
+                handle.write("partial")
+                raise ValueError()
+
+        assert store.list("raw/*") == []
+
+    def test_list(self):
+        store = InMemoryStore()
+        for path in [
+            "raw/1970-01-02.csv",
+            "raw/1970-01-01.csv",
+            "raw/.manifest.json",
+            "raw/nested/1970-01-01.csv",
+            "interim/1970-01-01.csv",
+        ]:
+            with store.open(path, "w") as handle:
+                handle.write("content")
+
+        assert store.list("raw/*.csv") == ["raw/1970-01-01.csv", "raw/1970-01-02.csv"]
+        assert store.list("*/1970-01-01.csv") == [
+            "interim/1970-01-01.csv",
+            "raw/1970-01-01.csv",
+        ]
+        assert store.list("raw/missing.csv") == []
+
+    def test_backing(self, tmp_path):
+        backing = LocalStore(str(tmp_path), compression="gz")
+        with backing.open("raw/a.csv", "w") as handle:
+            handle.write("a")
+
+        with InMemoryStore(backing) as store:
+            with store.open("raw/b.csv", "w") as handle:
+                handle.write("b")
+
+            assert store.list("raw/*.csv") == ["raw/a.csv", "raw/b.csv"]
+            assert not (tmp_path / "raw" / "b.csv.gz").exists()
+            with store.open("raw/a.csv", "r") as handle:
+                assert handle.read() == "a"
+
+        assert sorted(os.listdir(tmp_path / "raw")) == ["a.csv.gz", "b.csv.gz"]
+        with backing.open("raw/b.csv", "r") as handle:
+            assert handle.read() == "b"
+
+    def test_latest_range(self):
+        store = InMemoryStore()
+        for path in [
+            "raw/1970-01-01-ic-count.json",
+            "raw/1970-01-02-ic-count.json",
+            "raw/1970-01-02-ic-count.csv",
+        ]:
+            with store.open(path, "w") as handle:
+                handle.write("[]")
+
+        assert store.latest("raw", "*.json") == ["raw/1970-01-02-ic-count.json"]
+        assert store.range("raw", until="1970-01-01") == [
+            "raw/1970-01-01-ic-count.json"
+        ]
+        assert store.latest("missing") == []
+
+    def test_spill(self, tmp_path):
+        store = InMemoryStore()
+        with store.open("raw/a.csv", "w") as handle:
+            handle.write("a")
+
+        target = SqliteStore(str(tmp_path / "store.sqlite"))
+
+        assert store.spill(target) == 1
+        assert store.spill(target) == 0
+        assert target.list("raw/*") == ["raw/a.csv"]
+
+    def test_spill_without_target(self):
+        with pytest.raises(ValueError):
+            InMemoryStore().spill()
+
+    def test_pickle(self):
+        with pytest.raises(TypeError):
+            pickle.dumps(InMemoryStore())
+
+    def test_codec(self):
+        data = pd.DataFrame({"a": [1, 2], "b": ["c", "d"]})
+
+        store = InMemoryStore()
+        CsvCodec().write(store, data, "processed/test.csv", index=False)
+
+        pd.testing.assert_frame_equal(
+            CsvCodec().read(store, "processed/test.csv"), data
+        )
+
+
+class TestMigrate:
+    def test_migrate(self, tmp_path):
+        (tmp_path / "data" / "raw").mkdir(parents=True)
+        (tmp_path / "data" / "raw" / "a.csv").write_text("a", encoding="utf8")
+        (tmp_path / "data" / "raw" / "b.csv.gz").write_bytes(gzip.compress(b"b"))
+        (tmp_path / "data" / "raw" / "c.csv.1-1.tmp").write_text("c", encoding="utf8")
+
+        store = SqliteStore(str(tmp_path / "store.sqlite"))
+        count = migrate(str(tmp_path / "data"), store)
+
+        assert count == 2
+        assert store.list("raw/*") == ["raw/a.csv", "raw/b.csv"]
+        with store.open("raw/b.csv", "r") as handle:
+            assert handle.read() == "b"
+
 
 class TestStoreList:
     @mock.patch("glob.glob")
     def test_list(self, mock_glob):
+        mock_glob.return_value = ["/tmp/a.txt", "/tmp/b.txt.gz", "/tmp/c.txt.tmp"]
+
+        store = LocalStore("/tmp")
+        files = store.list("*.txt")
+
+        mock_glob.assert_called_once_with("/tmp/*.txt*")
+
+        assert files == ["/tmp/a.txt", "/tmp/b.txt"]
+
+
+class TestStoreStat:
+    @mock.patch("os.path.exists", return_value=True)
+    @mock.patch("os.stat")
+    def test_stat(self, mock_stat, _):
+        mock_stat.return_value = mock.Mock(st_size=100, st_mtime=1.5)
+
         store = LocalStore("/tmp")
-        store.list("*.txt")
+        stat = store.stat("test.txt")
+
+        mock_stat.assert_called_once_with("/tmp/test.txt")
 
-        mock_glob.assert_called_once_with("/tmp/*.txt")
+        assert stat.size == 100
+        assert stat.mtime == 1.5
 
 
 class TestStoreIsWriteMode:
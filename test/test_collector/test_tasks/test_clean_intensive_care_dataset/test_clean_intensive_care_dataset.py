@@ -58,10 +58,12 @@ class TestCleanIntensiveCareDatasetRun:
         for (idx, error) in enumerate(error.value.errors):
             assert error.message == messages[idx]
 
+    @mock.patch("collector.tasks.clean_intensive_care_dataset.task.Manifest")
     @mock.patch.object(Store, "list")
     @mock.patch.object(CleanIntensiveCareDataset, "_read")
     @mock.patch.object(CleanIntensiveCareDataset, "_write")
-    def test_run_old_format(self, mock_write, mock_read, mock_list):
+    def test_run_old_format(self, mock_write, mock_read, mock_list, mock_manifest):
+        mock_manifest.return_value.changed.return_value = True
         mock_list.return_value = [
             "raw/1970-01-01.json",
         ]
@@ -106,6 +108,7 @@ class TestCleanIntensiveCareDatasetRun:
             check_dtype=False,
         )
 
+    @mock.patch("collector.tasks.clean_intensive_care_dataset.task.Manifest")
     @mock.patch.object(Store, "list")
     @mock.patch.object(CleanIntensiveCareDataset, "_read")
     @mock.patch.object(CleanIntensiveCareDataset, "_write")
@@ -155,8 +158,16 @@ class TestCleanIntensiveCareDatasetRun:
         ],
     )
     def test_run_new_format(
-        self, mock_write, mock_read, mock_list, file, input_dataset, output_dataset,
+        self,
+        mock_write,
+        mock_read,
+        mock_list,
+        mock_manifest,
+        file,
+        input_dataset,
+        output_dataset,
     ):
+        mock_manifest.return_value.changed.return_value = True
         mock_list.return_value = [file]
         mock_read.return_value = pd.DataFrame(input_dataset)
 
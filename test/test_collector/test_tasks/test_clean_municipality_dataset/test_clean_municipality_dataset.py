@@ -58,6 +58,7 @@ class TestCleanMunicipalityDatasetRun:
         for (idx, error) in enumerate(error.value.errors):
             assert error.message == messages[idx]
 
+    @mock.patch("collector.tasks.clean_municipality_dataset.task.Manifest")
     @mock.patch.object(Store, "list")
     @mock.patch.object(CleanMunicipalityDataset, "_read")
     @mock.patch.object(CleanMunicipalityDataset, "_write")
@@ -139,10 +140,12 @@ class TestCleanMunicipalityDatasetRun:
         mock_write,
         mock_read,
         mock_list,
+        mock_manifest,
         input_date,
         input_dataset,
         output_dataset,
     ):
+        mock_manifest.return_value.changed.return_value = True
         mock_list.return_value = [f"raw/{input_date}.csv"]
         mock_read.side_effect = [
             pd.DataFrame(
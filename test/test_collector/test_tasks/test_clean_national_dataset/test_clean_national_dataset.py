@@ -7,7 +7,9 @@ from fixtures import Store
 from data import create_config
 
 from collector.tasks.clean_national_dataset.task import CleanNationalDataset
+from collector.executor import ExecutionError
 from collector.schema import ValidationError
+from collector.store import LocalStore
 
 
 class TestCleanNationalDatasetRun:
@@ -58,10 +60,12 @@ class TestCleanNationalDatasetRun:
         for (idx, error) in enumerate(error.value.errors):
             assert error.message == messages[idx]
 
+    @mock.patch("collector.tasks.clean_national_dataset.task.Manifest")
     @mock.patch.object(Store, "list")
     @mock.patch.object(CleanNationalDataset, "_read")
     @mock.patch.object(CleanNationalDataset, "_write")
-    def test_run(self, mock_write, mock_read, mock_list):
+    def test_run(self, mock_write, mock_read, mock_list, mock_manifest):
+        mock_manifest.return_value.changed.return_value = True
         mock_list.return_value = ["raw/1970-01-01.csv"]
         mock_read.return_value = pd.DataFrame(
             {"PositiefGetest": [1000], "Opgenomen": [2000], "Overleden": [3000]}
@@ -89,6 +93,139 @@ class TestCleanNationalDatasetRun:
             check_dtype=False,
         )
 
+    @mock.patch("collector.tasks.clean_national_dataset.task.Manifest")
+    @mock.patch.object(Store, "list")
+    @mock.patch.object(CleanNationalDataset, "_read")
+    @mock.patch.object(CleanNationalDataset, "_write")
+    def test_run_unchanged(self, mock_write, mock_read, mock_list, mock_manifest):
+        mock_manifest.return_value.changed.return_value = False
+        mock_list.return_value = ["raw/1970-01-01.csv"]
+
+        task = CleanNationalDataset(self.config["collector"], Store())
+        task(input_folder="raw", output_folder="interim")
+
+        mock_manifest.assert_called_once_with(mock.ANY, "interim/.manifest.json")
+        mock_manifest.return_value.load.assert_called_once()
+        mock_manifest.return_value.changed.assert_called_once_with(
+            "raw/1970-01-01.csv", "interim/1970-01-01.csv"
+        )
+        mock_manifest.return_value.update.assert_not_called()
+        mock_manifest.return_value.prune.assert_called_once_with(["raw/1970-01-01.csv"])
+        mock_manifest.return_value.save.assert_called_once()
+        mock_read.assert_not_called()
+        mock_write.assert_not_called()
+
+    @mock.patch("collector.tasks.clean_national_dataset.task.Manifest")
+    @mock.patch.object(Store, "list")
+    @mock.patch.object(CleanNationalDataset, "_read")
+    @mock.patch.object(CleanNationalDataset, "_write")
+    def test_run_full(self, mock_write, mock_read, mock_list, mock_manifest):
+        mock_manifest.return_value.changed.return_value = True
+        mock_list.return_value = ["raw/1970-01-01.csv"]
+        mock_read.return_value = pd.DataFrame({"PositiefGetest": [1000]})
+
+        task = CleanNationalDataset(self.config["collector"], Store())
+        task(input_folder="raw", output_folder="interim", full=True)
+
+        mock_manifest.return_value.load.assert_not_called()
+        mock_manifest.return_value.update.assert_called_once_with(
+            "raw/1970-01-01.csv", "interim/1970-01-01.csv"
+        )
+        mock_manifest.return_value.save.assert_called_once()
+        mock_write.assert_called_once_with(
+            mock.ANY, "interim/1970-01-01.csv", index=False
+        )
+
+    @mock.patch("collector.tasks.clean_national_dataset.task.Manifest")
+    @mock.patch.object(Store, "list")
+    @mock.patch.object(CleanNationalDataset, "_read")
+    @mock.patch.object(CleanNationalDataset, "_write")
+    def test_run_error(self, mock_write, mock_read, mock_list, mock_manifest):
+        mock_manifest.return_value.changed.return_value = True
+        mock_list.return_value = ["raw/1970-01-01.csv", "raw/1970-01-02.csv"]
+        mock_read.side_effect = [
+            OSError("error"),
+            pd.DataFrame({"PositiefGetest": [1000]}),
+        ]
+
+        task = CleanNationalDataset(self.config["collector"], Store())
+        with pytest.raises(ExecutionError) as error:
+            task(input_folder="raw", output_folder="interim")
+
+        mock_write.assert_called_once_with(
+            mock.ANY, "interim/1970-01-02.csv", index=False
+        )
+        mock_manifest.return_value.update.assert_called_once_with(
+            "raw/1970-01-02.csv", "interim/1970-01-02.csv"
+        )
+        mock_manifest.return_value.save.assert_called_once()
+
+        assert list(error.value.errors.keys()) == ["1970-01-01.csv"]
+
+    def test_run_workers(self, tmp_path):
+        (tmp_path / "raw").mkdir()
+        for day in range(1, 5):
+            (tmp_path / "raw" / f"1970-01-0{day}.csv").write_text(
+                f"PositiefGetest,Opgenomen,Overleden\n{day},{day * 2},{day * 3}\n",
+                encoding="utf8",
+            )
+
+        task = CleanNationalDataset(self.config["collector"], LocalStore(tmp_path))
+        task(input_folder="raw", output_folder="serial", workers=1)
+        task(input_folder="raw", output_folder="parallel", workers=2)
+
+        for day in range(1, 5):
+            serial = tmp_path / "serial" / f"1970-01-0{day}.csv"
+            parallel = tmp_path / "parallel" / f"1970-01-0{day}.csv"
+
+            assert serial.read_bytes() == parallel.read_bytes()
+
+    def test_run_format(self, tmp_path):
+        (tmp_path / "raw").mkdir()
+        (tmp_path / "raw" / "1970-01-01.csv").write_text(
+            "PositiefGetest,Opgenomen,Overleden\n1000,2000,3000\n", encoding="utf8"
+        )
+
+        config = {
+            **self.config["collector"],
+            "formats": {"national": {"interim": "parquet"}},
+        }
+
+        task = CleanNationalDataset(config, LocalStore(tmp_path))
+        task(input_folder="raw", output_folder="interim")
+
+        pd.testing.assert_frame_equal(
+            pd.read_parquet(tmp_path / "interim" / "1970-01-01.parquet"),
+            pd.DataFrame(
+                {
+                    "PositiefGetest": [1000],
+                    "Opgenomen": [2000],
+                    "Overleden": [3000],
+                    "Datum": ["1970-01-01"],
+                }
+            ),
+        )
+
+    def test_run_format_changed(self, tmp_path):
+        (tmp_path / "raw").mkdir()
+        (tmp_path / "raw" / "1970-01-01.csv").write_text(
+            "PositiefGetest,Opgenomen,Overleden\n1000,2000,3000\n", encoding="utf8"
+        )
+
+        task = CleanNationalDataset(self.config["collector"], LocalStore(tmp_path))
+        task(input_folder="raw", output_folder="interim")
+
+        config = {
+            **self.config["collector"],
+            "formats": {"national": {"interim": "parquet"}},
+        }
+
+        task = CleanNationalDataset(config, LocalStore(tmp_path))
+        task(input_folder="raw", output_folder="interim")
+
+        assert (tmp_path / "interim" / "1970-01-01.csv").exists()
+        assert (tmp_path / "interim" / "1970-01-01.parquet").exists()
+
 
 class TestCleanNationalDatasetRead:
     @mock.patch.object(Store, "open")
@@ -1,4 +1,5 @@
 import json
+import threading
 
 import pytest
 import mock
@@ -32,6 +33,10 @@ class TestGetIntensiveCareDatasetRun:
             ({}, ["'output_folder' is a required property"]),
             ({"output_folder": 1}, ["1 is not of type 'string'"]),
             ({"output-folder": 1}, ["'output_folder' is a required property"]),
+            (
+                {"output_folder": "raw", "concurrency": 0},
+                ["0 is less than the minimum of 1"],
+            ),
         ],
     )
     @mock.patch.object(GetIntensiveCareDataset, "run")
@@ -82,6 +87,33 @@ class TestGetIntensiveCareDatasetRun:
             ]
         )
 
+    @mock.patch.object(Client, "get")
+    @mock.patch.object(GetIntensiveCareDataset, "_write")
+    def test_run_concurrency(self, mock_write, mock_get):
+        urls = self.config["collector"]["urls"]["intensive_care"]
+        documents = dict(zip(urls, self.intensive_care_response))
+
+        # Every download waits for the others, which only passes when they overlap
+        barrier = threading.Barrier(len(urls), timeout=5)
+
+        def get(url):
+            barrier.wait()
+            return documents[url]
+
+        mock_get.side_effect = get
+
+        task = GetIntensiveCareDataset(self.config["collector"], Client(), Store())
+        task(output_folder="raw", concurrency=len(urls))
+
+        assert mock_get.call_count == len(urls)
+        assert [call.args[1] for call in mock_write.call_args_list] == [
+            "raw/1970-01-01-ic-count.json",
+            "raw/1970-01-01-new-intake-confirmed.json",
+            "raw/1970-01-01-new-intake-suspicious.json",
+            "raw/1970-01-01-died-cumulative.json",
+            "raw/1970-01-01-survived-cumulative.json",
+        ]
+
 
 class TestGetIntensiveCareDatasetWrite:
     @mock.patch.object(Store, "open")
@@ -45,15 +45,17 @@ class TestGetMunicipalityDatasetRun:
         for (idx, error) in enumerate(error.value.errors):
             assert error.message == messages[idx]
 
-    @mock.patch.object(Client, "get")
+    @mock.patch.object(Client, "download")
     @mock.patch.object(GetMunicipalityDataset, "_write")
-    def test_run(self, mock_write, mock_get):
-        mock_get.side_effect = self.municipality_response
+    def test_run(self, mock_write, mock_download, tmp_path):
+        for (idx, response) in enumerate(self.municipality_response):
+            (tmp_path / str(idx)).write_text(response, encoding="utf8")
+        mock_download.side_effect = [str(tmp_path / "0"), str(tmp_path / "1")]
 
         task = GetMunicipalityDataset(self.config["collector"], Client(), Store())
         task(output_folder="raw")
 
-        mock_get.assert_has_calls(
+        mock_download.assert_has_calls(
             [
                 mock.call(self.config["collector"]["urls"]["municipality"]["cases"]),
                 mock.call(
@@ -79,6 +81,56 @@ class TestGetMunicipalityDatasetRun:
             check_dtype=False,
         )
 
+    @mock.patch.object(Client, "download")
+    @mock.patch.object(Store, "list")
+    @mock.patch.object(GetMunicipalityDataset, "_write")
+    def test_run_backfill(self, mock_write, mock_list, mock_download, tmp_path):
+        cases = "\n".join(
+            [
+                "Date_of_publication;Municipality_code;Total_reported",
+                "1970-01-01;GM0001;1",
+                "1970-01-02;GM0001;2",
+                "1970-01-03;GM0001;3",
+            ]
+        )
+        hospitalized = "\n".join(
+            [
+                "Date_of_statistics;Municipality_code;Hospital_admission",
+                "1970-01-01;GM0001;4",
+                "1970-01-03;GM0001;5",
+            ]
+        )
+        (tmp_path / "0").write_text(cases, encoding="utf8")
+        (tmp_path / "1").write_text(hospitalized, encoding="utf8")
+        mock_download.side_effect = [str(tmp_path / "0"), str(tmp_path / "1")]
+        mock_list.return_value = ["raw/1970-01-01.csv"]
+
+        task = GetMunicipalityDataset(self.config["collector"], Client(), Store())
+        task(output_folder="raw", backfill=True)
+
+        mock_list.assert_called_once_with("raw/*.csv")
+        mock_write.assert_has_calls(
+            [
+                mock.call(mock.ANY, "raw/1970-01-02.csv", index=False),
+                mock.call(mock.ANY, "raw/1970-01-03.csv", index=False),
+            ]
+        )
+        assert mock_write.call_count == 2
+
+        assert mock_write.call_args_list[0].args[0]["Hospital_admission"].isna().all()
+        pd.testing.assert_frame_equal(
+            mock_write.call_args_list[1].args[0].reset_index(drop=True),
+            pd.DataFrame(
+                {
+                    "Date_of_publication": ["1970-01-03"],
+                    "Municipality_code": ["GM0001"],
+                    "Total_reported": [3],
+                    "Hospital_admission": [5],
+                }
+            ),
+            check_dtype=False,
+        )
+
 
 class TestGetMunicipalityDatasetWrite:
     @mock.patch.object(Store, "open")
@@ -32,6 +32,13 @@ class TestGetNationalDatasetRun:
             ({}, ["'output_folder' is a required property"]),
             ({"output_folder": 1}, ["1 is not of type 'string'"]),
             ({"output-folder": 1}, ["'output_folder' is a required property"]),
+            (
+                {"output_folder": "raw", "since": "01-01-1970"},
+                [
+                    r"'01-01-1970' does not match '^\\d{4}-\\d{2}-\\d{2}$'",
+                    "'01-01-1970' is not a 'date'",
+                ],
+            ),
         ],
     )
     @mock.patch.object(GetNationalDataset, "run")
@@ -45,15 +52,17 @@ class TestGetNationalDatasetRun:
         for (idx, error) in enumerate(error.value.errors):
             assert error.message == messages[idx]
 
-    @mock.patch.object(Client, "get")
+    @mock.patch.object(Client, "download")
     @mock.patch.object(GetNationalDataset, "_write")
-    def test_run(self, mock_write, mock_get):
-        mock_get.side_effect = self.national_response
+    def test_run(self, mock_write, mock_download, tmp_path):
+        for (idx, response) in enumerate(self.national_response):
+            (tmp_path / str(idx)).write_text(response, encoding="utf8")
+        mock_download.side_effect = [str(tmp_path / "0"), str(tmp_path / "1")]
 
         task = GetNationalDataset(self.config["collector"], Client(), Store())
         task(output_folder="raw")
 
-        mock_get.assert_has_calls(
+        mock_download.assert_has_calls(
             [
                 mock.call(self.config["collector"]["urls"]["national"]["cases"]),
                 mock.call(self.config["collector"]["urls"]["national"]["hospitalized"]),
@@ -69,6 +78,56 @@ class TestGetNationalDatasetRun:
             check_dtype=False,
         )
 
+    @mock.patch.object(Client, "download")
+    @mock.patch.object(Store, "list")
+    @mock.patch.object(GetNationalDataset, "_write")
+    def test_run_backfill(self, mock_write, mock_list, mock_download, tmp_path):
+        cases = "\n".join(
+            [
+                "Date_of_publication;Municipality_code;Total_reported;Deceased",
+                "1970-01-01;GM0001;1;2",
+                "1970-01-02;GM0001;3;4",
+                "1970-01-02;GM0002;5;6",
+                "1970-01-03;GM0001;7;8",
+                "1970-01-04;GM0001;9;10",
+            ]
+        )
+        hospitalized = "\n".join(
+            [
+                "Date_of_statistics;Municipality_code;Hospital_admission",
+                "1970-01-01;GM0001;1",
+                "1970-01-02;GM0001;2",
+                "1970-01-02;;100",
+            ]
+        )
+        (tmp_path / "0").write_text(cases, encoding="utf8")
+        (tmp_path / "1").write_text(hospitalized, encoding="utf8")
+        mock_download.side_effect = [str(tmp_path / "0"), str(tmp_path / "1")]
+        mock_list.return_value = ["raw/1970-01-03.csv"]
+
+        task = GetNationalDataset(self.config["collector"], Client(), Store())
+        task(output_folder="raw", backfill=True, since="1970-01-02", until=None)
+
+        mock_list.assert_called_once_with("raw/*.csv")
+        mock_write.assert_has_calls(
+            [
+                mock.call(mock.ANY, "raw/1970-01-02.csv", index=False),
+                mock.call(mock.ANY, "raw/1970-01-04.csv", index=False),
+            ]
+        )
+        assert mock_write.call_count == 2
+
+        pd.testing.assert_frame_equal(
+            mock_write.call_args_list[0].args[0],
+            pd.DataFrame({"PositiefGetest": [8], "Opgenomen": [2], "Overleden": [10]}),
+            check_dtype=False,
+        )
+        pd.testing.assert_frame_equal(
+            mock_write.call_args_list[1].args[0],
+            pd.DataFrame({"PositiefGetest": [9], "Opgenomen": [0], "Overleden": [10]}),
+            check_dtype=False,
+        )
+
 
 class TestGetNationalDatasetWrite:
     @mock.patch.object(Store, "open")
@@ -15,6 +15,14 @@ class TestMergeIntensiveCareDatasetRun:
     def config(self):
         return create_config()
 
+    @pytest.fixture(autouse=True)
+    def mock_memo(self):
+        with mock.patch(
+            "collector.tasks.merge_intensive_care_dataset.task.Memo"
+        ) as mock_memo:
+            mock_memo.return_value.matches.return_value = False
+            yield mock_memo
+
     @mock.patch.object(MergeIntensiveCareDataset, "run")
     def test_run_valid_input(self, mock_run):
         task = MergeIntensiveCareDataset(self.config["collector"], Store())
@@ -64,11 +72,11 @@ class TestMergeIntensiveCareDatasetRun:
         for (idx, error) in enumerate(error.value.errors):
             assert error.message == messages[idx]
 
-    @mock.patch.object(Store, "list")
+    @mock.patch.object(Store, "latest")
     @mock.patch.object(MergeIntensiveCareDataset, "_read")
     @mock.patch.object(MergeIntensiveCareDataset, "_write")
-    def test_run(self, mock_write, mock_read, mock_list):
-        mock_list.return_value = [
+    def test_run(self, mock_write, mock_read, mock_latest):
+        mock_latest.return_value = [
             "interim/1970-01-02-file-1.csv",
             "interim/1970-01-02-file-2.csv",
         ]
@@ -97,7 +105,7 @@ class TestMergeIntensiveCareDatasetRun:
         task = MergeIntensiveCareDataset(self.config["collector"], Store())
         task(name="test", input_folder="interim", output_folder="processed")
 
-        mock_list.assert_called_once_with("interim/*.csv")
+        mock_latest.assert_called_once_with("interim", "*.csv")
         mock_read.assert_has_calls(
             [
                 mock.call("interim/1970-01-02-file-1.csv"),
@@ -123,6 +131,64 @@ class TestMergeIntensiveCareDatasetRun:
             check_dtype=False,
         )
 
+    @mock.patch.object(Store, "latest")
+    @mock.patch.object(MergeIntensiveCareDataset, "_read")
+    @mock.patch.object(MergeIntensiveCareDataset, "_write")
+    def test_run_missing(self, mock_write, mock_read, mock_latest):
+        mock_latest.return_value = [
+            "interim/1970-01-03-file-1.csv",
+            "interim/1970-01-03-file-2.csv",
+            "interim/1970-01-03-file-3.csv",
+        ]
+        mock_read.side_effect = [
+            pd.DataFrame({"Datum": ["1970-01-02"], "Opgenomen": [100]}),
+            pd.DataFrame({"Datum": ["1970-01-01"], "IntensiveCare": [200]}),
+            pd.DataFrame({"Datum": ["1970-01-03"], "Opgenomen": [300]}),
+        ]
+
+        task = MergeIntensiveCareDataset(self.config["collector"], Store())
+        task(name="test", input_folder="interim", output_folder="processed")
+
+        pd.testing.assert_frame_equal(
+            mock_write.call_args.args[0],
+            pd.DataFrame(
+                {
+                    "Datum": ["1970-01-01", "1970-01-02", "1970-01-03"],
+                    "IntensiveCare": [200, 0, 0],
+                    "Opgenomen": [0, 100, 300],
+                }
+            ),
+            check_dtype=False,
+        )
+
+    @mock.patch.object(Store, "latest")
+    @mock.patch.object(MergeIntensiveCareDataset, "_read")
+    @mock.patch.object(MergeIntensiveCareDataset, "_write")
+    def test_run_single(self, mock_write, mock_read, mock_latest):
+        mock_latest.return_value = ["interim/1970-01-02-file-1.csv"]
+        mock_read.return_value = pd.DataFrame(
+            {
+                "Datum": ["1970-01-02", "1970-01-01"],
+                "Opgenomen": [100, None],
+                "IntensiveCare": [None, 200],
+            }
+        )
+
+        task = MergeIntensiveCareDataset(self.config["collector"], Store())
+        task(name="test", input_folder="interim", output_folder="processed")
+
+        pd.testing.assert_frame_equal(
+            mock_write.call_args.args[0].reset_index(drop=True),
+            pd.DataFrame(
+                {
+                    "Datum": ["1970-01-01", "1970-01-02"],
+                    "Opgenomen": [None, 100],
+                    "IntensiveCare": [200, None],
+                }
+            ),
+            check_dtype=False,
+        )
+
 
 class TestMergeIntensiveCareDatasetRead:
     @mock.patch.object(Store, "open")
@@ -7,7 +7,9 @@ from fixtures import Store
 from data import create_config
 
 from collector.tasks.merge_municipality_dataset.task import MergeMunicipalityDataset
+from collector.memo import Memo
 from collector.schema import ValidationError
+from collector.store import LocalStore
 
 
 class TestMergeMunicipalityDatasetRun:
@@ -15,6 +17,15 @@ class TestMergeMunicipalityDatasetRun:
     def config(self):
         return create_config()
 
+    @pytest.fixture(autouse=True)
+    def mock_memo(self):
+        with mock.patch(
+            "collector.tasks.merge_municipality_dataset.task.Memo"
+        ) as mock_memo:
+            mock_memo.return_value.matches.return_value = False
+            mock_memo.return_value.added.return_value = []
+            yield mock_memo
+
     @mock.patch.object(MergeMunicipalityDataset, "run")
     def test_run_valid_input(self, mock_run):
         task = MergeMunicipalityDataset(self.config["collector"], Store())
@@ -64,10 +75,11 @@ class TestMergeMunicipalityDatasetRun:
         for (idx, error) in enumerate(error.value.errors):
             assert error.message == messages[idx]
 
+    @mock.patch.object(MergeMunicipalityDataset, "_read_output", return_value=None)
     @mock.patch.object(Store, "list")
     @mock.patch.object(MergeMunicipalityDataset, "_read")
     @mock.patch.object(MergeMunicipalityDataset, "_write")
-    def test_run(self, mock_write, mock_read, mock_list):
+    def test_run(self, mock_write, mock_read, mock_list, _):
         mock_list.return_value = [
             "interim/1970-01-01.csv",
             "interim/1970-01-02.csv",
@@ -134,6 +146,119 @@ class TestMergeMunicipalityDatasetRun:
             check_dtype=False,
         )
 
+    @mock.patch.object(MergeMunicipalityDataset, "_read_output")
+    @mock.patch.object(Store, "list")
+    @mock.patch.object(MergeMunicipalityDataset, "_read")
+    @mock.patch.object(MergeMunicipalityDataset, "_write")
+    def test_run_up_to_date(self, mock_write, mock_read, mock_list, mock_read_output):
+        mock_read_output.return_value = pd.DataFrame(
+            {
+                "Gemeentecode": [1],
+                "PositiefGetest": [100],
+                "Gemeente": ["gemeente 1"],
+                "Provinciecode": [2],
+                "Provincie": ["provincie 2"],
+                "Datum": ["1970-01-01"],
+            }
+        )
+        mock_list.return_value = ["interim/1970-01-01.csv"]
+
+        task = MergeMunicipalityDataset(self.config["collector"], Store())
+        task(name="test", input_folder="interim", output_folder="processed")
+
+        mock_read.assert_not_called()
+        mock_write.assert_not_called()
+
+    @pytest.mark.parametrize("steps", [[1, 2, 3, 4, 5, 6], [2, 3, 6], [1, 6]])
+    def test_run_incremental(self, tmp_path, steps):
+        # Day 3 and 4 only report hospital admissions, so their case counts are
+        # interpolated once a later day is merged
+        days = [
+            ("PositiefGetest", [(1, 10), (2, 20)]),
+            ("PositiefGetest", [(1, 12)]),
+            ("Opgenomen", [(1, 1), (2, 1)]),
+            ("Opgenomen", [(2, 1)]),
+            ("PositiefGetest", [(1, 30)]),
+            ("PositiefGetest", [(2, 50)]),
+        ]
+
+        (tmp_path / "interim").mkdir()
+        for (day, (column, rows)) in enumerate(days, start=1):
+            pd.DataFrame(
+                {
+                    "Gemeentecode": [code for (code, _) in rows],
+                    column: [value for (_, value) in rows],
+                    "Gemeente": [f"gemeente {code}" for (code, _) in rows],
+                    "Provinciecode": [3 for _ in rows],
+                    "Provincie": ["provincie 3" for _ in rows],
+                    "Datum": [f"1970-01-0{day}" for _ in rows],
+                }
+            ).to_csv(tmp_path / "interim" / f"1970-01-0{day}.csv", index=False)
+
+        task = MergeMunicipalityDataset(self.config["collector"], LocalStore(tmp_path))
+        task(name="test", input_folder="interim", output_folder="full", full=True)
+
+        (tmp_path / "partial").mkdir()
+        for (start, end) in zip([0, *steps], steps):
+            for day in range(start + 1, end + 1):
+                (tmp_path / "partial" / f"1970-01-0{day}.csv").write_bytes(
+                    (tmp_path / "interim" / f"1970-01-0{day}.csv").read_bytes()
+                )
+
+            task(name="test", input_folder="partial", output_folder="incremental")
+
+        assert (tmp_path / "full" / "test.csv").read_bytes() == (
+            tmp_path / "incremental" / "test.csv"
+        ).read_bytes()
+
+    def test_run_changed(self, tmp_path, mock_memo):
+        mock_memo.side_effect = Memo
+
+        (tmp_path / "interim").mkdir()
+        for (day, value) in [(1, 10), (2, 20)]:
+            pd.DataFrame(
+                {
+                    "Gemeentecode": [1],
+                    "PositiefGetest": [value],
+                    "Gemeente": ["gemeente 1"],
+                    "Provinciecode": [2],
+                    "Provincie": ["provincie 2"],
+                    "Datum": [f"1970-01-0{day}"],
+                }
+            ).to_csv(tmp_path / "interim" / f"1970-01-0{day}.csv", index=False)
+
+        task = MergeMunicipalityDataset(self.config["collector"], LocalStore(tmp_path))
+        task(name="test", input_folder="interim", output_folder="processed")
+
+        # An older dataset is corrected and a new one is added
+        for (day, value) in [(1, 1000), (3, 30)]:
+            pd.DataFrame(
+                {
+                    "Gemeentecode": [1],
+                    "PositiefGetest": [value],
+                    "Gemeente": ["gemeente 1"],
+                    "Provinciecode": [2],
+                    "Provincie": ["provincie 2"],
+                    "Datum": [f"1970-01-0{day}"],
+                }
+            ).to_csv(tmp_path / "interim" / f"1970-01-0{day}.csv", index=False)
+
+        task(name="test", input_folder="interim", output_folder="processed")
+
+        pd.testing.assert_frame_equal(
+            pd.read_csv(tmp_path / "processed" / "test.csv"),
+            pd.DataFrame(
+                {
+                    "Gemeentecode": [1, 1, 1],
+                    "PositiefGetest": [1000, 20, 30],
+                    "Gemeente": ["gemeente 1", "gemeente 1", "gemeente 1"],
+                    "Provinciecode": [2, 2, 2],
+                    "Provincie": ["provincie 2", "provincie 2", "provincie 2"],
+                    "Datum": ["1970-01-01", "1970-01-02", "1970-01-03"],
+                }
+            ),
+        )
+
 
 class TestMergeMunicipalityDatasetRead:
     @mock.patch.object(Store, "open")
@@ -7,7 +7,9 @@ from fixtures import Store
 from data import create_config
 
 from collector.tasks.merge_national_dataset.task import MergeNationalDataset
+from collector.memo import Memo
 from collector.schema import ValidationError
+from collector.store import LocalStore
 
 
 class TestMergeNationalDatasetRun:
@@ -15,6 +17,15 @@ class TestMergeNationalDatasetRun:
     def config(self):
         return create_config()
 
+    @pytest.fixture(autouse=True)
+    def mock_memo(self):
+        with mock.patch(
+            "collector.tasks.merge_national_dataset.task.Memo"
+        ) as mock_memo:
+            mock_memo.return_value.matches.return_value = False
+            mock_memo.return_value.added.return_value = []
+            yield mock_memo
+
     @mock.patch.object(MergeNationalDataset, "run")
     def test_run_valid_input(self, mock_run):
         task = MergeNationalDataset(self.config["collector"], Store())
@@ -64,10 +75,11 @@ class TestMergeNationalDatasetRun:
         for (idx, error) in enumerate(error.value.errors):
             assert error.message == messages[idx]
 
+    @mock.patch.object(MergeNationalDataset, "_read_output", return_value=None)
     @mock.patch.object(Store, "list")
     @mock.patch.object(MergeNationalDataset, "_read")
     @mock.patch.object(MergeNationalDataset, "_write")
-    def test_run(self, mock_write, mock_read, mock_list):
+    def test_run(self, mock_write, mock_read, mock_list, _):
         mock_list.return_value = ["interim/1970-01-01.csv", "interim/1970-01-02.csv"]
         mock_read.side_effect = [
             pd.DataFrame(
@@ -110,6 +122,182 @@ class TestMergeNationalDatasetRun:
             check_dtype=False,
         )
 
+    @mock.patch.object(MergeNationalDataset, "_read_output")
+    @mock.patch.object(Store, "list")
+    @mock.patch.object(MergeNationalDataset, "_read")
+    @mock.patch.object(MergeNationalDataset, "_write")
+    def test_run_incremental(
+        self, mock_write, mock_read, mock_list, mock_read_output, mock_memo
+    ):
+        mock_memo.return_value.added.return_value = ["interim/1970-01-02.csv"]
+        mock_read_output.return_value = pd.DataFrame(
+            {
+                "PositiefGetest": [1000],
+                "Opgenomen": [2000],
+                "Overleden": [3000],
+                "Datum": ["1970-01-01"],
+            }
+        )
+        mock_list.return_value = ["interim/1970-01-02.csv", "interim/1970-01-01.csv"]
+        mock_read.return_value = pd.DataFrame(
+            {
+                "PositiefGetest": [4000],
+                "Opgenomen": [5000],
+                "Overleden": [6000],
+                "Datum": ["1970-01-02"],
+            }
+        )
+
+        task = MergeNationalDataset(self.config["collector"], Store())
+        task(name="test", input_folder="interim", output_folder="processed")
+
+        mock_read_output.assert_called_once_with("processed/test.csv")
+        mock_read.assert_called_once_with("interim/1970-01-02.csv")
+
+        pd.testing.assert_frame_equal(
+            mock_write.call_args.args[0],
+            pd.DataFrame(
+                {
+                    "PositiefGetest": [1000, 4000],
+                    "Opgenomen": [2000, 5000],
+                    "Overleden": [3000, 6000],
+                    "Datum": ["1970-01-01", "1970-01-02"],
+                }
+            ),
+            check_dtype=False,
+        )
+
+    @mock.patch.object(MergeNationalDataset, "_read_output")
+    @mock.patch.object(Store, "list")
+    @mock.patch.object(MergeNationalDataset, "_read")
+    @mock.patch.object(MergeNationalDataset, "_write")
+    def test_run_up_to_date(self, mock_write, mock_read, mock_list, mock_read_output):
+        mock_read_output.return_value = pd.DataFrame(
+            {
+                "PositiefGetest": [1000],
+                "Opgenomen": [2000],
+                "Overleden": [3000],
+                "Datum": ["1970-01-01"],
+            }
+        )
+        mock_list.return_value = ["interim/1970-01-01.csv"]
+
+        task = MergeNationalDataset(self.config["collector"], Store())
+        task(name="test", input_folder="interim", output_folder="processed")
+
+        mock_read.assert_not_called()
+        mock_write.assert_not_called()
+
+    @mock.patch.object(MergeNationalDataset, "_read_output")
+    @mock.patch.object(Store, "list")
+    @mock.patch.object(MergeNationalDataset, "_read")
+    @mock.patch.object(MergeNationalDataset, "_write")
+    def test_run_full(self, mock_write, mock_read, mock_list, mock_read_output):
+        mock_list.return_value = ["interim/1970-01-01.csv"]
+        mock_read.return_value = pd.DataFrame(
+            {
+                "PositiefGetest": [1000],
+                "Opgenomen": [2000],
+                "Overleden": [3000],
+                "Datum": ["1970-01-01"],
+            }
+        )
+
+        task = MergeNationalDataset(self.config["collector"], Store())
+        task(name="test", input_folder="interim", output_folder="processed", full=True)
+
+        mock_read_output.assert_not_called()
+        mock_read.assert_called_once_with("interim/1970-01-01.csv")
+        mock_write.assert_called_once_with(mock.ANY, "processed/test.csv", index=False)
+
+    @mock.patch.object(MergeNationalDataset, "_read_output")
+    @mock.patch.object(Store, "list")
+    @mock.patch.object(MergeNationalDataset, "_read")
+    @mock.patch.object(MergeNationalDataset, "_write")
+    def test_run_unchanged(
+        self, mock_write, mock_read, mock_list, mock_read_output, mock_memo
+    ):
+        mock_memo.return_value.matches.return_value = True
+        mock_list.return_value = ["interim/1970-01-01.csv"]
+
+        task = MergeNationalDataset(self.config["collector"], Store())
+        task(name="test", input_folder="interim", output_folder="processed")
+
+        mock_memo.assert_called_once_with(mock.ANY, "processed/.test.json")
+        mock_memo.return_value.fingerprint.assert_called_once_with(
+            ["interim/1970-01-01.csv"], mock.ANY, MergeNationalDataset
+        )
+        mock_read_output.assert_not_called()
+        mock_read.assert_not_called()
+        mock_write.assert_not_called()
+        mock_memo.return_value.save.assert_not_called()
+
+    @mock.patch.object(MergeNationalDataset, "_read_output", return_value=None)
+    @mock.patch.object(Store, "list")
+    @mock.patch.object(MergeNationalDataset, "_read")
+    @mock.patch.object(MergeNationalDataset, "_write")
+    def test_run_memo(self, mock_write, mock_read, mock_list, _, mock_memo):
+        mock_list.return_value = ["interim/1970-01-01.csv"]
+        mock_read.return_value = pd.DataFrame(
+            {
+                "PositiefGetest": [1000],
+                "Opgenomen": [2000],
+                "Overleden": [3000],
+                "Datum": ["1970-01-01"],
+            }
+        )
+
+        task = MergeNationalDataset(self.config["collector"], Store())
+        task(name="test", input_folder="interim", output_folder="processed")
+
+        mock_write.assert_called_once()
+        mock_memo.return_value.update.assert_called_once_with(
+            mock_memo.return_value.fingerprint.return_value
+        )
+        mock_memo.return_value.save.assert_called_once()
+
+    def test_run_changed(self, tmp_path, mock_memo):
+        mock_memo.side_effect = Memo
+
+        (tmp_path / "interim").mkdir()
+        for (day, value) in [(1, 10), (2, 20)]:
+            pd.DataFrame(
+                {
+                    "PositiefGetest": [value],
+                    "Opgenomen": [value],
+                    "Overleden": [value],
+                    "Datum": [f"1970-01-0{day}"],
+                }
+            ).to_csv(tmp_path / "interim" / f"1970-01-0{day}.csv", index=False)
+
+        task = MergeNationalDataset(self.config["collector"], LocalStore(tmp_path))
+        task(name="test", input_folder="interim", output_folder="processed")
+
+        # An older dataset is corrected and a new one is added
+        for (day, value) in [(1, 1000), (3, 30)]:
+            pd.DataFrame(
+                {
+                    "PositiefGetest": [value],
+                    "Opgenomen": [value],
+                    "Overleden": [value],
+                    "Datum": [f"1970-01-0{day}"],
+                }
+            ).to_csv(tmp_path / "interim" / f"1970-01-0{day}.csv", index=False)
+
+        task(name="test", input_folder="interim", output_folder="processed")
+
+        pd.testing.assert_frame_equal(
+            pd.read_csv(tmp_path / "processed" / "test.csv"),
+            pd.DataFrame(
+                {
+                    "PositiefGetest": [1000, 20, 30],
+                    "Opgenomen": [1000, 20, 30],
+                    "Overleden": [1000, 20, 30],
+                    "Datum": ["1970-01-01", "1970-01-02", "1970-01-03"],
+                }
+            ),
+        )
+
 
 class TestMergeNationalDatasetRead:
     @mock.patch.object(Store, "open")
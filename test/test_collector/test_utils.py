@@ -1,33 +1,186 @@
+import numpy as np
+import pandas as pd
 import pytest
 
-from collector.utils import filter_files
-
-
-class TestFilterFiles:
-    @pytest.mark.parametrize(
-        "files,output",
-        [
-            ([], []),
-            (["/tmp/1970-01-01-file-1.csv"], ["/tmp/1970-01-01-file-1.csv"]),
-            (
-                [
-                    "/tmp/1970-01-01-file-1.csv",
-                    "/tmp/1970-01-02-file-1.csv",
-                    "/tmp/1970-01-03-file-1.csv",
-                    "/tmp/1970-01-04-file-1.csv",
-                ],
-                ["/tmp/1970-01-04-file-1.csv"],
-            ),
-            (
-                [
-                    "/tmp/1969-01-01-file-1.csv",
-                    "/tmp/1969-01-01-file-2.csv",
-                    "/tmp/1970-01-01-file-1.csv",
-                    "/tmp/1970-01-01-file-2.csv",
-                ],
-                ["/tmp/1970-01-01-file-1.csv", "/tmp/1970-01-01-file-2.csv"],
+from collector.utils import (
+    concat_sorted,
+    interpolate_groups,
+    read_grouped_csv_file,
+    read_latest_csv_file,
+)
+
+
+class TestConcatSorted:
+    def test_concat_sorted(self):
+        data = concat_sorted(
+            [
+                pd.DataFrame({"Datum": ["1970-01-01"] * 2, "Code": [1, 2]}),
+                pd.DataFrame({"Datum": ["1970-01-02"], "Code": [1]}),
+            ],
+            ["Datum", "Code"],
+            columns=["Code", "Datum"],
+        )
+
+        pd.testing.assert_frame_equal(
+            data,
+            pd.DataFrame(
+                {"Code": [1, 2, 1], "Datum": ["1970-01-01"] * 2 + ["1970-01-02"]}
             ),
-        ],
-    )
-    def test_filter_files(self, files, output):
-        assert filter_files(files) == output
+            check_dtype=False,
+        )
+
+    def test_concat_sorted_unsorted(self):
+        data = concat_sorted(
+            [
+                pd.DataFrame({"Datum": ["1970-01-02"], "Code": [2]}),
+                pd.DataFrame({"Datum": ["1970-01-01", "1970-01-02"], "Code": [1, 1]}),
+            ],
+            ["Datum", "Code"],
+        )
+
+        assert list(data["Datum"]) == ["1970-01-01", "1970-01-02", "1970-01-02"]
+        assert list(data["Code"]) == [1, 1, 2]
+
+    def test_concat_sorted_empty(self):
+        data = concat_sorted([], ["Datum"], columns=["Datum", "Value"])
+
+        assert data.empty
+        assert list(data.columns) == ["Datum", "Value"]
+
+
+class TestInterpolateGroups:
+    def test_interpolate_groups(self):
+        values = [1, 1, np.nan, np.nan, 2, np.nan, 10, 5, np.nan, np.nan]
+        groups = [1, 2, 1, 2, 1, 2, 2, 3, 1, 3]
+
+        result = interpolate_groups(values, groups)
+
+        np.testing.assert_array_equal(result, [1, 1, 1.5, 4, 2, 7, 10, 5, 2, 5])
+
+    def test_interpolate_groups_leading(self):
+        result = interpolate_groups([np.nan, 1, np.nan, 3], [1, 2, 2, 1])
+
+        np.testing.assert_array_equal(result, [np.nan, 1, 1, 3])
+
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_interpolate_groups_pandas(self, seed):
+        rng = np.random.default_rng(seed)
+        data = pd.DataFrame(
+            {
+                "Group": rng.integers(0, 20, 1000),
+                "Value": np.where(
+                    rng.random(1000) < 0.3, np.nan, rng.integers(0, 1000, 1000)
+                ),
+            }
+        )
+
+        expected = data.groupby("Group", group_keys=False).apply(
+            lambda group: group.interpolate()
+        )
+
+        np.testing.assert_array_equal(
+            interpolate_groups(data["Value"], data["Group"]), expected["Value"]
+        )
+
+
+class TestReadLatestCsvFile:
+    @pytest.mark.parametrize("block_size", [1, 5, 16, 65536])
+    @pytest.mark.parametrize("newline", ["\n", "\r\n"])
+    def test_read_latest_csv_file(self, tmp_path, block_size, newline):
+        lines = ["Date;Value", "1970-01-01;1", "1970-01-02;2", "1970-01-02;3"]
+        (tmp_path / "data.csv").write_bytes(
+            (newline.join(lines) + newline).encode("utf8")
+        )
+
+        date, data = read_latest_csv_file(
+            str(tmp_path / "data.csv"), "Date", delimiter=";", block_size=block_size
+        )
+
+        assert date == "1970-01-02"
+
+        pd.testing.assert_frame_equal(
+            data.reset_index(drop=True),
+            pd.DataFrame({"Date": ["1970-01-02"] * 2, "Value": [2, 3]}),
+        )
+
+    def test_read_latest_csv_file_unsorted(self, tmp_path):
+        lines = ["Date;Value", "1970-01-02;1", "1970-01-03;2", "1970-01-02;3"]
+        (tmp_path / "data.csv").write_text("\n".join(lines), encoding="utf8")
+
+        date, data = read_latest_csv_file(
+            str(tmp_path / "data.csv"), "Date", delimiter=";"
+        )
+
+        assert date == "1970-01-02"
+
+        pd.testing.assert_frame_equal(
+            data.reset_index(drop=True),
+            pd.DataFrame({"Date": ["1970-01-02"] * 2, "Value": [1, 3]}),
+        )
+
+    @pytest.mark.parametrize("block_size", [1, 65536])
+    def test_read_latest_csv_file_unsorted_start(self, tmp_path, block_size):
+        lines = ["Date;Value", "1970-01-02;1", "1970-01-01;2", "1970-01-02;3"]
+        (tmp_path / "data.csv").write_text("\n".join(lines), encoding="utf8")
+
+        date, data = read_latest_csv_file(
+            str(tmp_path / "data.csv"), "Date", delimiter=";", block_size=block_size
+        )
+
+        assert date == "1970-01-02"
+
+        pd.testing.assert_frame_equal(
+            data.reset_index(drop=True),
+            pd.DataFrame({"Date": ["1970-01-02"] * 2, "Value": [1, 3]}),
+        )
+
+    def test_read_latest_csv_file_empty(self, tmp_path):
+        (tmp_path / "data.csv").write_text("Date;Value\n", encoding="utf8")
+
+        date, data = read_latest_csv_file(
+            str(tmp_path / "data.csv"), "Date", delimiter=";"
+        )
+
+        assert date is None
+        assert list(data.columns) == ["Date", "Value"]
+
+
+class TestReadGroupedCsvFile:
+    @property
+    def lines(self):
+        return [
+            "Date;Value",
+            "1970-01-01;1",
+            "1970-01-02;2",
+            "1970-01-02;3",
+            "1970-01-03;4",
+        ]
+
+    @pytest.mark.parametrize("chunksize", [1, 2, 100000])
+    def test_read_grouped_csv_file(self, tmp_path, chunksize):
+        (tmp_path / "data.csv").write_text("\n".join(self.lines), encoding="utf8")
+
+        groups = read_grouped_csv_file(
+            str(tmp_path / "data.csv"), "Date", delimiter=";", chunksize=chunksize
+        )
+
+        assert list(groups.keys()) == ["1970-01-01", "1970-01-02", "1970-01-03"]
+
+        pd.testing.assert_frame_equal(
+            groups["1970-01-02"].reset_index(drop=True),
+            pd.DataFrame({"Date": ["1970-01-02"] * 2, "Value": [2, 3]}),
+        )
+
+    def test_read_grouped_csv_file_filter(self, tmp_path):
+        (tmp_path / "data.csv").write_text("\n".join(self.lines), encoding="utf8")
+
+        groups = read_grouped_csv_file(
+            str(tmp_path / "data.csv"),
+            "Date",
+            delimiter=";",
+            since="1970-01-02",
+            until="1970-01-03",
+            exclude=["1970-01-03"],
+        )
+
+        assert list(groups.keys()) == ["1970-01-02"]